@@ -0,0 +1,106 @@
+""" Compare the CPU cost of serving many connections with the threaded
+    classes and with the asyncio classes.
+
+    Each connection is a client that sends a number of messages to its own
+    server. The benchmark reports the wall time, the CPU time of the process
+    and the number of connections that one core could serve if each connection
+    sends `rate` messages per second.
+
+    Usage: python benchmarks/connections_per_core.py --connections 100 --messages 1000 --rate 10
+"""
+import argparse
+import asyncio
+import os
+import queue
+import threading
+import time
+
+from socketlib import AsyncClient, AsyncServer, ClientSender, ServerReceiver
+
+
+def report(
+        name: str,
+        connections: int,
+        messages: int,
+        rate: float,
+        wall: float,
+        cpu: float
+) -> None:
+    total = connections * messages
+    per_core = total / cpu / rate if cpu > 0 else float("inf")
+    print(f"{name:>9}: {connections} connections, {total} messages in {wall:.2f} s, "
+          f"cpu {cpu:.2f} s, {total / cpu:,.0f} msg/cpu-s, "
+          f"{per_core:,.0f} connections per core, {threading.active_count()} threads")
+
+
+def run_threaded(host: str, port: int, connections: int, messages: int, rate: float) -> None:
+    servers = []
+    clients = []
+    for ii in range(connections):
+        address = (host, port + ii)
+        server = ServerReceiver(address, reconnect=False)
+        server.start()
+        servers.append(server)
+
+        to_send = queue.Queue()
+        for _ in range(messages):
+            to_send.put("x" * 64)
+        clients.append(ClientSender(address, to_send, reconnect=False))
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    for client in clients:
+        client.connect()
+        client.start()
+    for server in servers:
+        while server.received.qsize() < messages:
+            time.sleep(0.001)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    report("threads", connections, messages, rate, wall, cpu)
+
+
+async def run_async(host: str, port: int, connections: int, messages: int, rate: float) -> None:
+    servers = []
+    clients = []
+    for ii in range(connections):
+        address = (host, port + ii)
+        server = AsyncServer(address, reconnect=False)
+        server.start()
+        servers.append(server)
+
+        client = AsyncClient(address, reconnect=False)
+        for _ in range(messages):
+            client.to_send.put_nowait("x" * 64)
+        clients.append(client)
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    for client in clients:
+        await client.connect()
+        client.start()
+    for server in servers:
+        while server.received.qsize() < messages:
+            await asyncio.sleep(0.001)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    report("asyncio", connections, messages, rate, wall, cpu)
+
+    for task in [client.shutdown() for client in clients] + [server.shutdown() for server in servers]:
+        await task
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=20000)
+    parser.add_argument("--connections", "-c", type=int, default=100)
+    parser.add_argument("--messages", "-m", type=int, default=1000)
+    parser.add_argument("--rate", "-r", type=float, default=10,
+                        help="Messages per second sent by each connection")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cores available")
+    asyncio.run(run_async(args.host, args.port, args.connections, args.messages, args.rate))
+    run_threaded(
+        args.host, args.port + args.connections, args.connections, args.messages, args.rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+""" Measure the time from the moment a client disconnects until the server
+    receives the first message of the client's next connection.
+
+    The client reconnects immediately and, like the clients of socketlib,
+    retries every 0.5 seconds if the connection is refused. If the message is
+    not received, because the client connected to a listening socket that was
+    then closed, the client connects again. The benchmark is
+    run with the server keeping its listening socket open across reconnects
+    and with a server that closes and rebinds it, as servers did before.
+
+    Usage: python benchmarks/reconnect_latency.py --reconnects 20
+"""
+import argparse
+import queue
+import socket
+import statistics
+import time
+
+from socketlib import ServerReceiver
+
+
+class RebindingServerReceiver(ServerReceiver):
+    """ A server that closes its listening socket after every connection
+        and creates a new one.
+    """
+
+    def _close_client(self) -> None:
+        super()._close_client()
+        self._socket.close()
+        self.listen()
+
+
+def connect(address: tuple[str, int]) -> socket.socket:
+    while True:
+        try:
+            return socket.create_connection(address)
+        except ConnectionError:
+            time.sleep(0.5)
+
+
+def send_first_message(server: ServerReceiver, lost_timeout: float) -> socket.socket:
+    """ Connect to the server and send a message until the server receives it. """
+    while True:
+        sock = connect(server._address)
+        try:
+            sock.sendall(b"msg\r\n")
+            server.received.get(timeout=lost_timeout)
+            return sock
+        except (ConnectionError, queue.Empty):
+            sock.close()
+
+
+def measure(server: ServerReceiver, reconnects: int, lost_timeout: float) -> list[float]:
+    latencies = []
+    server.start()
+    sock = send_first_message(server, lost_timeout)
+    for _ in range(reconnects):
+        sock.close()
+        start = time.perf_counter()
+        sock = send_first_message(server, lost_timeout)
+        latencies.append(time.perf_counter() - start)
+    sock.close()
+    server.shutdown()
+    server.close_connection()
+    return latencies
+
+
+def report(name: str, latencies: list[float]) -> None:
+    latencies = [lat * 1000 for lat in latencies]
+    print(f"{name:>10}: mean {statistics.mean(latencies):.2f} ms, "
+          f"median {statistics.median(latencies):.2f} ms, max {max(latencies):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=20000)
+    parser.add_argument("--reconnects", "-n", type=int, default=20)
+    parser.add_argument("--lost-timeout", type=float, default=1.,
+                        help="Seconds the client waits before considering a message lost")
+    args = parser.parse_args()
+
+    rebinding = RebindingServerReceiver((args.host, args.port))
+    report("rebinding", measure(rebinding, args.reconnects, args.lost_timeout))
+    persistent = ServerReceiver((args.host, args.port + 1))
+    report("persistent", measure(persistent, args.reconnects, args.lost_timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+""" Compare sequential and pipelined remote procedure calls.
+
+    Sequential calls wait for each reply before sending the next request,
+    so each call costs a round trip. Pipelined calls are all sent before
+    waiting for their replies.
+
+    Usage: python benchmarks/rpc_pipelining.py --calls 5000 --size 128
+"""
+import argparse
+import time
+
+from socketlib import RpcClient, RpcServer
+
+
+def run(port: int, calls: int, size: int, pipelined: bool) -> float:
+    """ Returns the number of calls completed per second. """
+    address = ("localhost", port)
+    server = RpcServer(address, reconnect=False, timeout=1)
+    client = RpcClient(address, reconnect=False, timeout=1)
+    server.register("echo", lambda body: body)
+    client.coalesce = True
+    server.coalesce = True
+
+    server.start()
+    client.connect()
+    client.start()
+    body = b"x" * size
+    client.request("echo", body)  # Wait for the connection
+
+    start = time.perf_counter()
+    if pipelined:
+        futures = [client.call("echo", body) for _ in range(calls)]
+        for future in futures:
+            future.result()
+    else:
+        for _ in range(calls):
+            client.request("echo", body)
+    elapsed = time.perf_counter() - start
+
+    client.shutdown()
+    server.shutdown()
+    client.close_connection()
+    server.close_connection()
+    return calls / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=20000)
+    parser.add_argument("--calls", "-c", type=int, default=5000)
+    parser.add_argument("--size", "-s", type=int, default=128)
+    args = parser.parse_args()
+
+    for index, pipelined in enumerate((False, True)):
+        rate = run(args.port + index, args.calls, args.size, pipelined)
+        name = "pipelined" if pipelined else "sequential"
+        print(f"{name:>10}: {rate:,.0f} calls/s")
+
+
+if __name__ == "__main__":
+    main()
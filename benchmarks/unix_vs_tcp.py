@@ -0,0 +1,115 @@
+""" Compare the throughput and latency of loopback TCP and Unix domain sockets.
+
+    Throughput is measured by sending messages from a ClientSender to a
+    ServerReceiver. Latency is the round trip time of a message sent by a
+    Client to a Server that sends it back.
+
+    Usage: python benchmarks/unix_vs_tcp.py --messages 100000 --size 128 --round-trips 2000
+"""
+import argparse
+import os
+import queue
+import statistics
+import tempfile
+import threading
+import time
+
+from socketlib import (
+    Client,
+    ClientSender,
+    LengthPrefixFraming,
+    Server,
+    ServerReceiver,
+)
+from socketlib.basic.address import Address
+
+
+def throughput(address: Address, messages: int, size: int) -> float:
+    """ Returns the number of messages received per second. """
+    server = ServerReceiver(address, reconnect=False, timeout=1)
+    server.framing = LengthPrefixFraming()
+    server.batch_received = True
+    to_send = queue.Queue()
+    msg = b"x" * size
+    for _ in range(messages):
+        to_send.put(msg)
+    client = ClientSender(address, to_send, reconnect=False, timeout=1)
+    client.framing = LengthPrefixFraming()
+    client.coalesce = True
+
+    server.start()
+    client.connect()
+    start = time.perf_counter()
+    client.start()
+    received = 0
+    while received < messages:
+        received += len(server.received.get())
+    elapsed = time.perf_counter() - start
+
+    client.shutdown()
+    server.shutdown()
+    client.close_connection()
+    server.close_connection()
+    return messages / elapsed
+
+
+def latency(address: Address, round_trips: int, size: int) -> list[float]:
+    """ Returns the round trip time of each message in seconds. """
+    server = Server(address, reconnect=False, timeout=1)
+    client = Client(address, reconnect=False, timeout=1)
+    stop = threading.Event()
+
+    def echo():
+        while not stop.is_set():
+            try:
+                server.to_send.put(server.received.get(timeout=0.1))
+            except queue.Empty:
+                pass
+
+    echo_thread = threading.Thread(target=echo, daemon=True)
+    server.start()
+    client.connect()
+    client.start()
+    echo_thread.start()
+
+    msg = b"x" * size
+    times = []
+    for _ in range(round_trips):
+        start = time.perf_counter()
+        client.to_send.put(msg)
+        client.received.get()
+        times.append(time.perf_counter() - start)
+
+    stop.set()
+    client.shutdown()
+    server.shutdown()
+    client.close_connection()
+    server.close_connection()
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=20000)
+    parser.add_argument("--messages", "-m", type=int, default=100000)
+    parser.add_argument("--size", "-s", type=int, default=128)
+    parser.add_argument("--round-trips", "-r", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        addresses = {
+            "tcp": [(args.host, args.port), (args.host, args.port + 1)],
+            "unix": [os.path.join(directory, "throughput.sock"),
+                     os.path.join(directory, "latency.sock")],
+        }
+        for name, (throughput_address, latency_address) in addresses.items():
+            rate = throughput(throughput_address, args.messages, args.size)
+            times = [t * 1e6 for t in latency(latency_address, args.round_trips, args.size)]
+            print(f"{name:>4}: {rate:,.0f} msg/s, round trip median "
+                  f"{statistics.median(times):.1f} us, "
+                  f"p99 {statistics.quantiles(times, n=100)[98]:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,38 @@
+from .basic.backoff import Backoff
 from .basic.buffer import Buffer
+from .basic.channels import Channel, ChannelCodec, ChannelQueue
+from .basic.codecs import JsonCodec, StructCodec, TextCodec
+from .basic.compression import Compressor
+from .basic.datagram import SequenceTracker
+from .basic.delivery import DeliveryReport
+from .basic.files import FileTransfer
+from .basic.framing import DelimiterFraming, LengthPrefixFraming, VarintFraming
+from .basic.outbox import Outbox
+from .basic.session import Session, SessionCodec, SessionMessage, SessionQueue
 from .basic.send import encode_msg, send_msg
+from .basic.socket_options import SocketOptions
+from .basic.queues import LaneQueue
+from .basic.rate_limit import RateLimiter
+from .basic.rpc import RpcCodec, RpcMessage
 from .basic.receive import get_msg
-from .client.client import Client, ClientReceiver, ClientSender
+from .client.async_client import AsyncClient
+from .client.channel_client import ChannelClient
+from .client.datagram_sender import DatagramSender
+from .client.rpc_client import RpcClient
+from .client.session_client import SessionClient
+from .client.client_pool import ClientPool
+from .client.client import Client, ClientReceiver, ClientReportAlive, ClientSender
 from .services.abstract_service import AbstractService
+from .server.async_server import AsyncServer
+from .server.channel_server import ChannelServer
+from .server.datagram_receiver import DatagramReceiver
+from .server.multi_server import MultiServer
+from .server.publish_server import PublishServer
+from .server.rpc_server import RpcServer
+from .server.session_server import SessionServer
+from .server.sharded_server import ShardedServer
 from .server.server import Server, ServerReceiver, ServerSender
+from .exceptions.exceptions import RpcError
 from .utils.logger import get_module_logger
 from .utils.watch_dog import WatchDog
 
@@ -0,0 +1,47 @@
+import os
+import socket
+import stat
+
+# The IP address and port of a TCP socket, or the path of a Unix domain socket
+Address = tuple[str, int] | str | os.PathLike
+
+
+def is_unix_address(address: Address) -> bool:
+    """ True if the address is the path of a Unix domain socket. """
+    return not isinstance(address, tuple)
+
+
+def socket_address(address: Address) -> tuple[str, int] | str:
+    """ Returns the address in the form used by the socket methods. """
+    if is_unix_address(address):
+        return os.fspath(address)
+    return address
+
+
+def create_socket(address: Address, sock_type: int = socket.SOCK_STREAM) -> socket.socket:
+    """ Create a socket of the family of the given address. """
+    if is_unix_address(address):
+        return socket.socket(socket.AF_UNIX, sock_type)
+    return socket.socket(socket.AF_INET, sock_type)
+
+
+def bind_socket(sock: socket.socket, address: Address) -> None:
+    """ Bind a socket to an address. A Unix domain socket file left by
+        a previous server is removed first.
+    """
+    if is_unix_address(address):
+        remove_socket_file(address)
+    sock.bind(socket_address(address))
+
+
+def remove_socket_file(address: Address) -> None:
+    """ Remove the file of a Unix domain socket if it exists. Files that
+        are not sockets are not removed.
+    """
+    if not is_unix_address(address):
+        return
+    try:
+        if stat.S_ISSOCK(os.stat(address).st_mode):
+            os.unlink(address)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,44 @@
+import random
+from typing import Optional
+
+
+class Backoff:
+    """ Exponential backoff with full jitter for the delays between
+        connection attempts.
+
+        The delay before retry n is chosen at random between zero and
+        min(cap, base * 2 ** n) seconds, so clients that lose their connection
+        at the same time do not retry at the same time. Without jitter, the
+        delay is always the upper limit.
+    """
+
+    def __init__(
+            self,
+            base: float = 0.5,
+            cap: float = 30.,
+            jitter: bool = True,
+            seed: Optional[int] = None
+    ):
+        """
+            :param base: Upper limit of the delay of the first retry, in seconds.
+            :param cap: Maximum delay in seconds.
+            :param jitter: If true, delays are chosen at random below their upper limit.
+            :param seed: Optional seed of the random delays.
+        """
+        if base < 0 or cap < 0:
+            raise ValueError("Backoff delays cannot be negative")
+        self.base = base
+        self.cap = cap
+        self.jitter = jitter
+        self._random = random.Random(seed)
+
+    def limit(self, attempt: int) -> float:
+        """ Upper limit of the delay before a retry. Retries start at zero. """
+        return min(self.cap, self.base * 2 ** min(attempt, 64))
+
+    def delay(self, attempt: int) -> float:
+        """ Delay in seconds before a retry. Retries start at zero. """
+        limit = self.limit(attempt)
+        if self.jitter:
+            return self._random.uniform(0, limit)
+        return limit
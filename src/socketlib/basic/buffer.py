@@ -1,20 +1,284 @@
 import socket
 from typing import Optional
 
+from socketlib.basic.compression import Compressor
+from socketlib.basic.framing import DelimiterFraming, Framing
+from socketlib.exceptions.exceptions import FrameTooLargeError
+
 
 class Buffer:
+    """ Reads messages from a socket.
+
+        Received data is written directly into a growable bytearray with
+        `recv_into`, and messages are sliced out of it by moving a read
+        offset, so the cost of receiving a message is linear in its size.
+        The search for the end of a message resumes where the previous
+        search stopped instead of scanning all the received data again.
+
+        Messages are split with the given framing strategy. If no framing is
+        given, messages are delimited by the `msg_end` argument of `get_msg`
+        and `get_msgs`.
+
+        The memory used by the buffer can be bounded with a maximum frame size
+        and a maximum number of buffered bytes. A frame that exceeds either
+        limit is handled according to the oversize policy:
+
+        - "drop": the buffer behaves as if the socket was closed, so the
+          connection is dropped.
+        - "discard": the frame is discarded and reading continues with the next one.
+        - "raise": a FrameTooLargeError is raised.
+    """
+    oversize_policies = ("drop", "discard", "raise")
+
+    def __init__(
+            self,
+            sock: Optional[socket.socket],
+            recv_size: int = 8192,
+            framing: Optional[Framing] = None,
+            max_frame_size: Optional[int] = None,
+            max_buffered: Optional[int] = None,
+            oversize_policy: str = "drop",
+            compressor: Optional[Compressor] = None,
+    ):
+        """
+            :param sock: The socket to read from. Can be None if the data is given with `feed`.
+            :param recv_size: Maximum number of bytes read in each call to the socket.
+            :param framing: Optional framing strategy used to split messages.
+            :param max_frame_size: Optional maximum size in bytes of a frame, including its prefix and suffix.
+            :param max_buffered: Optional maximum number of bytes that the buffer holds.
+            :param oversize_policy: What to do with frames that are too large. Can be "drop",
+                "discard" or "raise".
+            :param compressor: Optional compressor used to decompress the messages. Decompressed
+                messages are limited to max_frame_size bytes, or to max_buffered bytes if it is not set.
+        """
+        if oversize_policy not in self.oversize_policies:
+            raise ValueError(f"Unexpected oversize policy {oversize_policy}")
+        if max_buffered is not None and max_buffered < 1:
+            raise ValueError("max_buffered must be positive")
 
-    def __init__(self, sock: socket.socket):
         self.socket = sock
-        self.buffer = b''
+        self.recv_size = recv_size
+        self.framing = framing
+        self.compressor = compressor
+        self._delimiter_framing = DelimiterFraming()
+
+        self.max_frame_size = max_frame_size
+        self.max_buffered = max_buffered
+        self.oversize_policy = oversize_policy
+        self.oversized_frames = 0  # Number of frames that exceeded the limits
+        self._discard = None  # type: Optional[int]
+        self._dropped = False
+
+        self._data = bytearray(recv_size)
+        self._start = 0  # Start of the data that has not been returned yet
+        self._end = 0  # End of the received data
+        self._scan = 0  # Position where the search for the message end resumes
+        self._pending = 0  # Bytes missing to complete the current frame, if known
+
+    @property
+    def buffer(self) -> bytes:
+        """ The received bytes that have not been returned as a message yet. """
+        return bytes(self._data[self._start:self._end])
+
+    @property
+    def dropped(self) -> bool:
+        """ True if the connection must be dropped due to an oversized frame. """
+        return self._dropped
+
+    def __len__(self) -> int:
+        return self._end - self._start
 
     def get_msg(self, msg_end: bytes = b"\r\n") -> Optional[bytes]:
         """ Get a message from the socket until the end of message is reached.
+
+            Returns None if the socket is closed.
+        """
+        framing = self._get_framing(msg_end)
+        while True:
+            msg = self._next_msg(framing)
+            if msg is not None:
+                return msg
+            if self._dropped or not self._recv():  # socket closed
+                return None
+
+    def get_msgs(self, msg_end: bytes = b"\r\n") -> Optional[list[bytes]]:
+        """ Get all the complete messages available in the buffer. If there
+            are none, reads from the socket until there is at least one.
+
+            Returns None if the socket is closed.
         """
-        while msg_end not in self.buffer:
-            data = self.socket.recv(1024)
-            if not data:  # socket closed
+        framing = self._get_framing(msg_end)
+        messages = []
+        while True:
+            msg = self._next_msg(framing)
+            while msg is not None:
+                messages.append(msg)
+                msg = self._next_msg(framing)
+            if messages:
+                return messages
+            if self._dropped or not self._recv():  # socket closed
                 return None
-            self.buffer += data
-        msg, sep, self.buffer = self.buffer.partition(b'\r\n')
+
+    def recv_msgs(self, msg_end: bytes = b"\r\n") -> Optional[list[bytes]]:
+        """ Read from the socket once and return all the complete messages
+            available, which may be none.
+
+            Meant for non-blocking sockets that are ready to be read. Returns
+            None if the socket is closed or the connection must be dropped.
+        """
+        if self._dropped or not self._recv():
+            return None
+        return self._available_msgs(self._get_framing(msg_end))
+
+    def feed(self, data: bytes, msg_end: bytes = b"\r\n") -> Optional[list[bytes]]:
+        """ Add data that was received by other means, such as an asyncio
+            stream, and return all the complete messages available, which may be none.
+
+            Returns None if the connection must be dropped.
+        """
+        if self._dropped:
+            return None
+        self._reserve(len(data))
+        self._data[self._end:self._end + len(data)] = data
+        self._end += len(data)
+        return self._available_msgs(self._get_framing(msg_end))
+
+    def _available_msgs(self, framing: Framing) -> Optional[list[bytes]]:
+        messages = []
+        msg = self._next_msg(framing)
+        while msg is not None:
+            messages.append(msg)
+            msg = self._next_msg(framing)
+        if self._dropped:
+            return None
+        return messages
+
+    def _get_framing(self, msg_end: bytes) -> Framing:
+        if self.framing is not None:
+            return self.framing
+        if self._delimiter_framing.delimiter != msg_end:
+            self._delimiter_framing = DelimiterFraming(msg_end)
+        return self._delimiter_framing
+
+    def _next_msg(self, framing: Framing) -> Optional[bytes]:
+        """ Returns the next complete message in the buffer or None if there
+            isn't one.
+        """
+        if self._discard is not None and not self._discard_frame(framing):
+            return None
+
+        frame = framing.find(self._data, self._start, self._end, self._scan)
+        if frame is None:
+            self._scan = framing.resume_from(self._start, self._end)
+            size = framing.frame_size(self._data, self._start, self._end)
+            if size is not None:
+                if self._is_too_large(size):
+                    return self._oversized(framing, size)
+                # Read the rest of the frame at once
+                self._pending = self._start + size - self._end
+            elif self._is_too_large(self._end - self._start + 1):
+                return self._oversized(framing, None)
+            return None
+
+        payload_start, payload_end, frame_end = frame
+        if self._is_too_large(frame_end - self._start):
+            return self._oversized(framing, frame_end - self._start)
+
+        msg = bytes(self._data[payload_start:payload_end])
+        self._consume(frame_end)
+        if self.compressor is not None:
+            # A frame cannot expand into a payload larger than the frames accepted
+            max_length = self.max_frame_size if self.max_frame_size is not None else self.max_buffered
+            return self.compressor.decompress(msg, max_length)
         return msg
+
+    def _consume(self, position: int) -> None:
+        """ Mark the data up to the given position as read. """
+        self._start = self._scan = position
+        self._pending = 0
+        if self._start == self._end:
+            self._start = self._end = self._scan = 0
+
+    def _is_too_large(self, frame_size: int) -> bool:
+        if self.max_frame_size is not None and frame_size > self.max_frame_size:
+            return True
+        return self.max_buffered is not None and frame_size > self.max_buffered
+
+    def _oversized(self, framing: Framing, size: Optional[int]) -> Optional[bytes]:
+        """ Handle a frame that is too large according to the oversize policy.
+
+            :param size: The size of the frame, or None if it is not known.
+        """
+        self.oversized_frames += 1
+        if self.oversize_policy == "raise":
+            if size is None:
+                raise FrameTooLargeError("Frame exceeds the maximum size")
+            raise FrameTooLargeError(f"Frame of size {size} exceeds the maximum size")
+        elif self.oversize_policy == "drop":
+            self._dropped = True
+            self._consume(self._end)
+            return None
+
+        # Discard the frame. If its size is not known, discard until its end is found
+        self._discard = size if size is not None else -1
+        return self._next_msg(framing)
+
+    def _discard_frame(self, framing: Framing) -> bool:
+        """ Discard the data of an oversized frame that is available in the
+            buffer. Returns true when the whole frame has been discarded.
+        """
+        if self._discard == -1:
+            frame = framing.find(self._data, self._start, self._end, self._scan)
+            if frame is None:
+                # Keep only the data that may be the start of the frame end
+                self._consume(framing.resume_from(self._start, self._end))
+                return False
+            self._discard = None
+            self._consume(frame[2])
+            return True
+
+        n_bytes = min(self._discard, self._end - self._start)
+        self._discard -= n_bytes
+        self._consume(self._start + n_bytes)
+        if self._discard > 0:
+            return False
+        self._discard = None
+        return True
+
+    def _recv(self) -> bool:
+        """ Read data from the socket into the buffer. Returns false if the
+            socket was closed.
+        """
+        size = max(self.recv_size, self._pending)
+        if self.max_buffered is not None:
+            size = max(min(size, self.max_buffered - (self._end - self._start)), 1)
+        self._reserve(size)
+        with memoryview(self._data) as view:
+            n_bytes = self.socket.recv_into(view[self._end:self._end + size])
+        if not n_bytes:
+            return False
+        self._end += n_bytes
+        return True
+
+    def _reserve(self, size: int) -> None:
+        """ Make room for at least `size` bytes after the received data.
+        """
+        if len(self._data) - self._end >= size:
+            return
+
+        unread = self._end - self._start
+        if unread + size > len(self._data):
+            # Grow geometrically so that receiving a large message
+            # takes amortized linear time
+            new_size = 2 * len(self._data)
+            if self.max_buffered is not None:
+                new_size = min(new_size, self.max_buffered)
+            new_size = max(new_size, unread + size)
+            self._data.extend(bytes(new_size - len(self._data)))
+
+        if self._start > 0:
+            # Move the unread data to the front of the buffer
+            self._data[:unread] = self._data[self._start:self._end]
+            self._scan -= self._start
+            self._start = 0
+            self._end = unread
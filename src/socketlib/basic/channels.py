@@ -0,0 +1,289 @@
+import collections
+import concurrent.futures
+import logging
+import queue
+import struct
+import threading
+from typing import Any, Optional
+
+from socketlib.basic.codecs import Codec
+from socketlib.basic.delivery import Delivery
+from socketlib.exceptions.exceptions import CodecError
+
+
+class ChannelCodec(Codec):
+    """ Converts the messages of a multiplexed connection to and from bytes.
+
+        Messages are tuples with a channel id and a payload. Each frame starts
+        with the channel id, followed by the payload. Payloads are converted with
+        the codec of their channel, or with the default codec if their channel
+        has none. Without a codec, payloads must be strings or bytes and are
+        decoded as bytes.
+
+        The header is binary, so this codec must be used with a length prefixed framing.
+    """
+    header = struct.Struct("!H")
+
+    def __init__(
+            self,
+            codec: Optional[Codec] = None,
+            codecs: Optional[dict[int, Codec]] = None,
+            encoding: str = "utf-8"
+    ):
+        """
+            :param codec: Default codec of the payloads.
+            :param codecs: Optional codec of the payloads of each channel.
+            :param encoding: Encoding of string payloads sent without a codec.
+        """
+        self.codec = codec
+        self.codecs = codecs if codecs is not None else {}
+        self.encoding = encoding
+
+    def encode(self, msg: tuple[int, Any]) -> bytes:
+        try:
+            channel_id, payload = msg
+            header = self.header.pack(channel_id)
+        except (TypeError, ValueError, struct.error) as err:
+            raise CodecError(f"Cannot encode channel message: {err}")
+        codec = self.codecs.get(channel_id, self.codec)
+        if codec is not None:
+            return header + codec.encode(payload)
+        if isinstance(payload, str):
+            return header + payload.encode(self.encoding)
+        if isinstance(payload, (bytes, bytearray, memoryview)):
+            return header + payload
+        raise CodecError(f"Cannot encode payload of type {type(payload).__name__}")
+
+    def decode(self, data: bytes) -> tuple[int, Any]:
+        try:
+            channel_id, = self.header.unpack_from(data)
+        except struct.error as err:
+            raise CodecError(f"Cannot decode channel message: {err}")
+        payload = data[self.header.size:]
+        codec = self.codecs.get(channel_id, self.codec)
+        if codec is not None:
+            payload = codec.decode(payload)
+        return channel_id, payload
+
+
+class ChannelQueue:
+    """ The to_send queue of a multiplexed connection.
+
+        Each channel has its own queue of items. Channels with items are served
+        in turns, one item at a time, so a channel with many items to send does
+        not delay the items of the other channels by more than one item each.
+
+        Has the same interface as queue.Queue, except for join and task_done.
+        Items put without a channel go to channel 0.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        """
+            :param maxsize: Maximum number of items in each channel. If zero, channels are unbounded.
+        """
+        self.maxsize = maxsize
+        self._channels = {}  # type: dict[int, collections.deque]
+        self._ready = collections.deque()  # Channels with items, in serving order
+        self._size = 0
+
+        self._mutex = threading.Lock()
+        self._not_empty = threading.Condition(self._mutex)
+        self._not_full = threading.Condition(self._mutex)
+
+    def qsize(self, channel: Optional[int] = None) -> int:
+        """ Number of items in the queue, or in a channel if one is given. """
+        with self._mutex:
+            if channel is None:
+                return self._size
+            return len(self._channels.get(channel, ()))
+
+    def empty(self) -> bool:
+        with self._mutex:
+            return self._size == 0
+
+    def put(
+            self,
+            item: Any,
+            block: bool = True,
+            timeout: Optional[float] = None,
+            channel: int = 0
+    ) -> None:
+        """ Put an item in the queue of a channel. """
+        with self._not_full:
+            items = self._channels.get(channel)
+            if items is None:
+                items = self._channels[channel] = collections.deque()
+            if 0 < self.maxsize <= len(items):
+                if not block:
+                    raise queue.Full
+                if not self._not_full.wait_for(
+                        lambda: len(items) < self.maxsize, timeout):
+                    raise queue.Full
+            if not items:
+                self._ready.append(channel)
+            items.append(item)
+            self._size += 1
+            self._not_empty.notify()
+
+    def put_nowait(self, item: Any, channel: int = 0) -> None:
+        self.put(item, block=False, channel=channel)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        with self._not_empty:
+            if self._size == 0:
+                if not block:
+                    raise queue.Empty
+                if not self._not_empty.wait_for(lambda: self._size > 0, timeout):
+                    raise queue.Empty
+            channel = self._ready.popleft()
+            items = self._channels[channel]
+            item = items.popleft()
+            if items:
+                self._ready.append(channel)
+            self._size -= 1
+            self._not_full.notify_all()
+            return item
+
+    def get_nowait(self) -> Any:
+        return self.get(block=False)
+
+
+class ChannelSendQueue:
+    """ The to_send queue of a channel. Items put in it are sent through
+        the connection of the channel.
+    """
+
+    def __init__(self, channel_id: int, send_queue: ChannelQueue):
+        self._channel_id = channel_id
+        self._send_queue = send_queue
+
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None) -> None:
+        self._send_queue.put(
+            (self._channel_id, item), block, timeout, channel=self._channel_id)
+
+    def put_nowait(self, item: Any) -> None:
+        self.put(item, block=False)
+
+    def qsize(self) -> int:
+        return self._send_queue.qsize(self._channel_id)
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+
+class Channel:
+    """ A logical stream of messages that shares a connection with other channels.
+
+        Messages put in its to_send queue are sent with its channel id, and the
+        messages received with its id are put in its received queue. If the
+        received queue is full, received messages are dropped, so a channel that
+        is not read does not stop the other channels.
+    """
+
+    def __init__(self, channel_id: int, send_queue: ChannelQueue, maxsize: int = 0):
+        self.id = channel_id
+        self._send_queue = send_queue
+        self._to_send = ChannelSendQueue(channel_id, send_queue)
+        self._received = queue.Queue(maxsize)  # type: queue.Queue[Any]
+        self.dropped = 0  # Received messages dropped because the queue was full
+
+    @property
+    def received(self) -> queue.Queue[Any]:
+        return self._received
+
+    @property
+    def to_send(self) -> ChannelSendQueue:
+        return self._to_send
+
+    def submit(self, msg: Any) -> concurrent.futures.Future:
+        """ Put a message in the to_send queue and return a future that is
+            resolved when the message has been written to the socket.
+        """
+        delivery = Delivery((self.id, msg))
+        self._send_queue.put(delivery, channel=self.id)
+        return delivery.future
+
+
+class Channels:
+    """ The channels of a multiplexed connection. Channels are opened when
+        they are first used by either end of the connection.
+
+        The number of open channels can be bounded with max_channels, so a peer
+        cannot open an unlimited number of them. Messages of channels that are not
+        open are dropped if the limit has been reached, or if open_on_receive is false.
+    """
+
+    def __init__(
+            self,
+            send_queue: ChannelQueue,
+            maxsize: int = 0,
+            max_channels: Optional[int] = None,
+            logger: Optional[logging.Logger] = None,
+            name: str = ""
+    ):
+        """
+            :param send_queue: The to_send queue of the connection.
+            :param maxsize: Maximum number of messages in the received queue of each channel.
+            :param max_channels: Maximum number of open channels. If None, there is no limit.
+            :param logger: Optional logger.
+            :param name: Name used in the log messages.
+        """
+        self.maxsize = maxsize
+        self.max_channels = max_channels
+        # If false, only the channels opened with get receive messages
+        self.open_on_receive = True
+        self.rejected = 0  # Received messages dropped because their channel was not open
+        self._send_queue = send_queue
+        self._channels = {}  # type: dict[int, Channel]
+        self._lock = threading.Lock()
+        self._logger = logger
+        self._name = name
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def __contains__(self, channel_id: int) -> bool:
+        return channel_id in self._channels
+
+    def ids(self) -> list[int]:
+        return list(self._channels)
+
+    def get(self, channel_id: int) -> Channel:
+        """ Returns a channel, opening it if it does not exist. Raises a ValueError
+            if the id is invalid or max_channels channels are open.
+        """
+        channel = self._channels.get(channel_id)
+        if channel is None:
+            if not 0 <= channel_id <= 0xFFFF:
+                raise ValueError(f"Invalid channel id {channel_id}")
+            with self._lock:
+                channel = self._channels.get(channel_id)
+                if channel is None:
+                    if self.max_channels is not None and len(self._channels) >= self.max_channels:
+                        raise ValueError(
+                            f"Cannot open channel {channel_id}. {self.max_channels} channels are open")
+                    channel = Channel(channel_id, self._send_queue, self.maxsize)
+                    self._channels[channel_id] = channel
+        return channel
+
+    def dispatch(self, msg: tuple[int, Any]) -> None:
+        """ Put a received message in the received queue of its channel. """
+        channel_id, payload = msg
+        channel = self._channels.get(channel_id)
+        if channel is None:
+            try:
+                if not self.open_on_receive:
+                    raise ValueError(f"Channel {channel_id} is not open")
+                channel = self.get(channel_id)
+            except ValueError as err:
+                self.rejected += 1
+                if self._logger:
+                    self._logger.debug(f"{self._name} dropped a message. {err}")
+                return
+        try:
+            channel.received.put_nowait(payload)
+        except queue.Full:
+            channel.dropped += 1
+            if self._logger:
+                self._logger.debug(
+                    f"{self._name} dropped a message of channel {channel_id}. Queue full")
@@ -0,0 +1,130 @@
+import abc
+import collections
+import json
+import struct
+from typing import Any, Iterable, Optional
+
+from socketlib.exceptions.exceptions import CodecError
+
+
+class Codec(abc.ABC):
+    """ Abstract base class for the codecs that convert messages to bytes
+        before they are sent and bytes to messages after they are received.
+
+        Codecs raise a CodecError when a message cannot be encoded or decoded.
+    """
+
+    @abc.abstractmethod
+    def encode(self, msg: Any) -> bytes:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def decode(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+    def decode_many(self, data: Iterable[bytes]) -> list[Any]:
+        """ Decode several messages. """
+        decode = self.decode
+        return [decode(msg) for msg in data]
+
+
+class TextCodec(Codec):
+    """ Messages are strings. """
+
+    def __init__(self, encoding: str = "utf-8", errors: str = "strict"):
+        self.encoding = encoding
+        self.errors = errors
+
+    def encode(self, msg: str) -> bytes:
+        try:
+            return msg.encode(self.encoding, self.errors)
+        except (AttributeError, UnicodeError) as err:
+            raise CodecError(f"Cannot encode message: {err}")
+
+    def decode(self, data: bytes) -> str:
+        try:
+            return data.decode(self.encoding, self.errors)
+        except UnicodeError as err:
+            raise CodecError(f"Cannot decode message: {err}")
+
+
+class JsonCodec(Codec):
+    """ Messages are objects that can be serialized to JSON. """
+
+    def __init__(self, encoding: str = "utf-8"):
+        self.encoding = encoding
+        self._encoder = json.JSONEncoder(separators=(",", ":"))
+
+    def encode(self, msg: Any) -> bytes:
+        try:
+            return self._encoder.encode(msg).encode(self.encoding)
+        except (TypeError, ValueError) as err:
+            raise CodecError(f"Cannot encode message: {err}")
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            return json.loads(data)
+        except ValueError as err:
+            raise CodecError(f"Cannot decode message: {err}")
+
+
+class StructCodec(Codec):
+    """ Messages are records with a fixed binary layout described by a
+        `struct` format string.
+
+        Records are packed and unpacked directly from bytes with a precompiled
+        `struct.Struct`. If field names are given, decoded records are named tuples,
+        otherwise they are tuples.
+
+        Binary records may contain any byte, so this codec should be used with a
+        length prefixed framing.
+    """
+
+    def __init__(self, fmt: str, names: Optional[Iterable[str]] = None):
+        """
+            :param fmt: The struct format string of a record. For example "!Idd".
+            :param names: Optional names of the fields of a record.
+        """
+        self._struct = struct.Struct(fmt)
+        self._record = None
+        if names is not None:
+            self._record = collections.namedtuple("Record", names)
+
+    @property
+    def size(self) -> int:
+        """ The size in bytes of an encoded record. """
+        return self._struct.size
+
+    def encode(self, msg: tuple) -> bytes:
+        try:
+            return self._struct.pack(*msg)
+        except (struct.error, TypeError) as err:
+            raise CodecError(f"Cannot encode message: {err}")
+
+    def decode(self, data: bytes) -> tuple:
+        try:
+            if self._record is not None:
+                return self._record._make(self._struct.unpack(data))
+            return self._struct.unpack(data)
+        except struct.error as err:
+            raise CodecError(f"Cannot decode message: {err}")
+
+    def decode_many(self, data: Iterable[bytes]) -> list[tuple]:
+        unpack = self._struct.unpack
+        try:
+            if self._record is not None:
+                make = self._record._make
+                return [make(unpack(msg)) for msg in data]
+            return [unpack(msg) for msg in data]
+        except struct.error as err:
+            raise CodecError(f"Cannot decode message: {err}")
+
+    def decode_records(self, data: bytes) -> list[tuple]:
+        """ Decode a message that contains several consecutive records. """
+        try:
+            records = self._struct.iter_unpack(data)
+        except struct.error as err:
+            raise CodecError(f"Cannot decode message: {err}")
+        if self._record is not None:
+            return list(map(self._record._make, records))
+        return list(records)
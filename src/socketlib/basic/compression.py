@@ -0,0 +1,181 @@
+import threading
+import time
+import zlib
+from typing import Optional
+
+from socketlib.basic.framing import DelimiterFraming, Framing
+from socketlib.exceptions.exceptions import CompressionError, FramingError
+
+
+class Compressor:
+    """ Compresses the payload of frames with zlib.
+
+        Each compressed payload starts with a flag byte that tells whether the rest
+        of the payload is compressed, so payloads smaller than the threshold, like
+        heartbeats, are sent without compression.
+
+        Two modes are available:
+
+        - "frame": each payload is compressed independently.
+        - "stream": payloads are compressed with a zlib stream shared by all
+          the frames of a connection, so each frame benefits from the history
+          of the previous ones. Frames must be decompressed in the same order
+          they were compressed, and `reset` must be called on every new connection.
+
+        An optional preset dictionary with data that is common in the messages
+        improves the compression of small payloads. Both ends of the connection
+        must use the same mode and dictionary.
+
+        Decompressed payloads are limited to max_length bytes, so a small frame
+        cannot expand into a huge payload.
+
+        The same compressor can compress in one thread and decompress in another.
+    """
+    modes = ("frame", "stream")
+
+    _raw = b"\x00"
+    _compressed = b"\x01"
+
+    def __init__(
+            self,
+            mode: str = "frame",
+            level: int = 6,
+            threshold: int = 64,
+            zdict: Optional[bytes] = None,
+            max_length: Optional[int] = 64 << 20,
+    ):
+        """
+            :param mode: The compression mode. Can be "frame" or "stream".
+            :param level: The zlib compression level, from 0 to 9.
+            :param threshold: Payloads smaller than this number of bytes are not compressed.
+            :param zdict: Optional preset compression dictionary.
+            :param max_length: Maximum size in bytes of a decompressed payload, used when
+                decompress is not given one. If None, there is no limit.
+        """
+        if mode not in self.modes:
+            raise ValueError(f"Unexpected compression mode {mode}")
+        self.mode = mode
+        self.level = level
+        self.threshold = threshold
+        self.zdict = zdict
+        self.max_length = max_length
+
+        self._compress_lock = threading.Lock()
+        self._decompress_lock = threading.Lock()
+        self._compress_obj = None
+        self._decompress_obj = None
+        self.reset()
+
+        self.bytes_in = 0  # Size of the payloads before compression
+        self.bytes_out = 0  # Size of the payloads after compression
+        self.compress_time = 0.  # CPU time spent compressing in seconds
+        self.decompress_time = 0.  # CPU time spent decompressing in seconds
+
+    @property
+    def ratio(self) -> float:
+        """ The ratio between the size of the payloads before and after compression. """
+        if self.bytes_out == 0:
+            return 1.
+        return self.bytes_in / self.bytes_out
+
+    def stats(self) -> dict[str, float]:
+        """ Returns the compression statistics. """
+        return {
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": self.ratio,
+            "compress_time": self.compress_time,
+            "decompress_time": self.decompress_time,
+        }
+
+    def copy(self) -> "Compressor":
+        """ Returns a new compressor with the same configuration, to be
+            used by another connection.
+        """
+        return Compressor(self.mode, self.level, self.threshold, self.zdict, self.max_length)
+
+    def reset(self) -> None:
+        """ Start new compression streams. Must be called when a new
+            connection is established.
+        """
+        with self._compress_lock:
+            self._compress_obj = self._new_compress_obj()
+        with self._decompress_lock:
+            self._decompress_obj = self._new_decompress_obj()
+
+    def _new_compress_obj(self):
+        if self.zdict is not None:
+            return zlib.compressobj(self.level, zdict=self.zdict)
+        return zlib.compressobj(self.level)
+
+    def _new_decompress_obj(self):
+        if self.zdict is not None:
+            return zlib.decompressobj(zdict=self.zdict)
+        return zlib.decompressobj()
+
+    def compress(self, payload: bytes) -> bytes:
+        """ Compress a payload. """
+        if len(payload) < self.threshold:
+            self.bytes_in += len(payload)
+            self.bytes_out += len(payload) + 1
+            return self._raw + payload
+
+        start = time.thread_time()
+        with self._compress_lock:
+            if self.mode == "stream":
+                compressed = (self._compress_obj.compress(payload)
+                              + self._compress_obj.flush(zlib.Z_SYNC_FLUSH))
+            elif self.zdict is not None:
+                compress_obj = self._compress_obj.copy()
+                compressed = compress_obj.compress(payload) + compress_obj.flush()
+            else:
+                compressed = zlib.compress(payload, self.level)
+        self.compress_time += time.thread_time() - start
+
+        self.bytes_in += len(payload)
+        self.bytes_out += len(compressed) + 1
+        return self._compressed + compressed
+
+    def decompress(self, payload: bytes, max_length: Optional[int] = None) -> bytes:
+        """ Decompress a payload compressed by a compressor with the same
+            configuration. Raises a CompressionError if the decompressed payload
+            is larger than max_length bytes, which defaults to the max_length attribute.
+        """
+        if not payload:
+            raise CompressionError("Empty payload")
+        flag = payload[:1]
+        if flag == self._raw:
+            return payload[1:]
+        elif flag != self._compressed:
+            raise CompressionError("Invalid compression flag")
+
+        if max_length is None:
+            max_length = self.max_length
+        # Asking for one byte more tells whether the payload exceeds the limit
+        limit = max_length + 1 if max_length is not None else 0
+
+        start = time.thread_time()
+        try:
+            with self._decompress_lock:
+                if self.mode == "stream":
+                    decompressed = self._decompress_obj.decompress(payload[1:], limit)
+                elif self.zdict is not None or limit:
+                    decompress_obj = self._new_decompress_obj()
+                    decompressed = decompress_obj.decompress(payload[1:], limit)
+                else:
+                    decompressed = zlib.decompress(payload[1:])
+        except zlib.error as err:
+            raise CompressionError(f"Failed to decompress payload: {err}")
+        self.decompress_time += time.thread_time() - start
+        if limit and len(decompressed) > max_length:
+            raise CompressionError(f"Decompressed payload larger than {max_length} bytes")
+        return decompressed
+
+
+def check_framing(compressor: Optional[Compressor], framing: Optional[Framing]) -> None:
+    """ Raises a FramingError if frames compressed by the compressor cannot be
+        split with the framing. Compressed payloads may contain any byte, so
+        they require a length prefixed framing.
+    """
+    if compressor is not None and (framing is None or isinstance(framing, DelimiterFraming)):
+        raise FramingError("Compression requires a length prefixed framing")
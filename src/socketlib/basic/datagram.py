@@ -0,0 +1,115 @@
+import selectors
+import socket
+import struct
+from typing import Any, Optional
+
+# Sequence number that precedes the payload of each datagram
+SEQUENCE_HEADER = struct.Struct("!I")
+# Largest payload of a UDP datagram over IPv4
+MAX_DATAGRAM_SIZE = 65507
+
+
+class SequenceTracker:
+    """ Counts the datagrams that are lost or arrive out of order from the
+        sequence numbers of each source.
+
+        A datagram whose sequence number is ahead of the expected one counts the
+        datagrams in between as lost. A datagram that is behind it arrived late,
+        and it is no longer counted as lost by its source. If it is behind by more
+        than `reorder_window` datagrams, the source is assumed to have restarted.
+
+        Datagrams without a source address, such as those of unbound Unix domain
+        sockets, cannot be told apart by sender. They are counted as received and
+        untracked, but not as lost or late.
+    """
+    modulo = 2 ** 32
+
+    def __init__(self, reorder_window: int = 1024):
+        self.reorder_window = reorder_window
+        self.received = 0
+        self.lost = 0
+        self.late = 0
+        self.restarts = 0
+        self.untracked = 0  # Datagrams without a source address
+        self._expected = {}  # type: dict[Any, int]
+        self._lost = {}  # type: dict[Any, int]
+
+    def update(self, source: Any, sequence: int) -> bool:
+        """ Register a datagram. Returns false if it arrived late. """
+        self.received += 1
+        if source is None or source == "" or source == b"":
+            self.untracked += 1
+            return True
+        expected = self._expected.get(source)
+        if expected is not None:
+            ahead = (sequence - expected) % self.modulo
+            if ahead < self.modulo // 2:
+                self.lost += ahead
+                self._lost[source] = self._lost.get(source, 0) + ahead
+            elif (expected - sequence) % self.modulo <= self.reorder_window:
+                self.late += 1
+                if self._lost.get(source, 0) > 0:
+                    self._lost[source] -= 1
+                    self.lost -= 1
+                return False
+            else:
+                self.restarts += 1
+        self._expected[source] = (sequence + 1) % self.modulo
+        return True
+
+    def lost_from(self, source: Any) -> int:
+        """ Number of datagrams of a source that were lost. """
+        return self._lost.get(source, 0)
+
+    def loss_ratio(self) -> float:
+        """ Fraction of the datagrams that were sent and did not arrive. """
+        total = self.received + self.lost
+        return self.lost / total if total else 0.
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "received": self.received,
+            "lost": self.lost,
+            "late": self.late,
+            "restarts": self.restarts,
+            "untracked": self.untracked,
+            "loss_ratio": self.loss_ratio(),
+        }
+
+
+def recv_datagrams(
+        sock: socket.socket,
+        buffer: bytearray,
+        max_count: int,
+        timeout: Optional[float] = None,
+        selector: Optional[selectors.BaseSelector] = None,
+) -> list[tuple[bytes, Any]]:
+    """ Receive the datagrams that are waiting in a non-blocking socket, up to
+        max_count of them. Waits up to timeout seconds for the first one.
+
+        Returns a list of tuples with the payload and the address of the sender
+        of each datagram. The list is empty if the timeout expires.
+
+        :param buffer: Buffer where the datagrams are read. Must be as large as
+            the largest expected datagram, larger datagrams are truncated.
+        :param selector: A selector where the socket is registered for reading. Pass
+            one when calling this function in a loop so it is not created every time.
+    """
+    if selector is None:
+        with selectors.DefaultSelector() as selector:
+            selector.register(sock, selectors.EVENT_READ)
+            readable = selector.select(timeout)
+    else:
+        readable = selector.select(timeout)
+    if not readable:
+        return []
+
+    view = memoryview(buffer)
+    datagrams = []
+    while len(datagrams) < max_count:
+        try:
+            size, address = sock.recvfrom_into(buffer)
+        except (BlockingIOError, InterruptedError):
+            break
+        datagrams.append((bytes(view[:size]), address))
+    return datagrams
@@ -0,0 +1,83 @@
+import concurrent.futures
+import time
+from typing import Any, NamedTuple, Optional
+
+
+class DeliveryReport(NamedTuple):
+    """ The result of a delivery future. """
+    queue_wait: float  # Seconds the message waited in the send queue
+    write_time: float  # Seconds it took to write the message to the socket
+
+
+class Delivery:
+    """ A message put in a send queue together with a future that is resolved
+        when the message has been fully written to the socket.
+
+        The future's result is a DeliveryReport. If the message cannot be encoded
+        or the connection fails while it is being written, the future fails with
+        the exception. If the future is cancelled before the message is taken
+        from the queue, the message is not sent.
+    """
+
+    def __init__(self, msg: Any):
+        self.msg = msg
+        self.future = concurrent.futures.Future()
+        self._submitted = time.perf_counter()
+        self._taken = self._submitted
+
+    def start(self) -> bool:
+        """ Called when the message is taken from the queue. Returns false
+            if the future was cancelled, in which case the message must not be sent.
+        """
+        self._taken = time.perf_counter()
+        return self.future.set_running_or_notify_cancel()
+
+    def done(self, write_start: float, write_end: float) -> None:
+        """ Called when the message has been written to the socket. """
+        self.future.set_result(DeliveryReport(
+            queue_wait=self._taken - self._submitted,
+            write_time=write_end - write_start,
+        ))
+
+    def fail(self, error: BaseException) -> None:
+        """ Called when the message could not be sent. """
+        self.future.set_exception(error)
+
+
+class FanoutDelivery:
+    """ Tracks a delivery whose message is written to several sockets.
+
+        Used in place of the delivery for each socket. The future of the delivery
+        is resolved once the message has been written to all of them, and fails
+        with the first error.
+    """
+
+    def __init__(self, delivery: Delivery, count: int):
+        """
+            :param delivery: The delivery of the message.
+            :param count: Number of sockets the message is written to.
+        """
+        self._delivery = delivery
+        self._remaining = count
+        self._write_start = None  # type: Optional[float]
+        self._write_end = None  # type: Optional[float]
+        if count == 0:
+            now = time.perf_counter()
+            delivery.done(now, now)
+
+    def done(self, write_start: float, write_end: float) -> None:
+        """ Called when the message has been written to one of the sockets. """
+        if self._delivery.future.done():
+            return
+        if self._write_start is None or write_start < self._write_start:
+            self._write_start = write_start
+        if self._write_end is None or write_end > self._write_end:
+            self._write_end = write_end
+        self._remaining -= 1
+        if self._remaining == 0:
+            self._delivery.done(self._write_start, self._write_end)
+
+    def fail(self, error: BaseException) -> None:
+        """ Called when the message could not be written to one of the sockets. """
+        if not self._delivery.future.done():
+            self._delivery.fail(error)
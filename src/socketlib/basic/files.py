@@ -0,0 +1,179 @@
+import logging
+import os
+import socket
+from typing import BinaryIO, Optional
+
+from socketlib.basic.framing import Framing
+from socketlib.exceptions.exceptions import FramingError
+
+
+class FileTransfer:
+    """ A file, or a range of bytes of it, that is sent as a single message.
+
+        File transfers can be put in the to_send queue of clients and servers
+        together with other messages. The file is streamed to the socket with
+        `socket.sendfile`, so its contents are not copied through Python.
+    """
+
+    def __init__(
+            self,
+            path: str | os.PathLike,
+            offset: int = 0,
+            count: Optional[int] = None
+    ):
+        """
+            :param path: Path to the file.
+            :param offset: Position of the file where the message starts.
+            :param count: Number of bytes to send. If None, the file is sent until its end.
+        """
+        if offset < 0 or (count is not None and count < 0):
+            raise ValueError("Offset and count cannot be negative")
+        self.path = path
+        self.offset = offset
+        self.count = count
+
+    def size(self, file_size: int) -> int:
+        """ The number of bytes that will be sent from a file of the given size. """
+        available = max(file_size - self.offset, 0)
+        if self.count is None:
+            return available
+        return min(self.count, available)
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}({self.path!r}, "
+                f"offset={self.offset}, count={self.count})")
+
+
+class FileFrame:
+    """ A file framed like a message, that is written to a non-blocking socket
+        in several steps.
+
+        The file is streamed with `os.sendfile`, where it is available, from its
+        own offset, so the same file can be written to several sockets at once.
+    """
+
+    def __init__(self, file: BinaryIO, offset: int, size: int, prefix: bytes, suffix: bytes):
+        """
+            :param file: The open file. It is closed when the frame has been written,
+                or with `close`.
+            :param offset: Position of the file where the message starts.
+            :param size: Number of bytes of the file that are sent.
+            :param prefix: Bytes written before the file, like a length prefix.
+            :param suffix: Bytes written after the file, like a delimiter.
+        """
+        self.file = file
+        self._offset = offset
+        self._remaining = size
+        self._prefix = memoryview(prefix)
+        self._suffix = memoryview(suffix)
+
+    def __len__(self) -> int:
+        """ Number of bytes that are still to be written. """
+        return len(self._prefix) + self._remaining + len(self._suffix)
+
+    def send(self, sock: socket.socket) -> None:
+        """ Write the rest of the frame. Raises BlockingIOError if the socket
+            buffer fills up before the frame has been written, and OSError if
+            the file is shorter than expected.
+        """
+        while self._prefix:
+            self._prefix = self._prefix[sock.send(self._prefix):]
+        while self._remaining:
+            if hasattr(os, "sendfile"):
+                sent = os.sendfile(
+                    sock.fileno(), self.file.fileno(), self._offset, self._remaining)
+            else:
+                self.file.seek(self._offset)
+                data = self.file.read(min(self._remaining, 65536))
+                sent = sock.send(data) if data else 0
+            if sent == 0:
+                # The frame is incomplete, so the connection cannot be used anymore
+                raise OSError("File was truncated")
+            self._offset += sent
+            self._remaining -= sent
+        while self._suffix:
+            self._suffix = self._suffix[sock.send(self._suffix):]
+        self.close()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def open_file_frame(
+        transfer: FileTransfer,
+        msg_end: bytes = b"\r\n",
+        framing: Optional[Framing] = None,
+) -> FileFrame:
+    """ Open the file of a transfer and frame it with the given framing. If no
+        framing is given, the message is terminated with msg_end.
+
+        Raises OSError if the file cannot be opened and FramingError if its
+        size cannot be framed.
+    """
+    file = open(transfer.path, "rb")
+    try:
+        size = transfer.size(os.fstat(file.fileno()).st_size)
+        if framing is None:
+            prefix, suffix = b"", msg_end
+        else:
+            prefix, suffix = framing.prefix(size), framing.suffix()
+    except (OSError, FramingError):
+        file.close()
+        raise
+    return FileFrame(file, transfer.offset, size, prefix, suffix)
+
+
+def send_file(
+        sock: socket.socket,
+        transfer: FileTransfer,
+        msg_end: bytes = b"\r\n",
+        logger: Optional[logging.Logger] = None,
+        name: str = "",
+        framing: Optional[Framing] = None,
+) -> bool:
+    """ Send a file as a single message framed with the given framing. If no framing
+        is given, the message is terminated with msg_end.
+
+        Returns true if there is a connection error. If the file cannot be read,
+        it is skipped.
+    """
+    try:
+        file = open(transfer.path, "rb")
+    except OSError as err:
+        if logger is not None:
+            logger.info(f"{name} failed to open file. {err}")
+        return False
+
+    error = ""
+    with file:
+        size = transfer.size(os.fstat(file.fileno()).st_size)
+        if framing is None:
+            prefix, suffix = b"", msg_end
+        else:
+            try:
+                prefix, suffix = framing.prefix(size), framing.suffix()
+            except FramingError as err:
+                if logger is not None:
+                    logger.info(f"{name} failed to send file. {err}")
+                return False
+
+        try:
+            if prefix:
+                sock.sendall(prefix)
+            sent = sock.sendfile(file, transfer.offset, size) if size else 0
+            if sent != size:
+                # The frame is incomplete, so the connection cannot be used anymore
+                error = f"{name} failed to send file. File was truncated"
+            elif suffix:
+                sock.sendall(suffix)
+        except ConnectionError:
+            error = f"{name} failed to send file. Connection lost"
+        except socket.timeout:
+            error = f"{name} failed to send file. Timed out"
+
+    if error and logger is not None:
+        logger.info(error)
+
+    if error:
+        return True
+    return False
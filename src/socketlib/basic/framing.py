@@ -0,0 +1,209 @@
+import abc
+from typing import Optional
+
+from socketlib.exceptions.exceptions import FramingError
+
+
+class Framing(abc.ABC):
+    """ Abstract base class for the strategies used to delimit messages
+        in a stream of bytes.
+
+        A frame consists of a prefix, the message payload and a suffix.
+    """
+
+    @abc.abstractmethod
+    def prefix(self, size: int) -> bytes:
+        """ Bytes that go before a payload of the given size. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def suffix(self) -> bytes:
+        """ Bytes that go after a payload. """
+        raise NotImplementedError
+
+    def frame(self, payload: bytes) -> bytes:
+        """ Returns the frame of the given payload. """
+        return self.prefix(len(payload)) + payload + self.suffix()
+
+    @abc.abstractmethod
+    def find(
+            self,
+            data: bytearray,
+            start: int,
+            end: int,
+            scan: int
+    ) -> Optional[tuple[int, int, int]]:
+        """ Find the first complete frame in data[start:end].
+
+            :param data: The received data.
+            :param start: Where the first frame starts.
+            :param end: Where the received data ends.
+            :param scan: Position where a previous search stopped.
+            :return: A tuple with the start of the payload, the end of the payload and the
+                end of the frame, or None if there is no complete frame.
+        """
+        raise NotImplementedError
+
+    def resume_from(self, start: int, end: int) -> int:
+        """ Returns the position where the search of the next frame should
+            resume after `find` failed to find a complete frame.
+        """
+        return start
+
+    def frame_size(self, data: bytearray, start: int, end: int) -> Optional[int]:
+        """ Returns the size of the frame that starts at data[start] if it
+            can be known before the whole frame is received, otherwise None.
+        """
+        return None
+
+
+class DelimiterFraming(Framing):
+    """ Messages end with a delimiter. The payload cannot contain the delimiter.
+    """
+
+    def __init__(self, delimiter: bytes = b"\r\n"):
+        if not delimiter:
+            raise ValueError("Delimiter cannot be empty")
+        self.delimiter = delimiter
+
+    def prefix(self, size: int) -> bytes:
+        return b""
+
+    def suffix(self) -> bytes:
+        return self.delimiter
+
+    def frame(self, payload: bytes) -> bytes:
+        return payload + self.delimiter
+
+    def find(
+            self,
+            data: bytearray,
+            start: int,
+            end: int,
+            scan: int
+    ) -> Optional[tuple[int, int, int]]:
+        index = data.find(self.delimiter, max(start, scan), end)
+        if index == -1:
+            return None
+        return start, index, index + len(self.delimiter)
+
+    def resume_from(self, start: int, end: int) -> int:
+        # The delimiter may be split across reads
+        return max(start, end - len(self.delimiter) + 1)
+
+
+class LengthPrefixFraming(Framing):
+    """ Messages are preceded by their length as an unsigned integer of
+        fixed width.
+    """
+
+    def __init__(self, width: int = 4, byteorder: str = "big"):
+        if width not in (1, 2, 4, 8):
+            raise ValueError(f"Invalid width {width}. Must be 1, 2, 4 or 8")
+        self.width = width
+        self.byteorder = byteorder
+        self.max_size = 2 ** (8 * width) - 1
+
+    def prefix(self, size: int) -> bytes:
+        if size > self.max_size:
+            raise FramingError(
+                f"Message of size {size} exceeds maximum size {self.max_size}")
+        return size.to_bytes(self.width, self.byteorder)
+
+    def suffix(self) -> bytes:
+        return b""
+
+    def find(
+            self,
+            data: bytearray,
+            start: int,
+            end: int,
+            scan: int
+    ) -> Optional[tuple[int, int, int]]:
+        payload_start = start + self.width
+        if payload_start > end:
+            return None
+        size = int.from_bytes(data[start:payload_start], self.byteorder)
+        payload_end = payload_start + size
+        if payload_end > end:
+            return None
+        return payload_start, payload_end, payload_end
+
+    def frame_size(self, data: bytearray, start: int, end: int) -> Optional[int]:
+        if start + self.width > end:
+            return None
+        return self.width + int.from_bytes(
+            data[start:start + self.width], self.byteorder)
+
+
+class VarintFraming(Framing):
+    """ Messages are preceded by their length encoded as an unsigned LEB128
+        variable length integer (the encoding used by protocol buffers).
+    """
+    max_varint_bytes = 10
+
+    def prefix(self, size: int) -> bytes:
+        return encode_varint(size)
+
+    def suffix(self) -> bytes:
+        return b""
+
+    def find(
+            self,
+            data: bytearray,
+            start: int,
+            end: int,
+            scan: int
+    ) -> Optional[tuple[int, int, int]]:
+        decoded = decode_varint(data, start, end)
+        if decoded is None:
+            return None
+        size, payload_start = decoded
+        payload_end = payload_start + size
+        if payload_end > end:
+            return None
+        return payload_start, payload_end, payload_end
+
+    def frame_size(self, data: bytearray, start: int, end: int) -> Optional[int]:
+        decoded = decode_varint(data, start, end)
+        if decoded is None:
+            return None
+        size, payload_start = decoded
+        return payload_start - start + size
+
+
+def encode_varint(value: int) -> bytes:
+    """ Encode a non-negative integer as an unsigned LEB128 varint. """
+    if value < 0:
+        raise FramingError("Cannot encode a negative varint")
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def decode_varint(
+        data: bytes | bytearray,
+        start: int,
+        end: int
+) -> Optional[tuple[int, int]]:
+    """ Decode an unsigned LEB128 varint from data[start:end].
+
+        Returns a tuple with the value and the position after the varint, or
+        None if the data ends before the varint does.
+    """
+    value = 0
+    shift = 0
+    for index in range(start, min(end, start + VarintFraming.max_varint_bytes)):
+        byte = data[index]
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, index + 1
+        shift += 7
+
+    if end - start >= VarintFraming.max_varint_bytes:
+        raise FramingError("Invalid varint")
+    return None
+
@@ -0,0 +1,380 @@
+import collections
+import mmap
+import os
+import queue
+import struct
+import threading
+from typing import NamedTuple, Optional
+
+from socketlib.basic.delivery import Delivery
+
+# Kinds of the records of a segment. A record whose flags are zero marks the end of the segment
+_BYTES = 1
+_TEXT = 2
+# Flag set on the records that have been written to the socket
+_ACKED = 0x80
+
+
+class Segment:
+    """ An append-only file of records, memory-mapped.
+
+        Each record has a header with the length of its payload and its flags,
+        followed by the payload. The header is written after the payload, so
+        a record interrupted by a crash is not read.
+    """
+    header = struct.Struct("!IB")
+
+    def __init__(self, path: str, size: Optional[int] = None):
+        """
+            :param path: Path of the file.
+            :param size: Size of a new file. If None, an existing file is opened.
+        """
+        self.path = path
+        self._file = open(path, "w+b" if size is not None else "r+b")
+        if size is not None:
+            self._file.truncate(size)
+        else:
+            size = os.fstat(self._file.fileno()).st_size
+        self.size = size
+        self._map = mmap.mmap(self._file.fileno(), size) if size > 0 else None
+        self.write_offset = 0
+
+    def append(self, flags: int, payload: bytes) -> bool:
+        """ Append a record. Returns false if it does not fit in the segment. """
+        start = self.write_offset + self.header.size
+        end = start + len(payload)
+        if end > self.size:
+            return False
+        self._map[start:end] = payload
+        self.header.pack_into(self._map, self.write_offset, len(payload), flags)
+        self.write_offset = end
+        return True
+
+    def read(self, offset: int) -> Optional[tuple[int, bytes, int]]:
+        """ Read the record at an offset. Returns its flags, its payload and the
+            offset of the next record, or None at the end of the segment.
+        """
+        if offset + self.header.size > self.size:
+            return None
+        length, flags = self.header.unpack_from(self._map, offset)
+        start = offset + self.header.size
+        if flags == 0 or start + length > self.size:
+            return None
+        return flags, self._map[start:start + length], start + length
+
+    def ack(self, offset: int) -> None:
+        """ Mark the record at an offset as written. """
+        self._map[offset + 4] |= _ACKED
+
+    def scan(self) -> int:
+        """ Move the write offset to the end of the records. Returns the number
+            of records that have not been acknowledged.
+        """
+        offset = 0
+        pending = 0
+        while (record := self.read(offset)) is not None:
+            flags, _, offset = record
+            if not flags & _ACKED:
+                pending += 1
+        self.write_offset = offset
+        return pending
+
+    def close(self, trim: bool = False) -> None:
+        """ Close the file. If trim is true, the unused end of the file is removed. """
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._map = None
+        if trim:
+            self._file.truncate(self.write_offset)
+        self._file.close()
+
+    def remove(self) -> None:
+        self.close()
+        os.remove(self.path)
+
+
+class _Entry(NamedTuple):
+    """ A message taken from the outbox that has not been written yet. """
+    flags: int
+    payload: bytes
+    segment: Optional[Segment]  # None if the message was in memory
+    offset: int
+
+
+class Outbox:
+    """ A to_send queue for `ClientSender` that keeps the messages that could
+        not be sent on disk.
+
+        Messages are kept in memory up to memory_limit bytes. Once the limit is
+        exceeded, messages are appended to segment files in the given directory,
+        which are memory-mapped, until the messages on disk have been sent.
+        Messages are always taken in the order they were put.
+
+        Messages are taken as Delivery objects. A message is acknowledged once it
+        has been written to the socket, and segments are deleted when all their
+        messages have been acknowledged. If writing fails because the connection is
+        lost, the messages that were taken and not written are taken again, so they
+        are sent after reconnecting. Messages that cannot be encoded are discarded.
+
+        Messages on disk survive restarts of the process: an outbox opened in the
+        same directory sends them first. `close` moves the messages in memory to disk.
+
+        Messages must be bytes or strings.
+    """
+    suffix = ".outbox"
+
+    def __init__(
+            self,
+            directory: str | os.PathLike,
+            memory_limit: int = 1 << 20,
+            segment_size: int = 16 << 20,
+            encoding: str = "utf-8"
+    ):
+        """
+            :param directory: Directory of the segment files. It is created if needed.
+            :param memory_limit: Maximum bytes of the messages kept in memory.
+            :param segment_size: Size of the segment files in bytes. Larger messages
+                get a segment of their own.
+            :param encoding: Encoding of the strings put in the outbox.
+        """
+        self.directory = os.fspath(directory)
+        self.memory_limit = memory_limit
+        self.segment_size = segment_size
+        self.encoding = encoding
+
+        self._memory = collections.deque()  # type: collections.deque[tuple[int, bytes]]
+        self._memory_bytes = 0
+        self._segments = []  # type: list[Segment]  # Oldest first
+        self._numbers = {}  # type: dict[str, int]  # Number of each segment file
+        self._writing = None  # type: Optional[Segment]
+        self._read_index = 0  # Segment and offset of the next record to read
+        self._read_offset = 0
+        self._unread = 0  # Records on disk that have not been taken
+        self._unacked = 0  # Records on disk that have not been acknowledged
+        self._in_flight = collections.deque()  # type: collections.deque[_Entry]
+        self._generation = 0  # Increased when the messages in flight are taken again
+        self._closed = False
+
+        self._mutex = threading.Lock()
+        self._not_empty = threading.Condition(self._mutex)
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._open_segments()
+
+    @property
+    def memory_bytes(self) -> int:
+        """ Bytes of the messages kept in memory. """
+        return self._memory_bytes
+
+    @property
+    def disk_messages(self) -> int:
+        """ Number of messages on disk that have not been written to the socket. """
+        return self._unacked
+
+    def qsize(self) -> int:
+        """ Number of messages waiting to be taken. """
+        with self._mutex:
+            return len(self._memory) + self._unread
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def full(self) -> bool:
+        return False
+
+    def put(self, item: str | bytes, block: bool = True, timeout: Optional[float] = None) -> None:
+        """ Put a message in the outbox. Never blocks. """
+        if isinstance(item, str):
+            flags, payload = _TEXT, item.encode(self.encoding)
+        elif isinstance(item, (bytes, bytearray, memoryview)):
+            flags, payload = _BYTES, bytes(item)
+        else:
+            raise TypeError(f"Outbox messages must be bytes or strings, not {type(item).__name__}")
+
+        with self._not_empty:
+            if self._closed:
+                raise ValueError("The outbox is closed")
+            # Messages go to disk while there are older messages on disk
+            if self._unacked == 0 and self._memory_bytes + len(payload) <= self.memory_limit:
+                self._memory.append((flags, payload))
+                self._memory_bytes += len(payload)
+            else:
+                self._append(flags, payload)
+            self._not_empty.notify()
+
+    def put_nowait(self, item: str | bytes) -> None:
+        self.put(item, block=False)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Delivery:
+        """ Take the next message as a Delivery. """
+        with self._not_empty:
+            if not self._memory and self._unread == 0:
+                if not block:
+                    raise queue.Empty
+                if not self._not_empty.wait_for(
+                        lambda: self._memory or self._unread > 0, timeout):
+                    raise queue.Empty
+            if self._memory:
+                flags, payload = self._memory.popleft()
+                self._memory_bytes -= len(payload)
+                entry = _Entry(flags, payload, None, 0)
+            else:
+                entry = self._read()
+            self._in_flight.append(entry)
+            generation = self._generation
+
+        msg = entry.payload
+        if entry.flags == _TEXT:
+            msg = msg.decode(self.encoding)
+        delivery = Delivery(msg)
+        delivery.future.add_done_callback(
+            lambda future: self._done(entry, generation, future))
+        return delivery
+
+    def get_nowait(self) -> Delivery:
+        return self.get(block=False)
+
+    def close(self) -> None:
+        """ Move the messages in memory, including those taken and not written,
+            to disk and close the segment files.
+        """
+        with self._mutex:
+            if self._closed:
+                return
+            self._closed = True
+            self._rewind()
+            if self._memory:
+                # The messages in memory are older than those on disk, so they
+                # go to a segment that is read first
+                first = min(self._numbers.values(), default=self._first_number)
+                size = max(self.segment_size, sum(
+                    Segment.header.size + len(payload) for _, payload in self._memory))
+                segment = self._new_segment(first - 1, size)
+                for flags, payload in self._memory:
+                    segment.append(flags, payload)
+                self._memory.clear()
+                self._memory_bytes = 0
+                self._segments.insert(0, segment)
+            for segment in self._segments:
+                segment.close(trim=True)
+            self._segments = []
+            self._writing = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # Number of the first segment of a new outbox. Segments created by close
+    # to keep the messages in memory get lower numbers
+    _first_number = 10 ** 9
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"{number:012d}{self.suffix}")
+
+    def _new_segment(self, number: int, size: int) -> Segment:
+        segment = Segment(self._segment_path(number), size)
+        self._numbers[segment.path] = number
+        return segment
+
+    def _open_segments(self) -> None:
+        """ Open the segments left by a previous outbox in the same directory. """
+        numbers = []
+        for name in os.listdir(self.directory):
+            stem, suffix = os.path.splitext(name)
+            if suffix == self.suffix and stem.isdigit():
+                numbers.append(int(stem))
+        for number in sorted(numbers):
+            segment = Segment(self._segment_path(number))
+            pending = segment.scan()
+            if pending == 0:
+                segment.remove()
+                continue
+            self._numbers[segment.path] = number
+            self._segments.append(segment)
+            self._unread += pending
+            self._unacked += pending
+
+    def _append(self, flags: int, payload: bytes) -> None:
+        """ Append a message to the last segment, creating a new one if it is full. """
+        if self._writing is None or not self._writing.append(flags, payload):
+            number = max(self._numbers.values(), default=self._first_number - 1) + 1
+            size = max(self.segment_size, Segment.header.size + len(payload))
+            self._writing = self._new_segment(number, size)
+            self._segments.append(self._writing)
+            self._writing.append(flags, payload)
+        self._unread += 1
+        self._unacked += 1
+
+    def _read(self) -> _Entry:
+        """ Read the next message from disk. There must be an unread message. """
+        while True:
+            segment = self._segments[self._read_index]
+            record = segment.read(self._read_offset)
+            if record is None:
+                self._read_index += 1
+                self._read_offset = 0
+                continue
+            flags, payload, next_offset = record
+            offset, self._read_offset = self._read_offset, next_offset
+            if not flags & _ACKED:
+                self._unread -= 1
+                return _Entry(flags, payload, segment, offset)
+
+    def _done(self, entry: _Entry, generation: int, future) -> None:
+        """ Acknowledge a message once it has been written, or take the messages
+            in flight again if the connection failed.
+        """
+        with self._not_empty:
+            if generation != self._generation or self._closed:
+                return  # The message was already taken again
+            error = future.exception()
+            if isinstance(error, OSError):
+                self._rewind()
+                self._not_empty.notify_all()
+                return
+            # Messages are written in order, so the entry is the oldest one
+            if self._in_flight and self._in_flight[0] is entry:
+                self._in_flight.popleft()
+            else:
+                self._in_flight.remove(entry)
+            if entry.segment is not None:
+                entry.segment.ack(entry.offset)
+                self._unacked -= 1
+                self._remove_acked_segments()
+
+    def _rewind(self) -> None:
+        """ Put the messages in flight back, so they are taken again in order. """
+        self._generation += 1
+        disk = [entry for entry in self._in_flight if entry.segment is not None]
+        memory = [entry for entry in self._in_flight if entry.segment is None]
+        self._in_flight.clear()
+        for entry in reversed(memory):
+            self._memory.appendleft((entry.flags, entry.payload))
+            self._memory_bytes += len(entry.payload)
+        if disk:
+            self._read_index = self._segments.index(disk[0].segment)
+            self._read_offset = disk[0].offset
+            self._unread += len(disk)
+
+    def _remove_acked_segments(self) -> None:
+        """ Delete the segments whose messages have all been written. """
+        while self._segments and self._read_index > 0:
+            head = self._segments[0]
+            if any(entry.segment is head for entry in self._in_flight):
+                break
+            self._segments.pop(0)
+            self._numbers.pop(head.path)
+            self._read_index -= 1
+            head.remove()
+        if self._unacked == 0 and self._unread == 0 and self._segments:
+            # Every message on disk has been written. Start again from memory
+            for segment in self._segments:
+                segment.remove()
+                self._numbers.pop(segment.path)
+            self._segments = []
+            self._writing = None
+            self._read_index = 0
+            self._read_offset = 0
@@ -1,4 +1,6 @@
+import collections
 import queue
+import threading
 from typing import Any, Optional
 
 
@@ -21,3 +23,129 @@ def put_in_queue(item: Any, data_queue: queue.Queue, timeout: float) -> bool:
         return True
     except queue.Full:
         return False
+
+
+class LaneQueue:
+    """ A queue with several priority lanes that can be used as the
+        to_send queue of clients and servers.
+
+        Lane 0 has the highest priority. Items are put in the lowest priority
+        lane unless another lane is given. With strict scheduling, items of a lane
+        are only taken when all the higher priority lanes are empty. With weighted
+        scheduling, lanes are served in turns, and each lane can give up to its
+        weight items in a row, so low priority lanes are never starved.
+
+        Has the same interface as queue.Queue, except for join and task_done.
+    """
+
+    def __init__(
+            self,
+            lanes: int = 2,
+            weights: Optional[list[int]] = None,
+            maxsize: int = 0
+    ):
+        """
+            :param lanes: Number of lanes.
+            :param weights: Optional weight of each lane. If None, scheduling is strict.
+            :param maxsize: Maximum number of items in each lane. If zero, lanes are unbounded.
+        """
+        if lanes < 1:
+            raise ValueError("There must be at least one lane")
+        if weights is not None:
+            if len(weights) != lanes or any(w < 1 for w in weights):
+                raise ValueError("There must be a positive weight for each lane")
+        self.weights = weights
+        self.maxsize = maxsize
+        self.default_lane = lanes - 1
+
+        self._lanes = [collections.deque() for _ in range(lanes)]
+        self._size = 0
+        self._current = 0  # Lane being served with weighted scheduling
+        self._served = 0  # Items taken in a row from the current lane
+
+        self._mutex = threading.Lock()
+        self._not_empty = threading.Condition(self._mutex)
+        self._not_full = threading.Condition(self._mutex)
+
+    @property
+    def lanes(self) -> int:
+        return len(self._lanes)
+
+    def qsize(self, lane: Optional[int] = None) -> int:
+        """ Number of items in the queue, or in a lane if one is given. """
+        with self._mutex:
+            if lane is None:
+                return self._size
+            return len(self._lanes[lane])
+
+    def empty(self) -> bool:
+        with self._mutex:
+            return self._size == 0
+
+    def full(self, lane: Optional[int] = None) -> bool:
+        """ Whether a lane is full, so putting an item in it would block. If no lane
+            is given, the lowest priority lane is checked.
+        """
+        if lane is None:
+            lane = self.default_lane
+        with self._mutex:
+            return 0 < self.maxsize <= len(self._lanes[lane])
+
+    def put(
+            self,
+            item: Any,
+            block: bool = True,
+            timeout: Optional[float] = None,
+            lane: Optional[int] = None
+    ) -> None:
+        """ Put an item in a lane. If no lane is given, the item is put in
+            the lowest priority lane.
+        """
+        if lane is None:
+            lane = self.default_lane
+        items = self._lanes[lane]
+        with self._not_full:
+            if 0 < self.maxsize <= len(items):
+                if not block:
+                    raise queue.Full
+                if not self._not_full.wait_for(
+                        lambda: len(items) < self.maxsize, timeout):
+                    raise queue.Full
+            items.append(item)
+            self._size += 1
+            self._not_empty.notify()
+
+    def put_nowait(self, item: Any, lane: Optional[int] = None) -> None:
+        self.put(item, block=False, lane=lane)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        with self._not_empty:
+            if self._size == 0:
+                if not block:
+                    raise queue.Empty
+                if not self._not_empty.wait_for(lambda: self._size > 0, timeout):
+                    raise queue.Empty
+            item = self._pop()
+            self._size -= 1
+            self._not_full.notify_all()
+            return item
+
+    def get_nowait(self) -> Any:
+        return self.get(block=False)
+
+    def _pop(self) -> Any:
+        """ Take the next item according to the scheduling. The queue must not be empty. """
+        if self.weights is None:
+            for items in self._lanes:
+                if items:
+                    return items.popleft()
+
+        # Visiting every lane once, plus the current one again, finds an item
+        for _ in range(len(self._lanes) + 1):
+            items = self._lanes[self._current]
+            if items and self._served < self.weights[self._current]:
+                self._served += 1
+                return items.popleft()
+            self._current = (self._current + 1) % len(self._lanes)
+            self._served = 0
+        raise queue.Empty
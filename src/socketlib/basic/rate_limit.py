@@ -0,0 +1,146 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """ A token bucket that refills at a constant rate up to its capacity.
+
+        Tokens can be reserved even if there are not enough of them. The bucket
+        then goes into debt, and the time that must pass before the debt is paid
+        is returned, so a caller can spend more than the capacity at once and
+        still keep the average rate.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+            :param rate: Tokens added per second.
+            :param capacity: Maximum number of tokens. Determines the size of a burst.
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+
+    def reserve(self, tokens: float, now: float) -> float:
+        """ Take tokens from the bucket. Returns the time in seconds to wait
+            before the tokens are actually available.
+        """
+        elapsed = now - self._last
+        self._last = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._tokens -= tokens
+        if self._tokens >= 0:
+            return 0.
+        return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """ Limits the rate at which messages are sent in messages per second
+        and bytes per second, with a burst allowance.
+
+        The limiter only delays messages when they are sent faster than the
+        limits, so a sender that is mostly idle never waits.
+    """
+
+    def __init__(
+            self,
+            messages_per_second: Optional[float] = None,
+            bytes_per_second: Optional[float] = None,
+            burst_messages: Optional[float] = None,
+            burst_bytes: Optional[float] = None,
+            window: float = 1.,
+    ):
+        """
+            :param messages_per_second: Optional maximum rate of messages.
+            :param bytes_per_second: Optional maximum rate of bytes.
+            :param burst_messages: Number of messages that can be sent at once. Defaults
+                to one second worth of messages.
+            :param burst_bytes: Number of bytes that can be sent at once. Defaults
+                to one second worth of bytes.
+            :param window: Time in seconds over which the current rates are measured.
+        """
+        self._messages = None  # type: Optional[TokenBucket]
+        self._bytes = None  # type: Optional[TokenBucket]
+        if messages_per_second is not None:
+            if burst_messages is None:
+                burst_messages = messages_per_second
+            self._messages = TokenBucket(messages_per_second, burst_messages)
+        if bytes_per_second is not None:
+            if burst_bytes is None:
+                burst_bytes = bytes_per_second
+            self._bytes = TokenBucket(bytes_per_second, burst_bytes)
+
+        self._lock = threading.Lock()
+        self.window = window
+        self._window_start = time.monotonic()
+        self._window_messages = 0
+        self._window_bytes = 0
+
+        self.messages = 0  # Total messages sent
+        self.bytes = 0  # Total bytes sent
+        self.message_rate = 0.  # Messages per second in the last window
+        self.byte_rate = 0.  # Bytes per second in the last window
+        self.throttled = 0  # Number of times the sender had to wait
+        self.throttled_time = 0.  # Total time waited in seconds
+
+    def reserve(self, n_messages: int = 1, n_bytes: int = 0) -> float:
+        """ Register that messages are going to be sent. Returns the time in
+            seconds to wait before sending them.
+        """
+        now = time.monotonic()
+        with self._lock:
+            delay = 0.
+            if self._messages is not None:
+                delay = self._messages.reserve(n_messages, now)
+            if self._bytes is not None:
+                delay = max(delay, self._bytes.reserve(n_bytes, now))
+
+            self.messages += n_messages
+            self.bytes += n_bytes
+            self._window_messages += n_messages
+            self._window_bytes += n_bytes
+            elapsed = now - self._window_start
+            if elapsed >= self.window:
+                self.message_rate = self._window_messages / elapsed
+                self.byte_rate = self._window_bytes / elapsed
+                self._window_start = now
+                self._window_messages = 0
+                self._window_bytes = 0
+
+            if delay > 0:
+                self.throttled += 1
+                self.throttled_time += delay
+        return delay
+
+    def wait(
+            self,
+            n_messages: int = 1,
+            n_bytes: int = 0,
+            stop: Optional[Callable[[], bool]] = None,
+            interval: float = 0.1,
+    ) -> None:
+        """ Wait until the messages can be sent. The wait is interrupted if the
+            stop function evaluates to true.
+        """
+        delay = self.reserve(n_messages, n_bytes)
+        end = time.monotonic() + delay
+        while delay > 0:
+            if stop is not None and stop():
+                return
+            time.sleep(min(delay, interval))
+            delay = end - time.monotonic()
+
+    def stats(self) -> dict[str, float]:
+        """ Returns the current and throttled rates. """
+        with self._lock:
+            return {
+                "messages": self.messages,
+                "bytes": self.bytes,
+                "message_rate": self.message_rate,
+                "byte_rate": self.byte_rate,
+                "throttled": self.throttled,
+                "throttled_time": self.throttled_time,
+            }
@@ -1,10 +1,12 @@
 import logging
 import queue
 import socket
-from typing import Callable, Optional
+from typing import Any, Callable, Optional
 
 from socketlib.basic.buffer import Buffer
+from socketlib.basic.codecs import Codec
 from socketlib.basic.queues import put_in_queue
+from socketlib.exceptions.exceptions import CodecError, CompressionError, FramingError
 
 
 def get_msg(
@@ -14,34 +16,118 @@ def get_msg(
         name: str = ""
 ) -> Optional[bytes]:
     """ Get a message from a socket buffer.
+
+        Returns None if the connection is lost or the message cannot
+        be split, decompressed or received any further.
+    """
+    return _get(buffer.get_msg, buffer, msg_end, logger, name)
+
+
+def get_msgs(
+        buffer: Buffer,
+        msg_end: bytes,
+        logger: Optional[logging.Logger] = None,
+        name: str = ""
+) -> Optional[list[bytes]]:
+    """ Get all the messages available in a socket buffer.
+
+        Returns None if the connection is lost or the messages cannot
+        be split, decompressed or received any further.
+    """
+    return _get(buffer.get_msgs, buffer, msg_end, logger, name)
+
+
+def _get(
+        get: Callable[..., Any],
+        buffer: Buffer,
+        msg_end: bytes,
+        logger: Optional[logging.Logger],
+        name: str
+) -> Any:
+    """ Get messages with a method of the buffer. Returns None if the
+        connection is lost or the messages cannot be split, decompressed
+        or received any further.
     """
     try:
-        return buffer.get_msg(msg_end=msg_end)
+        messages = get(msg_end=msg_end)
+        if messages is None and buffer.dropped and logger:
+            logger.info(f"{name} dropped connection. Frame too large")
+        return messages
     except ConnectionError:
         error = f"{name} failed to get message. Connection lost"
     except socket.timeout:
         error = f"{name} failed to get message. Timed out"
+    except OSError:
+        # The socket was closed by another thread, such as the sender reconnecting
+        error = f"{name} failed to get message. Socket closed"
+    except CompressionError as err:
+        error = f"{name} failed to decompress message. {err}"
+    except FramingError as err:
+        # Includes FrameTooLargeError. The stream cannot be split any further
+        error = f"{name} failed to split message. {err}"
 
     if error and logger:
         logger.info(error)
 
 
+def decode_msgs(
+        messages: list[bytes],
+        codec: Codec,
+        logger: Optional[logging.Logger] = None,
+        name: str = ""
+) -> list[Any]:
+    """ Decode messages with a codec. Messages that cannot be decoded
+        are skipped.
+    """
+    try:
+        return codec.decode_many(messages)
+    except CodecError:
+        pass
+
+    decoded = []
+    for msg in messages:
+        try:
+            decoded.append(codec.decode(msg))
+        except CodecError as err:
+            if logger:
+                logger.info(f"{name} failed to decode message. {err}")
+    return decoded
+
+
 def receive_and_enqueue(
         buffer: Buffer,
         msg_end: bytes,
-        msg_queue: queue.Queue[bytes],
+        msg_queue: queue.Queue[Any],
         stop: Callable[[], bool],
         timeout: float,
         logger: Optional[logging.Logger] = None,
         name: str = "",
+        batch: bool = False,
+        codec: Optional[Codec] = None,
 ):
-    """ Receive a message and put it in a queue
+    """ Receive messages and put them in a queue.
+
+        If batch is true, all the messages obtained from a single read are put
+        in the queue as a list with one operation. Otherwise, each message is
+        put in the queue individually.
+
+        If a codec is given, messages are decoded with it before they are put
+        in the queue.
     """
     while not stop():
-        msg = get_msg(buffer, msg_end, logger, name)
-        if msg is not None:
-            success = put_in_queue(msg, msg_queue, timeout)
-            if not success and logger:
-                logger.info(f"{name} failed to enqueue message")
-        else:
+        messages = get_msgs(buffer, msg_end, logger, name)
+        if messages is None:
             break
+        if codec is not None:
+            messages = decode_msgs(messages, codec, logger, name)
+            if not messages:
+                continue
+
+        if batch:
+            success = put_in_queue(messages, msg_queue, timeout)
+        else:
+            success = all(
+                [put_in_queue(msg, msg_queue, timeout) for msg in messages]
+            )
+        if not success and logger:
+            logger.info(f"{name} failed to enqueue message")
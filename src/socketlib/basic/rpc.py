@@ -0,0 +1,183 @@
+import concurrent.futures
+import heapq
+import itertools
+import struct
+import threading
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+from socketlib.basic.codecs import Codec
+from socketlib.exceptions.exceptions import CodecError
+
+# Kinds of RPC messages
+REQUEST = 0
+REPLY = 1
+ERROR = 2
+
+
+class RpcMessage(NamedTuple):
+    """ A request, a reply or an error reply of a remote procedure call. """
+    kind: int
+    call_id: int  # Correlation id. Replies carry the id of their request
+    method: str  # Name of the method. Empty in replies
+    body: Any  # Argument of the request, result of the reply or error description
+
+
+class RpcCodec(Codec):
+    """ Converts RPC messages to and from bytes.
+
+        Each message starts with a header with its kind, its correlation id and
+        the length of the method name, followed by the method name and the body.
+        The bodies of requests and replies are converted with the given codec.
+        If no codec is given, bodies must be strings or bytes and are decoded as bytes.
+        Error descriptions are always strings.
+
+        Messages that are already bytes are returned unchanged, so a message can be
+        encoded before it is put in the to_send queue.
+
+        The header is binary, so this codec must be used with a length prefixed framing.
+    """
+    header = struct.Struct("!BQH")
+
+    def __init__(self, codec: Optional[Codec] = None, encoding: str = "utf-8"):
+        self.codec = codec
+        self.encoding = encoding
+
+    def encode(self, msg: RpcMessage | bytes) -> bytes:
+        if isinstance(msg, (bytes, bytearray)):
+            return msg
+        try:
+            kind, call_id, method, body = msg
+            method = method.encode(self.encoding)
+            header = self.header.pack(kind, call_id, len(method))
+        except (TypeError, ValueError, AttributeError, struct.error) as err:
+            raise CodecError(f"Cannot encode RPC message: {err}")
+
+        if kind == ERROR:
+            body = str(body).encode(self.encoding)
+        elif self.codec is not None:
+            body = self.codec.encode(body)
+        elif body is None:
+            body = b""
+        elif isinstance(body, str):
+            body = body.encode(self.encoding)
+        elif not isinstance(body, (bytes, bytearray, memoryview)):
+            raise CodecError(f"Cannot encode RPC body of type {type(body).__name__}")
+        return header + method + body
+
+    def decode(self, data: bytes) -> RpcMessage:
+        try:
+            kind, call_id, method_length = self.header.unpack_from(data)
+        except struct.error as err:
+            raise CodecError(f"Cannot decode RPC message: {err}")
+        start = self.header.size + method_length
+        if kind not in (REQUEST, REPLY, ERROR) or len(data) < start:
+            raise CodecError("Cannot decode RPC message: invalid header")
+        try:
+            method = data[self.header.size:start].decode(self.encoding)
+        except UnicodeError as err:
+            raise CodecError(f"Cannot decode RPC method: {err}")
+
+        body = data[start:]
+        if kind == ERROR:
+            body = body.decode(self.encoding, "replace")
+        elif self.codec is not None:
+            body = self.codec.decode(body)
+        return RpcMessage(kind, call_id, method, body)
+
+
+class DispatchQueue:
+    """ Used in place of a received queue to hand each received message to a
+        function as soon as it is received, in the receiving thread.
+
+        Lists are the messages of a read put together when `batch_received` is
+        true, so each of their messages is dispatched in turn.
+    """
+
+    def __init__(self, dispatch: Callable[[Any], None]):
+        self._dispatch = dispatch
+
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None) -> None:
+        if isinstance(item, list):
+            for msg in item:
+                self._dispatch(msg)
+        else:
+            self._dispatch(item)
+
+    def empty(self) -> bool:
+        return True
+
+    def qsize(self) -> int:
+        return 0
+
+
+class PendingCalls:
+    """ The calls waiting for their reply.
+
+        Each call gets a new correlation id and a future. Calls with a timeout
+        fail with a TimeoutError if their reply has not arrived when it expires.
+        The timeouts of all the calls are handled by a single thread, which is
+        started with the first call that has a timeout.
+    """
+
+    def __init__(self):
+        self._calls = {}  # type: dict[int, concurrent.futures.Future]
+        self._deadlines = []  # type: list[tuple[float, int]]
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self._thread = None  # type: Optional[threading.Thread]
+        self._closed = None  # type: Optional[BaseException]
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def add(self, timeout: Optional[float] = None) -> tuple[int, concurrent.futures.Future]:
+        """ Register a new call. Returns its correlation id and its future. """
+        future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel()
+        with self._condition:
+            call_id = next(self._ids)
+            if self._closed is not None:
+                future.set_exception(self._closed)
+                return call_id, future
+            self._calls[call_id] = future
+            if timeout is not None:
+                heapq.heappush(self._deadlines, (time.monotonic() + timeout, call_id))
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._expire, daemon=True)
+                    self._thread.start()
+                self._condition.notify()
+        return call_id, future
+
+    def pop(self, call_id: int) -> Optional[concurrent.futures.Future]:
+        """ Remove a call. Returns its future, or None if the call had already
+            been removed or had expired.
+        """
+        with self._condition:
+            return self._calls.pop(call_id, None)
+
+    def close(self, error: BaseException) -> None:
+        """ Fail all the calls, and the calls added later, with the given error
+            and stop the timeout thread.
+        """
+        with self._condition:
+            calls, self._calls = self._calls, {}
+            self._deadlines.clear()
+            self._closed = error
+            self._condition.notify()
+        for future in calls.values():
+            future.set_exception(error)
+
+    def _expire(self) -> None:
+        while True:
+            with self._condition:
+                while self._closed is None and (
+                        not self._deadlines or self._deadlines[0][0] > time.monotonic()):
+                    wait = self._deadlines[0][0] - time.monotonic() if self._deadlines else None
+                    self._condition.wait(wait)
+                if self._closed is not None:
+                    return
+                _, call_id = heapq.heappop(self._deadlines)
+                future = self._calls.pop(call_id, None)
+            if future is not None:
+                future.set_exception(TimeoutError(f"Call {call_id} timed out"))
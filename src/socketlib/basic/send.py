@@ -1,69 +1,320 @@
 import logging
+import os
 import queue
 import socket
-from typing import Callable, Optional
 import time
+from typing import Any, Callable, Optional
 
+from socketlib.basic.codecs import Codec
+from socketlib.basic.compression import Compressor, check_framing
+from socketlib.basic.delivery import Delivery
+from socketlib.basic.files import FileTransfer, send_file
+from socketlib.basic.framing import Framing
 from socketlib.basic.queues import get_from_queue
+from socketlib.basic.rate_limit import RateLimiter
+from socketlib.exceptions.exceptions import CodecError, FramingError
 
 
-def encode_msg(msg: str,
+try:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+
+
+def encode_msg(msg: Any,
                msg_end: bytes = b"\r\n",
-               encoding: str = "utf-8"
+               encoding: str = "utf-8",
+               framing: Optional[Framing] = None,
+               codec: Optional[Codec] = None,
+               compressor: Optional[Compressor] = None,
                ) -> bytes:
-    return msg.encode(encoding) + msg_end
+    """ Encode a message into a frame. If no framing is given, the message
+        is terminated with msg_end.
+
+        If a codec is given it is used to convert the message to bytes. Otherwise,
+        the message must be a string, which is encoded with the given encoding,
+        or bytes.
+
+        If a compressor is given, the message is compressed before it is framed.
+        Compressed messages require a length prefixed framing.
+    """
+    if codec is not None:
+        msg = codec.encode(msg)
+    elif isinstance(msg, str):
+        msg = msg.encode(encoding)
+    if compressor is not None:
+        check_framing(compressor, framing)
+        msg = compressor.compress(msg)
+    if framing is None:
+        return msg + msg_end
+    return framing.frame(msg)
 
 
 def send_msg(
         sock: socket.socket,
-        msg: str | bytes,
+        msg: Any,
         msg_end: bytes = b"\r\n",
         logger: Optional[logging.Logger] = None,
         name: str = "",
-        encoding: str = "utf-8"
+        encoding: str = "utf-8",
+        framing: Optional[Framing] = None,
+        codec: Optional[Codec] = None,
+        compressor: Optional[Compressor] = None,
 ) -> bool:
     """ Send a message through a socket. Returns true if there is an error
     """
-    if isinstance(msg, str):
-        msg_bytes = encode_msg(msg, msg_end, encoding)
-    else:
-        msg_bytes = msg + msg_end
+    msg_bytes = _encode(
+        msg, msg_end, logger, name, encoding, framing, codec, compressor)
+    if msg_bytes is None:
+        return False
+    return _write(sock, [msg_bytes], logger, name) is not None
+
+
+def send_msgs(
+        sock: socket.socket,
+        messages: list[Any],
+        msg_end: bytes = b"\r\n",
+        logger: Optional[logging.Logger] = None,
+        name: str = "",
+        encoding: str = "utf-8",
+        framing: Optional[Framing] = None,
+        codec: Optional[Codec] = None,
+        compressor: Optional[Compressor] = None,
+) -> bool:
+    """ Send several messages through a socket with as few system calls as
+        possible. Returns true if there is an error
+    """
+    frames = []
+    for msg in messages:
+        msg_bytes = _encode(
+            msg, msg_end, logger, name, encoding, framing, codec, compressor)
+        if msg_bytes is not None:
+            frames.append(msg_bytes)
+    if not frames:
+        return False
+    return _write(sock, frames, logger, name) is not None
+
+
+def sendmsg_all(sock: socket.socket, buffers: list[bytes]) -> None:
+    """ Send all the buffers through the socket with scatter-gather
+        `sendmsg` calls, so that the buffers are not copied into a
+        single one.
+    """
+    if len(buffers) == 1:
+        sock.sendall(buffers[0])
+        return
+    if not hasattr(sock, "sendmsg"):
+        sock.sendall(b"".join(buffers))
+        return
+
+    buffers = list(buffers)
+    index = 0
+    while index < len(buffers):
+        sent = sock.sendmsg(buffers[index:index + IOV_MAX])
+        while sent > 0:
+            size = len(buffers[index])
+            if sent < size:
+                # Partial write. Send the rest of this buffer in the next call
+                buffers[index] = memoryview(buffers[index])[sent:]
+                break
+            sent -= size
+            index += 1
+
+
+def _send_file(
+        sock: socket.socket,
+        transfer: FileTransfer,
+        msg_end: bytes,
+        logger: Optional[logging.Logger],
+        name: str,
+        framing: Optional[Framing],
+        compressor: Optional[Compressor],
+        rate_limiter: Optional[RateLimiter],
+        stop: Callable[[], bool],
+        delivery: Optional[Delivery],
+) -> bool:
+    """ Send a file taken from the send queue. Returns true if there is an error
+    """
+    if compressor is not None:
+        if logger is not None:
+            logger.info(f"{name} failed to send file. Files cannot be compressed")
+        if delivery is not None:
+            delivery.fail(ValueError("Files cannot be compressed"))
+        return False
+    if rate_limiter is not None:
+        try:
+            file_size = os.path.getsize(transfer.path)
+        except OSError:
+            file_size = 0
+        rate_limiter.wait(1, transfer.size(file_size), stop)
+
+    write_start = time.perf_counter()
+    error = send_file(sock, transfer, msg_end, logger, name, framing)
+    if delivery is not None:
+        if error:
+            delivery.fail(ConnectionError(f"Failed to send file {transfer.path}"))
+        else:
+            delivery.done(write_start, time.perf_counter())
+    return error
 
-    error = ""
+
+def _encode(
+        msg: Any,
+        msg_end: bytes,
+        logger: Optional[logging.Logger],
+        name: str,
+        encoding: str,
+        framing: Optional[Framing],
+        codec: Optional[Codec],
+        compressor: Optional[Compressor],
+        delivery: Optional[Delivery] = None,
+) -> Optional[bytes]:
+    """ Encode a message. Returns None if the message cannot be encoded.
+    """
     try:
-        sock.sendall(msg_bytes)
-    except ConnectionError:
-        error = f"{name} failed to send message. Connection lost"
-    except socket.timeout:
-        error = f"{name} failed to send message. Timed out"
+        return encode_msg(msg, msg_end, encoding, framing, codec, compressor)
+    except (CodecError, FramingError) as err:
+        if logger is not None:
+            logger.info(f"{name} failed to encode message. {err}")
+        if delivery is not None:
+            delivery.fail(err)
+
+
+def _write(
+        sock: socket.socket,
+        frames: list[bytes],
+        logger: Optional[logging.Logger],
+        name: str,
+) -> Optional[OSError]:
+    """ Write frames to the socket. Returns the error if there is one.
+    """
+    try:
+        sendmsg_all(sock, frames)
+        return None
+    except ConnectionError as err:
+        error = err
+        msg = f"{name} failed to send message. Connection lost"
+    except socket.timeout as err:
+        error = err
+        msg = f"{name} failed to send message. Timed out"
+
+    if logger is not None:
+        logger.info(msg)
+    return error
+
+
+def _unwrap(item: Any) -> Any:
+    """ Returns the message of a queue item. """
+    if isinstance(item, Delivery):
+        return item.msg
+    return item
 
-    if error and logger is not None:
-        logger.info(error)
 
-    if error:
-        return True
-    return False
+def _start(item: Any) -> tuple[Any, Optional[Delivery]]:
+    """ Returns the message of a queue item and its delivery, if it has one.
+        The message is None if its delivery was cancelled.
+    """
+    if isinstance(item, Delivery):
+        if not item.start():
+            return None, item
+        return item.msg, item
+    return item, None
 
 
 def get_and_send_messages(
         sock: socket.socket,
         msg_end: bytes,
-        msg_queue: queue.Queue[str | bytes],
+        msg_queue: queue.Queue[Any],
         stop: Callable[[], bool],
         timeout: float,
         logger: Optional[logging.Logger] = None,
         name: str = "",
         encoding: str = "utf-8",
         wait: float = 0,
+        framing: Optional[Framing] = None,
+        codec: Optional[Codec] = None,
+        compressor: Optional[Compressor] = None,
+        coalesce: bool = False,
+        max_batch_count: int = 1024,
+        max_batch_bytes: int = 65536,
+        rate_limiter: Optional[RateLimiter] = None,
 ) -> None:
     """ Get messages from a queue and send them until the
         stop function evaluates to true.
+
+        If coalesce is true, the messages that are already in the queue are
+        sent together with a single scatter-gather write, up to max_batch_count
+        messages or max_batch_bytes bytes.
+
+        The rate at which messages are sent can be limited with a rate limiter.
+        If no rate limiter is given and wait is greater than zero, at most one
+        message is sent every `wait` seconds.
+
+        FileTransfer objects in the queue are streamed with `socket.sendfile` in
+        the order they were put in the queue.
+
+        Delivery objects in the queue are sent like their message, and their futures
+        are resolved once the message has been written or failed to be written.
     """
-    while not stop():
-        # TODO: add a small (optional) wait period before sending messages
-        msg = get_from_queue(msg_queue, timeout=timeout)
-        if msg is not None:
-            error = send_msg(sock, msg, msg_end, logger, name, encoding)
-            time.sleep(wait)
-            if error:
+    if rate_limiter is None and wait > 0:
+        rate_limiter = RateLimiter(messages_per_second=1 / wait, burst_messages=1)
+
+    pending = None  # A file transfer taken from the queue while coalescing
+    while pending is not None or not stop():
+        if pending is not None:
+            item, pending = pending, None
+        else:
+            item = get_from_queue(msg_queue, timeout=timeout)
+        if item is None:
+            continue
+
+        if isinstance(_unwrap(item), FileTransfer):
+            transfer, delivery = _start(item)
+            if transfer is not None and _send_file(
+                    sock, transfer, msg_end, logger, name, framing,
+                    compressor, rate_limiter, stop, delivery):
                 break
+            continue
+
+        frames = []
+        deliveries = []
+        size = 0
+        while True:
+            msg, delivery = _start(item)
+            if msg is not None:
+                frame = _encode(msg, msg_end, logger, name, encoding,
+                                framing, codec, compressor, delivery)
+                if frame is not None:
+                    frames.append(frame)
+                    size += len(frame)
+                    if delivery is not None:
+                        deliveries.append(delivery)
+            if (not coalesce or len(frames) >= max_batch_count
+                    or size >= max_batch_bytes):
+                break
+            try:
+                item = msg_queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(_unwrap(item), FileTransfer):
+                pending = item
+                break
+
+        if not frames:
+            continue
+        if rate_limiter is not None:
+            rate_limiter.wait(len(frames), size, stop)
+
+        write_start = time.perf_counter()
+        error = _write(sock, frames, logger, name)
+        write_end = time.perf_counter()
+        for delivery in deliveries:
+            if error is not None:
+                delivery.fail(error)
+            else:
+                delivery.done(write_start, write_end)
+        if error is not None:
+            # The file taken while coalescing cannot be sent either
+            if isinstance(pending, Delivery) and pending.start():
+                pending.fail(error)
+            break
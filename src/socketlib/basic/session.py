@@ -0,0 +1,412 @@
+import collections
+import logging
+import os
+import queue
+import selectors
+import socket
+import struct
+import threading
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+from socketlib.basic.codecs import Codec
+from socketlib.basic.delivery import Delivery
+from socketlib.basic.files import FileTransfer
+from socketlib.exceptions.exceptions import CodecError
+
+# Kinds of session messages
+DATA = 0
+ACK = 1
+HELLO = 2
+
+
+class SessionMessage(NamedTuple):
+    """ A message of a session. """
+    kind: int
+    # Sequence number of data messages. In acks and hellos, the sequence number
+    # of the last data message received in order
+    number: int
+    # Payload of data messages. In hellos, the id of the session of the sender
+    # and the id of the session of its peer, or zero if it does not know it
+    body: Any
+
+
+class SessionCodec(Codec):
+    """ Converts session messages to and from bytes.
+
+        Each message starts with a header with its kind and its number, followed
+        by the payload of data messages or the session ids of hellos. Payloads are
+        converted with the given codec. Without a codec, payloads must be strings
+        or bytes and are decoded as bytes.
+
+        The header is binary, so this codec must be used with a length prefixed framing.
+    """
+    header = struct.Struct("!BQ")
+    hello = struct.Struct("!QQ")
+
+    def __init__(self, codec: Optional[Codec] = None, encoding: str = "utf-8"):
+        self.codec = codec
+        self.encoding = encoding
+
+    def encode(self, msg: SessionMessage) -> bytes:
+        try:
+            kind, number, body = msg
+            header = self.header.pack(kind, number)
+            if kind == HELLO:
+                return header + self.hello.pack(*body)
+        except (TypeError, ValueError, struct.error) as err:
+            raise CodecError(f"Cannot encode session message: {err}")
+        if kind == ACK:
+            return header
+        if self.codec is not None:
+            return header + self.codec.encode(body)
+        if isinstance(body, str):
+            return header + body.encode(self.encoding)
+        if isinstance(body, (bytes, bytearray, memoryview)):
+            return header + body
+        raise CodecError(f"Cannot encode payload of type {type(body).__name__}")
+
+    def decode(self, data: bytes) -> SessionMessage:
+        try:
+            kind, number = self.header.unpack_from(data)
+            if kind == HELLO:
+                return SessionMessage(kind, number, self.hello.unpack_from(data, self.header.size))
+        except struct.error as err:
+            raise CodecError(f"Cannot decode session message: {err}")
+        if kind == ACK:
+            return SessionMessage(kind, number, None)
+        if kind != DATA:
+            raise CodecError(f"Cannot decode session message: invalid kind {kind}")
+        body = data[self.header.size:]
+        if self.codec is not None:
+            body = self.codec.decode(body)
+        return SessionMessage(kind, number, body)
+
+
+class SessionQueue:
+    """ The to_send queue of a session.
+
+        Messages taken from the queue get the next sequence number and are kept
+        in a retransmit window until the peer acknowledges them. The window is
+        bounded. With the "block" window policy, no new message is taken while
+        the window is full, so once maxsize messages are waiting, put blocks until
+        the peer acknowledges some. With the "evict" policy, the oldest message is
+        dropped from the full window instead and can no longer be sent again.
+
+        After a new connection, only the hello is taken until the hello of the peer
+        arrives. Then the messages of the window the peer has not acknowledged are
+        taken again, before the new messages. Acks are taken before any other message.
+
+        Has the same interface as queue.Queue, except for join and task_done.
+        Files cannot be sent in a session.
+    """
+
+    window_policies = ("block", "evict")
+
+    def __init__(self, maxsize: int = 0, window_size: int = 4096, window_policy: str = "block"):
+        """
+            :param maxsize: Maximum number of messages waiting to be sent. If zero, the queue is unbounded.
+            :param window_size: Maximum number of messages kept until they are acknowledged.
+            :param window_policy: What to do with a new message when the window is full. "block"
+                waits for acknowledgements, "evict" drops the oldest message of the window. Evicted
+                messages that are lost with a connection cannot be sent again.
+        """
+        if window_policy not in self.window_policies:
+            raise ValueError(f"Unexpected window policy {window_policy}")
+        self.maxsize = maxsize
+        self.window_size = window_size
+        self.window_policy = window_policy
+        self._items = collections.deque()
+        self._window = collections.deque()  # type: collections.deque[SessionMessage]
+        self._retransmit = collections.deque()  # type: collections.deque[SessionMessage]
+        self._control = collections.deque()  # type: collections.deque[SessionMessage]
+        self._hello = None  # type: Optional[Callable[[], SessionMessage]]  # Creates the hello to send
+        self._next_number = 1
+        self._acked = 0  # Last sequence number acknowledged by the peer
+        self._ack_number = 0  # Number of the next ack to send and when it is due
+        self._ack_due = None  # type: Optional[float]
+        self._resumed = False
+
+        self.retransmitted = 0  # Messages sent again after reconnecting
+        self.evicted = 0  # Messages dropped from the full window with the "evict" policy
+
+        self._mutex = threading.Lock()
+        self._not_empty = threading.Condition(self._mutex)
+        self._not_full = threading.Condition(self._mutex)
+
+    @property
+    def window(self) -> int:
+        """ Number of messages sent and not acknowledged. """
+        return len(self._window)
+
+    def qsize(self) -> int:
+        """ Number of messages waiting to be sent, including those to send again. """
+        with self._mutex:
+            return len(self._items) + len(self._retransmit)
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None) -> None:
+        msg = item.msg if isinstance(item, Delivery) else item
+        if isinstance(msg, FileTransfer):
+            raise TypeError("Files cannot be sent in a session")
+        with self._not_full:
+            if 0 < self.maxsize <= len(self._items):
+                if not block:
+                    raise queue.Full
+                if not self._not_full.wait_for(
+                        lambda: len(self._items) < self.maxsize, timeout):
+                    raise queue.Full
+            self._items.append(item)
+            self._not_empty.notify()
+
+    def put_nowait(self, item: Any) -> None:
+        self.put(item, block=False)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._not_empty:
+            while True:
+                item = self._next()
+                if item is not None:
+                    return item
+                if not block:
+                    raise queue.Empty
+                now = time.monotonic()
+                waits = [deadline - now] if deadline is not None else []
+                if self._resumed and self._ack_due is not None:
+                    waits.append(self._ack_due - now)
+                wait = min(waits, default=None)
+                if deadline is not None and deadline <= now:
+                    raise queue.Empty
+                self._not_empty.wait(wait)
+
+    def get_nowait(self) -> Any:
+        return self.get(block=False)
+
+    def _next(self) -> Any:
+        """ Returns the next item to send, or None if there is none yet. """
+        if self._hello is not None:
+            hello, self._hello = self._hello, None
+            return hello()
+        if self._control:
+            return self._control.popleft()
+        if not self._resumed:
+            return None
+        if self._ack_due is not None and self._ack_due <= time.monotonic():
+            self._ack_due = None
+            return SessionMessage(ACK, self._ack_number, None)
+        while self._retransmit:
+            msg = self._retransmit.popleft()
+            if msg.number > self._acked:
+                self.retransmitted += 1
+                return msg
+        if not self._items:
+            return None
+        window_full = len(self._window) >= self.window_size
+        if window_full and self.window_policy != "evict":
+            return None  # Wait for the peer to acknowledge messages
+
+        item = self._items.popleft()
+        self._not_full.notify()
+        delivery = item if isinstance(item, Delivery) else None
+        msg = SessionMessage(DATA, self._next_number, item.msg if delivery else item)
+        self._next_number += 1
+        if window_full:
+            self._window.popleft()
+            self.evicted += 1
+        self._window.append(msg)
+        if delivery is not None:
+            delivery.msg = msg
+            return delivery
+        return msg
+
+    def restart(self, hello: Callable[[], SessionMessage]) -> None:
+        """ Start a new connection. The hello, created by the given function
+            when it is sent, is sent first, and no other message is sent until
+            the hello of the peer arrives.
+        """
+        with self._not_empty:
+            self._control.clear()
+            self._hello = hello
+            self._retransmit.clear()
+            self._ack_due = None
+            self._resumed = False
+            self._not_empty.notify_all()
+
+    def resume(self, acked: int) -> int:
+        """ Called when the hello of the peer arrives with the last message it
+            received. The messages of the window after it are sent again.
+
+            Returns the number of messages after it that cannot be sent again
+            because they were dropped from the window.
+        """
+        with self._not_empty:
+            self._acked = acked
+            self._trim()
+            first = self._window[0].number if self._window else self._next_number
+            self._retransmit = collections.deque(self._window)
+            self._resumed = True
+            self._not_empty.notify_all()
+            return first - acked - 1
+
+    def ack(self, number: int) -> None:
+        """ Remove the acknowledged messages from the window. """
+        with self._not_empty:
+            if number > self._acked:
+                self._acked = number
+                self._trim()
+                self._not_empty.notify()
+
+    def _trim(self) -> None:
+        while self._window and self._window[0].number <= self._acked:
+            self._window.popleft()
+
+    def schedule_ack(self, number: int, delay: float) -> None:
+        """ Send an ack with the given number in delay seconds, or sooner if
+            another ack is already due.
+        """
+        with self._not_empty:
+            self._ack_number = number
+            due = time.monotonic() + delay
+            if self._ack_due is None or due < self._ack_due:
+                self._ack_due = due
+            self._not_empty.notify()
+
+    def wake(self) -> None:
+        """ Make the sender write an ack, so it notices a lost connection. """
+        with self._not_empty:
+            if not self._control and self._hello is None:
+                self._control.append(SessionMessage(ACK, self._ack_number, None))
+                self._not_empty.notify()
+
+
+class Session:
+    """ The state of a session between two peers.
+
+        Each data message has a sequence number, and the receiver acknowledges
+        the messages it has received in order with cumulative acks, every ack_every
+        messages or ack_interval seconds after a message arrives. When a connection
+        is established, each peer sends a hello with the last message it received.
+        The peer then resumes from there: it sends again the messages of its retransmit
+        window that were not received, and the receiver discards the messages it had
+        already received.
+
+        Each session has a random id. A peer that connects with a different id has
+        restarted, so its messages are numbered again from the start, and the messages
+        it had not acknowledged are sent again.
+    """
+
+    def __init__(
+            self,
+            send_queue: SessionQueue,
+            received: queue.Queue[Any],
+            logger: Optional[logging.Logger] = None,
+            name: str = ""
+    ):
+        """
+            :param send_queue: The to_send queue of the connection.
+            :param received: The queue where the data messages received are put.
+            :param logger: Optional logger.
+            :param name: Name used in the log messages.
+        """
+        self.id = int.from_bytes(os.urandom(8), "big") or 1
+        self.peer_id = 0  # Zero until the first hello of the peer arrives
+        # Number of the last message received in order. None until the first message of a peer
+        self.received_number = None  # type: Optional[int]
+        self.ack_every = 64
+        self.ack_interval = 0.05
+
+        self.resumes = 0  # Hellos received
+        self.duplicates = 0  # Messages discarded because they had already been received
+        self.lost = 0  # Messages of the peer that were not received
+        self.unrecoverable = 0  # Messages that the peer did not receive and could not be sent again
+
+        self._send_queue = send_queue
+        self._received = received
+        self._unacked = 0
+        self._logger = logger
+        self._name = name
+
+    def start_connection(self) -> None:
+        """ Called before a new connection is established. """
+        self._unacked = 0
+        self._send_queue.restart(self._hello)
+
+    def connection_lost(self) -> None:
+        """ Called when the receiver notices that the connection is lost. """
+        self._send_queue.wake()
+
+    def dispatch(self, msg: SessionMessage) -> None:
+        """ Handle a received message. """
+        if msg.kind == DATA:
+            self._receive(msg)
+        elif msg.kind == ACK:
+            self._send_queue.ack(msg.number)
+        elif msg.kind == HELLO:
+            self._resume(msg)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "window": self._send_queue.window,
+            "retransmitted": self._send_queue.retransmitted,
+            "evicted": self._send_queue.evicted,
+            "resumes": self.resumes,
+            "duplicates": self.duplicates,
+            "lost": self.lost,
+            "unrecoverable": self.unrecoverable,
+        }
+
+    def _hello(self) -> SessionMessage:
+        return SessionMessage(HELLO, self.received_number or 0, (self.id, self.peer_id))
+
+    def _receive(self, msg: SessionMessage) -> None:
+        if self.received_number is not None:
+            if msg.number <= self.received_number:
+                self.duplicates += 1
+                self._send_queue.schedule_ack(self.received_number, self.ack_interval)
+                return
+            if msg.number > self.received_number + 1:
+                self.lost += msg.number - self.received_number - 1
+                if self._logger:
+                    self._logger.info(
+                        f"{self._name} lost messages {self.received_number + 1} to {msg.number - 1}")
+        self.received_number = msg.number
+        self._received.put(msg.body)
+
+        self._unacked += 1
+        if self._unacked >= self.ack_every:
+            self._unacked = 0
+            self._send_queue.schedule_ack(msg.number, 0)
+        else:
+            self._send_queue.schedule_ack(msg.number, self.ack_interval)
+
+    def _resume(self, msg: SessionMessage) -> None:
+        peer_id, known_id = msg.body
+        if peer_id != self.peer_id:
+            if self.peer_id and self._logger:
+                self._logger.info(f"{self._name}: the peer started a new session")
+            self.peer_id = peer_id
+            self.received_number = None
+        # A peer that does not know this session has not received any of its messages
+        acked = msg.number if known_id == self.id else 0
+        missing = self._send_queue.resume(acked)
+        self.resumes += 1
+        if known_id == self.id and missing > 0:
+            self.unrecoverable += missing
+            if self._logger:
+                self._logger.info(
+                    f"{self._name} cannot send {missing} messages again. "
+                    f"They were dropped from the retransmit window")
+
+
+def peer_closed(sock: socket.socket) -> bool:
+    """ True if the peer closed the connection or it was reset. Does not block. """
+    try:
+        with selectors.DefaultSelector() as selector:
+            selector.register(sock, selectors.EVENT_READ)
+            readable = selector.select(0)
+        return bool(readable) and not sock.recv(1, socket.MSG_PEEK)
+    except (OSError, ValueError):  # ValueError if the socket was closed
+        return True
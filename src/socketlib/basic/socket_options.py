@@ -0,0 +1,111 @@
+import dataclasses
+import socket
+from typing import Optional
+
+
+@dataclasses.dataclass
+class SocketOptions:
+    """ Options applied to the sockets of clients and servers.
+
+        Options that are None are left with the operating system default. Options
+        that are not supported by the platform or by the socket family are ignored.
+    """
+    # Disable Nagle's algorithm, so small messages are sent immediately
+    no_delay: Optional[bool] = None
+    # Size of the kernel send and receive buffers in bytes
+    send_buffer: Optional[int] = None
+    recv_buffer: Optional[int] = None
+    # TCP keepalive. Idle time and interval are in seconds
+    keepalive: Optional[bool] = None
+    keep_idle: Optional[int] = None
+    keep_interval: Optional[int] = None
+    keep_count: Optional[int] = None
+    # Send ACKs immediately instead of delaying them (Linux only). It is a one-time
+    # hint: the kernel clears it on its own, so it is not kept after the first exchanges
+    quick_ack: Optional[bool] = None
+    # Options of listening sockets
+    backlog: Optional[int] = None
+    reuse_address: bool = True
+    reuse_port: bool = False
+
+    presets = ("default", "low-latency", "bulk-throughput")
+
+    @classmethod
+    def preset(cls, name: str) -> "SocketOptions":
+        """ Returns the options of a named preset.
+
+            - "default": operating system defaults.
+            - "low-latency": for request/reply exchanges of small messages.
+            - "bulk-throughput": for streams of large amounts of data.
+        """
+        if name == "default":
+            return cls()
+        elif name == "low-latency":
+            return cls(
+                no_delay=True,
+                keepalive=True,
+                keep_idle=10,
+                keep_interval=5,
+                keep_count=3,
+            )
+        elif name == "bulk-throughput":
+            return cls(
+                no_delay=False,
+                send_buffer=4 * 1024 * 1024,
+                recv_buffer=4 * 1024 * 1024,
+                keepalive=True,
+                keep_idle=60,
+                keep_interval=10,
+                keep_count=5,
+                backlog=1024,
+            )
+        raise ValueError(f"Unexpected socket options preset {name}")
+
+    def apply(self, sock: socket.socket) -> None:
+        """ Apply the options to a connected socket or to a socket that
+            is about to connect.
+        """
+        self._set(sock, socket.SOL_SOCKET, "SO_SNDBUF", self.send_buffer)
+        self._set(sock, socket.SOL_SOCKET, "SO_RCVBUF", self.recv_buffer)
+        self._set(sock, socket.SOL_SOCKET, "SO_KEEPALIVE", self.keepalive)
+
+        if (sock.family not in (socket.AF_INET, socket.AF_INET6)
+                or sock.type != socket.SOCK_STREAM):
+            return
+        self._set(sock, socket.IPPROTO_TCP, "TCP_NODELAY", self.no_delay)
+        self._set(sock, socket.IPPROTO_TCP, "TCP_KEEPIDLE", self.keep_idle)
+        self._set(sock, socket.IPPROTO_TCP, "TCP_KEEPINTVL", self.keep_interval)
+        self._set(sock, socket.IPPROTO_TCP, "TCP_KEEPCNT", self.keep_count)
+        self._set(sock, socket.IPPROTO_TCP, "TCP_QUICKACK", self.quick_ack)
+
+    def apply_listener(self, sock: socket.socket) -> None:
+        """ Apply the options to a listening socket before it is bound.
+
+            Connections accepted by the socket inherit the buffer sizes.
+        """
+        self._set(sock, socket.SOL_SOCKET, "SO_REUSEADDR", self.reuse_address)
+        if self.reuse_port:
+            self._set(sock, socket.SOL_SOCKET, "SO_REUSEPORT", True)
+        self._set(sock, socket.SOL_SOCKET, "SO_SNDBUF", self.send_buffer)
+        self._set(sock, socket.SOL_SOCKET, "SO_RCVBUF", self.recv_buffer)
+
+    def listen(self, sock: socket.socket) -> None:
+        """ Put a bound socket in listen mode with the configured backlog. """
+        if self.backlog is None:
+            sock.listen()
+        else:
+            sock.listen(self.backlog)
+
+    @staticmethod
+    def _set(
+            sock: socket.socket,
+            level: int,
+            option: str,
+            value: Optional[bool | int]
+    ) -> None:
+        if value is None:
+            return
+        option_value = getattr(socket, option, None)
+        if option_value is None:
+            return  # Not supported by this platform
+        sock.setsockopt(level, option_value, int(value))
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from socketlib.basic.buffer import Buffer
+from socketlib.basic.codecs import Codec
+from socketlib.basic.compression import Compressor
+from socketlib.basic.framing import Framing
+from socketlib.basic.receive import decode_msgs
+from socketlib.basic.send import encode_msg
+from socketlib.exceptions.exceptions import (
+    CodecError,
+    CompressionError,
+    FramingError,
+)
+
+
+async def wait_or_stop(
+        awaitable: Awaitable,
+        stop: Callable[[], bool],
+        poll: Optional[float],
+        timeout: Optional[float] = None,
+) -> tuple[bool, Any]:
+    """ Wait for an awaitable, checking the stop function every `poll` seconds.
+
+        Returns a tuple with a boolean that is true if the stop function evaluated
+        to true before the awaitable finished, and the result of the awaitable.
+        The awaitable must be safe to cancel. Raises TimeoutError if the timeout
+        expires first.
+
+        :param poll: Seconds between checks of the stop function. If None, the stop function
+            is only checked once before waiting.
+        :param timeout: Optional maximum time in seconds to wait.
+    """
+    if stop():
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        return True, None
+    if poll is None:
+        return False, await asyncio.wait_for(awaitable, timeout)
+
+    task = asyncio.ensure_future(awaitable)
+    waited = 0.
+    try:
+        while True:
+            wait = poll if timeout is None else min(poll, timeout - waited)
+            done, _ = await asyncio.wait({task}, timeout=wait)
+            if done:
+                return False, task.result()
+            waited += wait
+            if stop():
+                return True, None
+            if timeout is not None and waited >= timeout:
+                raise TimeoutError
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+async def until_lost(*coroutines: Awaitable[bool]) -> bool:
+    """ Run coroutines that return true if the connection is lost. Returns true
+        as soon as one of them does, cancelling the others, or false once all
+        of them have finished.
+    """
+    pending = {asyncio.ensure_future(coro) for coro in coroutines}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED)
+            if any(task.result() for task in done):
+                return True
+        return False
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def receive_from_stream(
+        reader: asyncio.StreamReader,
+        buffer: Buffer,
+        msg_end: bytes,
+        msg_queue: asyncio.Queue[Any],
+        stop: Callable[[], bool],
+        timeout: Optional[float] = None,
+        poll: Optional[float] = None,
+        logger: Optional[logging.Logger] = None,
+        name: str = "",
+        batch: bool = False,
+        codec: Optional[Codec] = None,
+) -> bool:
+    """ Receive messages from a stream and put them in a queue until the
+        stop function evaluates to true.
+
+        Mirrors `receive_and_enqueue`. Returns true if the connection was lost.
+    """
+    while True:
+        error = ""
+        try:
+            stopped, data = await wait_or_stop(
+                reader.read(buffer.recv_size), stop, poll, timeout)
+            if stopped:
+                return False
+            messages = buffer.feed(data, msg_end) if data else None
+            if messages is None and buffer.dropped:
+                error = f"{name} dropped connection. Frame too large"
+        except ConnectionError:
+            messages = None
+            error = f"{name} failed to get message. Connection lost"
+        except TimeoutError:
+            messages = None
+            error = f"{name} failed to get message. Timed out"
+        except CompressionError as err:
+            messages = None
+            error = f"{name} failed to decompress message. {err}"
+        except FramingError as err:
+            messages = None
+            error = f"{name} failed to split message. {err}"
+
+        if messages is None:
+            if error and logger:
+                logger.info(error)
+            return True
+
+        if codec is not None:
+            messages = decode_msgs(messages, codec, logger, name)
+        if not messages:
+            continue
+        if batch:
+            messages = [messages]
+        for msg in messages:
+            try:
+                stopped, _ = await wait_or_stop(msg_queue.put(msg), stop, poll, timeout)
+            except TimeoutError:
+                stopped = False
+                if logger:
+                    logger.info(f"{name} failed to enqueue message")
+            if stopped:
+                return False
+
+
+async def send_to_stream(
+        writer: asyncio.StreamWriter,
+        msg_end: bytes,
+        msg_queue: asyncio.Queue[Any],
+        stop: Callable[[], bool],
+        timeout: Optional[float] = None,
+        poll: Optional[float] = None,
+        logger: Optional[logging.Logger] = None,
+        name: str = "",
+        encoding: str = "utf-8",
+        framing: Optional[Framing] = None,
+        codec: Optional[Codec] = None,
+        compressor: Optional[Compressor] = None,
+        max_batch_count: int = 1024,
+) -> bool:
+    """ Get messages from a queue and write them to a stream until the
+        stop function evaluates to true.
+
+        The messages already in the queue are written together, up to
+        max_batch_count messages, before waiting for the stream to drain.
+
+        Mirrors `get_and_send_messages`. Returns true if the connection was lost.
+    """
+    while True:
+        stopped, msg = await wait_or_stop(msg_queue.get(), stop, poll)
+        if stopped:
+            return False
+
+        count = 0
+        while True:
+            try:
+                writer.write(encode_msg(
+                    msg, msg_end, encoding, framing, codec, compressor))
+            except (CodecError, FramingError) as err:
+                if logger:
+                    logger.info(f"{name} failed to encode message. {err}")
+            count += 1
+            if count >= max_batch_count or msg_queue.empty():
+                break
+            msg = msg_queue.get_nowait()
+
+        try:
+            await asyncio.wait_for(writer.drain(), timeout)
+        except ConnectionError:
+            error = f"{name} failed to send message. Connection lost"
+        except TimeoutError:
+            error = f"{name} failed to send message. Timed out"
+        else:
+            continue
+        if logger:
+            logger.info(error)
+        return True
@@ -7,9 +7,12 @@ from socketlib import (
     Client,
     ClientReceiver,
     ClientSender,
+    DatagramReceiver,
+    DatagramSender,
     Server,
     ServerReceiver,
     ServerSender,
+    SocketOptions,
 )
 from socketlib.utils.logger import get_module_logger
 
@@ -21,9 +24,10 @@ def start_socket(
         reconnect: bool,
         timeout: float,
         messages: list[str],
-        logger: logging.Logger
+        logger: logging.Logger,
+        profile: str = "default",
 ) -> None:
-    valid_types = ["multi", "receiver", "sender"]
+    valid_types = ["multi", "receiver", "sender", "datagram"]
     if client and sock_type == "client":
         sock_type = "multi"
     elif not client and sock_type == "server":
@@ -116,12 +120,33 @@ def start_socket(
                     logger=logger
                 )
 
+    elif sock_type == "datagram":
+        if not client:
+            socket = DatagramReceiver(address, timeout=timeout, logger=logger)
+            msg_logger = MessageLogger(socket.received, logger)
+        elif not messages:
+            socket = DatagramSender(address, timeout=timeout, logger=logger)
+            msg_gen = MessageGenerator(socket.to_send, name=name, logger=logger)
+        else:
+            to_send = queue.Queue()
+            for msg in messages:
+                to_send.put(msg)
+            socket = DatagramSender(
+                address,
+                to_send=to_send,
+                timeout=timeout,
+                stop=lambda: to_send.empty(),
+                logger=logger
+            )
+
     else:
         raise ValueError(f"Unexpected type {sock_type}")
 
+    socket.socket_options = SocketOptions.preset(profile)
+
     with socket:
         if isinstance(socket,
-                      (Client, ClientReceiver, ClientSender)):
+                      (Client, ClientReceiver, ClientSender, DatagramSender)):
             socket.connect()
 
         socket.start()
@@ -173,9 +198,10 @@ def parse_args():
         "--type",
         "-t",
         type=str,
-        choices=["multi", "receiver", "sender"],
+        choices=["multi", "receiver", "sender", "datagram"],
         default="multi",
-        help="The type of the server or client. Can be multi, receiver or sender"
+        help="The type of the server or client. Can be multi, receiver, sender or datagram."
+             " A datagram server receives messages over UDP and a datagram client sends them"
              " (default multi)."
     )
     parser.add_argument(
@@ -201,13 +227,25 @@ def parse_args():
              " The program will exit after sending all messages. "
     )
 
+    parser.add_argument(
+        "--profile",
+        "-f",
+        type=str,
+        choices=SocketOptions.presets,
+        default="default",
+        help="Socket options profile. Can be default, low-latency or bulk-throughput"
+             " (default default)."
+    )
+
     args = parser.parse_args()
     address = (args.ip, args.port)
-    return address, args.server, args.type, args.reconnect, args.timeout, args.messages
+    return (address, args.server, args.type, args.reconnect, args.timeout,
+            args.messages, args.profile)
 
 
 def main():
-    address, server, sock_type, reconnect, timeout, messages = parse_args()
+    (address, server, sock_type, reconnect,
+     timeout, messages, profile) = parse_args()
     logger = get_module_logger(__name__, config="dev", use_file_handler=False)
     start_socket(
         address,
@@ -216,7 +254,8 @@ def main():
         reconnect=reconnect,
         timeout=timeout,
         messages=messages,
-        logger=logger
+        logger=logger,
+        profile=profile
     )
 
 
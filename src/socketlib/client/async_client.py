@@ -0,0 +1,274 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Optional
+
+from socketlib.basic.address import Address, create_socket, is_unix_address, socket_address
+from socketlib.basic.backoff import Backoff
+from socketlib.basic.buffer import Buffer
+from socketlib.basic.codecs import Codec
+from socketlib.basic.compression import Compressor, check_framing
+from socketlib.basic.framing import Framing
+from socketlib.basic.socket_options import SocketOptions
+from socketlib.basic.streams import receive_from_stream, send_to_stream, until_lost
+
+
+class AsyncClient:
+    """ A client that sends and receives messages to and from a server with asyncio.
+
+        It is the asyncio counterpart of `Client`. Both directions run as tasks
+        in the event loop, and the received and to_send queues are asyncio queues.
+        The framing, codec and compression attributes work as in `Client`.
+
+        If no stop functions are given, the client is stopped with `shutdown`.
+        Stop functions that are given are checked every `poll_interval` seconds.
+    """
+
+    def __init__(
+            self,
+            address: Address,
+            received: Optional[asyncio.Queue[Any]] = None,
+            to_send: Optional[asyncio.Queue[Any]] = None,
+            reconnect: bool = True,
+            timeout: Optional[float] = None,
+            stop_receive: Optional[Callable[[], bool]] = None,
+            stop_send: Optional[Callable[[], bool]] = None,
+            stop_reconnect: Optional[Callable[[], bool]] = None,
+            logger: Optional[logging.Logger] = None,
+    ):
+        """
+           Initialize the AsyncClient class.
+
+           :param address: A tuple representing the IP address and port number to connect to,
+                or the path of a Unix domain socket.
+           :param received: Optional queue to store received messages.
+           :param to_send: Optional queue containing messages to be sent.
+           :param reconnect: If True, the client will attempt to reconnect after disconnection.
+           :param timeout: Optional timeout value for send and receive operations.
+           :param stop_receive: A function that returns True to signal the receiving loop to stop.
+           :param stop_send: A function that returns True to signal the sending loop to stop.
+           :param stop_reconnect: A function that returns True to signal the reconnecting loop to stop. Won't have
+                any effect if reconnect is set to False.
+           :param logger: Optional logger for logging client events.
+       """
+        self._address = address
+        self._reconnect = reconnect
+        self._timeout = timeout
+        self._logger = logger
+
+        self._received = received if received is not None else asyncio.Queue()
+        self._to_send = to_send if to_send is not None else asyncio.Queue()
+
+        self._polling = any(
+            stop is not None for stop in (stop_receive, stop_send, stop_reconnect))
+        self._stopped = False
+        self._stop_receive = stop_receive or self._is_stopped
+        self._stop_send = stop_send or self._is_stopped
+        self._stop_reconnect = stop_reconnect or self._is_stopped
+
+        self._reader = None  # type: Optional[asyncio.StreamReader]
+        self._writer = None  # type: Optional[asyncio.StreamWriter]
+        self._buffer = None  # type: Optional[Buffer]
+        self._task = None  # type: Optional[asyncio.Task]
+        self._connect_timeout = None  # type: Optional[float]
+
+        self.msg_end = b"\r\n"
+        self.encoding = "utf-8"
+        # If true, the messages obtained from a single read are put in
+        # the received queue as one list.
+        self.batch_received = False
+        # Strategy used to delimit messages. If None, messages end with msg_end
+        self.framing = None  # type: Optional[Framing]
+        # Converts messages to and from bytes. If None, messages sent must be
+        # strings or bytes and received messages are bytes
+        self.codec = None  # type: Optional[Codec]
+        # Optional compression of messages. Requires a length prefixed framing
+        self.compression = None  # type: Optional[Compressor]
+        # Limits of the memory used to receive messages. See Buffer
+        self.max_frame_size = None  # type: Optional[int]
+        self.max_buffered = None  # type: Optional[int]
+        self.oversize_policy = "drop"
+        # Maximum number of queued messages written before waiting for the socket
+        self.max_batch_count = 1024
+        # Options such as TCP_NODELAY or the buffer sizes applied to the sockets
+        self.socket_options = SocketOptions()
+        # Seconds between checks of the stop functions
+        self.poll_interval = 0.1
+        # Delays between connection attempts
+        self.backoff = Backoff()
+
+    @property
+    def ip(self) -> str:
+        """ The IP address, or the path of a Unix domain socket. """
+        if is_unix_address(self._address):
+            return os.fspath(self._address)
+        return self._address[0]
+
+    @property
+    def port(self) -> Optional[int]:
+        """ The port, or None for a Unix domain socket. """
+        if is_unix_address(self._address):
+            return None
+        return self._address[1]
+
+    @property
+    def received(self) -> asyncio.Queue[Any]:
+        return self._received
+
+    @property
+    def to_send(self) -> asyncio.Queue[Any]:
+        return self._to_send
+
+    @property
+    def task(self) -> Optional[asyncio.Task]:
+        return self._task
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None
+
+    async def connect(self, timeout: Optional[float] = None) -> bool:
+        """ Connect to the server. This will attempt to connect to the server indefinitely
+            unless a timeout is given. Returns true if the connection was established.
+        """
+        check_framing(self.compression, self.framing)
+        self._connect_timeout = timeout
+        start = time.monotonic()
+        if timeout is None:
+            timeout = float("inf")
+
+        retry = 0
+        while time.monotonic() - start <= timeout:
+            sock = create_socket(self._address)
+            self.socket_options.apply(sock)
+            sock.setblocking(False)
+            try:
+                await asyncio.get_running_loop().sock_connect(
+                    sock, socket_address(self._address))
+            except OSError:
+                # Any failed attempt is retried, like in the threaded clients
+                sock.close()
+                if self._reconnect and self._stop_reconnect():
+                    break
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(self.backoff.delay(retry), remaining))
+                retry += 1
+                continue
+
+            self._reader, self._writer = await asyncio.open_connection(sock=sock)
+            if self.compression is not None:
+                self.compression.reset()
+            self._buffer = Buffer(
+                None,
+                framing=self.framing,
+                max_frame_size=self.max_frame_size,
+                max_buffered=self.max_buffered,
+                oversize_policy=self.oversize_policy,
+                compressor=self.compression
+            )
+            if self._logger is not None:
+                self._logger.info(
+                    f"{self.__class__.__name__}: connected to {self._address}")
+            return True
+
+        if self._logger is not None:
+            self._logger.error(
+                f"{self.__class__.__name__}: "
+                f"failed to establish connection to {self._address}"
+            )
+        return False
+
+    async def run(self) -> None:
+        """ Send and receive messages until the stop functions evaluate to
+            true, reconnecting if the connection is lost.
+        """
+        if not self.connected and not await self.connect(self._connect_timeout):
+            return
+        try:
+            while True:
+                lost = await self._serve()
+                await self._close()
+                if not lost or not self._reconnect or self._stop_reconnect():
+                    break
+                if not await self.connect(self._connect_timeout):
+                    break
+        finally:
+            await self._close()
+
+    def start(self) -> asyncio.Task:
+        """ Start this client in a new task of the running event loop. """
+        self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    async def join(self) -> None:
+        """ Wait for the client task to finish. """
+        if self._task is not None:
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def shutdown(self) -> None:
+        self._stopped = True
+        if self._task is not None and not self._polling:
+            self._task.cancel()
+        await self.join()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self._close()
+
+    def _is_stopped(self) -> bool:
+        return self._stopped
+
+    async def _serve(self) -> bool:
+        """ Send and receive messages until both directions stop. Returns
+            true if the connection was lost.
+        """
+        name = self.__class__.__name__
+        poll = self.poll_interval if self._polling else None
+        return await until_lost(
+            receive_from_stream(
+                reader=self._reader,
+                buffer=self._buffer,
+                msg_end=self.msg_end,
+                msg_queue=self._received,
+                stop=self._stop_receive,
+                timeout=self._timeout,
+                poll=poll,
+                logger=self._logger,
+                name=name,
+                batch=self.batch_received,
+                codec=self.codec
+            ),
+            send_to_stream(
+                writer=self._writer,
+                msg_end=self.msg_end,
+                msg_queue=self._to_send,
+                stop=self._stop_send,
+                timeout=self._timeout,
+                poll=poll,
+                logger=self._logger,
+                name=name,
+                encoding=self.encoding,
+                framing=self.framing,
+                codec=self.codec,
+                compressor=self.compression,
+                max_batch_count=self.max_batch_count
+            )
+        )
+
+    async def _close(self) -> None:
+        if self._writer is None:
+            return
+        writer, self._writer, self._reader = self._writer, None, None
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
@@ -0,0 +1,79 @@
+import logging
+from typing import Callable, Optional
+
+from socketlib.basic.address import Address
+from socketlib.basic.channels import Channel, ChannelCodec, ChannelQueue, Channels
+from socketlib.basic.framing import LengthPrefixFraming
+from socketlib.basic.rpc import DispatchQueue
+from socketlib.client.client import Client
+
+
+class ChannelClient(Client):
+    """ A client that multiplexes several logical channels over one connection.
+
+        Each channel has its own received and to_send queues, and its messages
+        are sent with its channel id. The channels with messages to send take
+        turns, one message each. Channels are opened with `channel`, or when a
+        message of a new channel is received.
+
+        Messages must be sent through the queues of the channels, not through
+        the to_send queue of the client.
+    """
+
+    def __init__(
+            self,
+            address: Address,
+            reconnect: bool = True,
+            timeout: Optional[float] = None,
+            stop_receive: Callable[[], bool] = None,
+            stop_send: Callable[[], bool] = None,
+            stop_reconnect: Optional[Callable[[], bool]] = None,
+            logger: Optional[logging.Logger] = None,
+            maxsize: int = 1024,
+            max_channels: Optional[int] = 256,
+    ):
+        """
+           Initialize the ChannelClient class.
+
+           :param address: A tuple representing the IP address and port number to connect to,
+                or the path of a Unix domain socket.
+           :param reconnect: If True, the client will attempt to reconnect after disconnection.
+           :param timeout: Optional timeout value for send and receive operations.
+           :param stop_receive: A function that returns True to signal the receiving loop to stop.
+           :param stop_send: A function that returns True to signal the sending loop to stop.
+           :param stop_reconnect: A function that returns True to signal the reconnecting loop to stop. Won't have
+                any effect if reconnect is set to False.
+           :param logger: Optional logger for logging client events.
+           :param maxsize: Maximum number of messages in the received queue of each channel.
+                Messages received when it is full are dropped. If zero, the queues are unbounded.
+           :param max_channels: Maximum number of open channels. Messages of new channels are
+                dropped once it is reached. If None, there is no limit.
+       """
+        send_queue = ChannelQueue()
+        self._channels = Channels(
+            send_queue, maxsize, max_channels, logger=logger, name=self.__class__.__name__)
+        super().__init__(
+            address=address,
+            received=DispatchQueue(self._channels.dispatch),
+            to_send=send_queue,
+            reconnect=reconnect,
+            timeout=timeout,
+            stop_receive=stop_receive,
+            stop_send=stop_send,
+            stop_reconnect=stop_reconnect,
+            logger=logger
+        )
+        self.framing = LengthPrefixFraming()
+        # Converts the messages of the channels to bytes. Use ChannelCodec(codec)
+        # or ChannelCodec(codecs={channel_id: codec}) to convert them with other codecs
+        self.codec = ChannelCodec()
+
+    @property
+    def channels(self) -> Channels:
+        return self._channels
+
+    def channel(self, channel_id: int) -> Channel:
+        """ Returns a channel, opening it if it does not exist. Channel ids
+            are between 0 and 65535.
+        """
+        return self._channels.get(channel_id)
@@ -1,12 +1,26 @@
 import abc
+import concurrent.futures
+import errno
 import logging
+import os
 import queue
+import selectors
 import socket
 import threading
 import time
-from typing import Callable, Optional
+from typing import Any, Callable, Optional
 
+from socketlib.basic.address import Address, create_socket, is_unix_address, socket_address
+from socketlib.basic.backoff import Backoff
 from socketlib.basic.buffer import Buffer
+from socketlib.basic.codecs import Codec
+from socketlib.basic.compression import Compressor, check_framing
+from socketlib.basic.delivery import Delivery
+from socketlib.basic.files import FileTransfer
+from socketlib.basic.framing import Framing
+from socketlib.basic.rate_limit import RateLimiter
+from socketlib.basic.socket_options import SocketOptions
+from socketlib.basic.queues import LaneQueue
 from socketlib.basic.send import get_and_send_messages
 from socketlib.basic.receive import receive_and_enqueue
 
@@ -17,7 +31,7 @@ class ClientBase(abc.ABC):
 
     def __init__(
             self,
-            address: tuple[str, int],
+            address: Address,
             reconnect: bool = True,
             timeout: Optional[float] = None,
             stop: Optional[Callable[[], bool]] = None,
@@ -41,25 +55,75 @@ class ClientBase(abc.ABC):
 
         self._wait_for_connection = threading.Event()
         self._connection_failed = False
+        self._connected = False
+        # Used to interrupt a connection attempt in progress. Created when it
+        # is first needed, and again after the connection is closed
+        self._wake_pair = None  # type: Optional[tuple[socket.socket, socket.socket]]
+        self._wake_lock = threading.Lock()
         self._connect_timeout = None
 
         self._timeout = timeout  # Timeout for send and receive
 
         self.msg_end = b"\r\n"
         self.encoding = "utf-8"
+        # If true, the messages obtained from a single read are put in
+        # the received queue as one list.
+        self.batch_received = False
+        # Strategy used to delimit messages. If None, messages end with msg_end
+        self.framing = None  # type: Optional[Framing]
+        # Converts messages to and from bytes. If None, messages sent must be
+        # strings or bytes and received messages are bytes
+        self.codec = None  # type: Optional[Codec]
+        # Optional compression of messages. Requires a length prefixed framing
+        self.compression = None  # type: Optional[Compressor]
+        # Limits of the memory used to receive messages. See Buffer
+        self.max_frame_size = None  # type: Optional[int]
+        self.max_buffered = None  # type: Optional[int]
+        self.oversize_policy = "drop"
+        self._oversized_frames = 0
+        # If true, the messages already in the to_send queue are sent with
+        # a single write, up to max_batch_count messages or max_batch_bytes bytes
+        self.coalesce = False
+        self.max_batch_count = 1024
+        self.max_batch_bytes = 65536
+        # Options such as TCP_NODELAY or the buffer sizes applied to the sockets
+        self.socket_options = SocketOptions()
+        # Limits the rate at which messages are sent
+        self.rate_limiter = None  # type: Optional[RateLimiter]
+        # Delays between connection attempts, and maximum seconds a single attempt can take
+        self.backoff = Backoff()
+        self.attempt_timeout = 5.
+        # Connection metrics
+        self.connect_attempts = 0
+        self.failed_attempts = 0
+        # Seconds taken to connect the last time
+        self.time_to_connect = None  # type: Optional[float]
 
     @property
     def ip(self) -> str:
+        """ The IP address, or the path of a Unix domain socket. """
+        if is_unix_address(self._address):
+            return os.fspath(self._address)
         return self._address[0]
 
     @property
-    def port(self) -> int:
+    def port(self) -> Optional[int]:
+        """ The port, or None for a Unix domain socket. """
+        if is_unix_address(self._address):
+            return None
         return self._address[1]
 
     @property
     def run_thread(self) -> threading.Thread:
         return self._run_thread
 
+    @property
+    def connected(self) -> bool:
+        """ True while the client is connected. A lost connection is noticed
+            when sending or receiving fails.
+        """
+        return self._connected
+
     @property
     def connect_timeout(self) -> Optional[float]:
         return self._connect_timeout
@@ -77,6 +141,7 @@ class ClientBase(abc.ABC):
             unless a timeout is given.
 
         """
+        check_framing(self.compression, self.framing)
         if self.connect_timeout is None:
             self.connect_timeout = timeout
         self._connect_thread = threading.Thread(
@@ -85,37 +150,246 @@ class ClientBase(abc.ABC):
         self._connect_thread.start()
 
     def _connect_to_server(self, timeout: Optional[float] = None) -> None:
-        start = time.time()
-        if timeout is None:
-            timeout = float("inf")
-
-        error = False
-        while time.time() - start <= timeout:
-            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            try:
-                self._socket.connect((self.ip, self.port))
-                if self._timeout is not None:
-                    self._socket.settimeout(self._timeout)
-                error = False
+        """ Connect to the server, retrying with the backoff delays until the
+            timeout expires or the reconnecting loop is stopped.
+        """
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else float("inf")
+        self._close_socket()  # The previous connection, if any
+
+        sock = None
+        retry = 0
+        while True:
+            self.connect_attempts += 1
+            sock = self._attempt_connection(
+                min(deadline, time.monotonic() + self.attempt_timeout))
+            if sock is not None:
                 break
-            except (ConnectionError, socket.gaierror, TimeoutError):
-                error = True
-                time.sleep(0.5)
-
-        if error and self._logger:
-            self._connection_failed = True
-            self._logger.error(
-                f"{self.__class__.__name__}: "
-                f"failed to establish connection to {(self.ip, self.port)}"
-            )
-
-        if self._logger is not None and not error:
-            self._logger.info(
-                f"{self.__class__.__name__}: connected to {(self.ip, self.port)}"
-            )
+            self.failed_attempts += 1
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._connect_stopped():
+                break
+            if self._stop_reconnect_event.wait(min(self.backoff.delay(retry), remaining)):
+                break
+            retry += 1
+
+        error = sock is None
+        self._connection_failed = error
+        if error:
+            if self._logger:
+                self._logger.error(
+                    f"{self.__class__.__name__}: "
+                    f"failed to establish connection to {self._address}"
+                )
+        else:
+            self._socket = sock
+            if self._timeout is not None:
+                self._socket.settimeout(self._timeout)
+            if self.compression is not None:
+                self.compression.reset()
+            self.time_to_connect = time.monotonic() - start
+            if self._logger is not None:
+                self._logger.info(
+                    f"{self.__class__.__name__}: connected to {self._address}"
+                )
 
+        self._connected = not error
         self._wait_for_connection.set()
 
+    def _attempt_connection(self, deadline: float) -> Optional[socket.socket]:
+        """ Try to connect once with a non-blocking connect. Returns the connected
+            socket, or None if the attempt failed, timed out or was interrupted.
+            The socket of a failed attempt is closed.
+        """
+        sock = create_socket(self._address)
+        self.socket_options.apply(sock)
+        sock.setblocking(False)
+        try:
+            error = sock.connect_ex(socket_address(self._address))
+            # Unix domain sockets fail with EAGAIN when the server's backlog is full
+            if error == errno.EINPROGRESS or (
+                    error == errno.EWOULDBLOCK and not is_unix_address(self._address)):
+                timeout = max(0., deadline - time.monotonic())
+                wake_recv, _ = self._wakeup_sockets()
+                # A byte left by a shutdown while no attempt was in progress is stale,
+                # the stop event tells whether this attempt must be interrupted
+                self._drain_wakeup(wake_recv)
+                if self._stop_reconnect_event.is_set():
+                    ready = [wake_recv]
+                else:
+                    with selectors.DefaultSelector() as selector:
+                        selector.register(wake_recv, selectors.EVENT_READ)
+                        selector.register(sock, selectors.EVENT_WRITE)
+                        ready = [key.fileobj for key, _ in selector.select(timeout)]
+                if wake_recv in ready:
+                    self._drain_wakeup(wake_recv)
+                    error = errno.ECANCELED
+                elif sock not in ready:
+                    error = errno.ETIMEDOUT
+                else:
+                    error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        except OSError:  # Includes the errors resolving the host name
+            error = errno.EHOSTUNREACH
+
+        if error != 0:
+            sock.close()
+            return None
+        sock.setblocking(True)
+        return sock
+
+    def _connect_stopped(self) -> bool:
+        """ True if the client must stop trying to connect. """
+        return (self._stop_reconnect_event.is_set()
+                or (self._reconnect and self._stop_reconnect()))
+
+    def connect_stats(self) -> dict[str, Optional[float]]:
+        """ Returns the number of connection attempts, the number of failed
+            attempts and the seconds it took to connect the last time.
+        """
+        return {
+            "attempts": self.connect_attempts,
+            "failed_attempts": self.failed_attempts,
+            "time_to_connect": self.time_to_connect,
+        }
+
+    def _wakeup_sockets(self) -> tuple[socket.socket, socket.socket]:
+        """ The pair of sockets used to interrupt a connection attempt. """
+        with self._wake_lock:
+            if self._wake_pair is None:
+                self._wake_pair = socket.socketpair()
+                for sock in self._wake_pair:
+                    sock.setblocking(False)
+            return self._wake_pair
+
+    def _wake(self) -> None:
+        """ Interrupt a connection attempt in progress. Does nothing if there
+            is no pair of sockets, because no attempt is waiting on them.
+        """
+        with self._wake_lock:
+            if self._wake_pair is None:
+                return
+            _, wake_send = self._wake_pair
+            try:
+                wake_send.send(b"\x00")
+            except OSError:
+                pass
+
+    @staticmethod
+    def _drain_wakeup(wake_recv: socket.socket) -> None:
+        try:
+            while wake_recv.recv(64):
+                pass
+        except OSError:
+            pass
+
+    @property
+    def oversized_frames(self) -> int:
+        """ Number of received frames that exceeded the size limits. """
+        buffer = getattr(self, "_buffer", None)
+        if buffer is None:
+            return self._oversized_frames
+        return self._oversized_frames + buffer.oversized_frames
+
+    def _create_buffer(self, sock: socket.socket) -> Buffer:
+        """ Create the buffer used to receive messages from a new connection. """
+        self._oversized_frames = self.oversized_frames
+        return Buffer(
+            sock,
+            framing=self.framing,
+            max_frame_size=self.max_frame_size,
+            max_buffered=self.max_buffered,
+            oversize_policy=self.oversize_policy,
+            compressor=self.compression
+        )
+
+    def _receive_messages(self, stop: Callable[[], bool]) -> None:
+        """ Receive messages and put them in the received queue until the
+            connection is lost or the stop function evaluates to true.
+
+            Used by the client classes that receive messages.
+        """
+        receive_and_enqueue(
+            buffer=self._buffer,
+            msg_end=self.msg_end,
+            msg_queue=self._received,
+            stop=stop,
+            timeout=self._timeout,
+            logger=self._logger,
+            name=self.__class__.__name__,
+            batch=self.batch_received,
+            codec=self.codec
+        )
+
+    def submit(
+            self,
+            msg: Any,
+            lane: Optional[int] = None
+    ) -> concurrent.futures.Future:
+        """ Put a message in the to_send queue and return a future that is
+            resolved when the message has been fully written to the socket.
+
+            The result of the future is a DeliveryReport with the time the message
+            waited in the queue and the time it took to write it. The future fails
+            if the message cannot be encoded or the connection fails while it is
+            being written. Used by the client classes that send messages.
+
+            :param msg: The message to send.
+            :param lane: The lane of the message if the to_send queue is a LaneQueue.
+        """
+        delivery = Delivery(msg)
+        if lane is None:
+            self._to_send.put(delivery)
+        else:
+            self._to_send.put(delivery, lane=lane)
+        return delivery.future
+
+    def send_file(
+            self,
+            path: str | os.PathLike,
+            offset: int = 0,
+            count: Optional[int] = None
+    ) -> concurrent.futures.Future:
+        """ Send a file, or a range of bytes of it, as a single message without
+            copying its contents through Python.
+
+            The file is put in the to_send queue, so it is sent after the messages
+            that are already in the queue. Returns a future like `submit`.
+
+            :param path: Path to the file.
+            :param offset: Position of the file where the message starts.
+            :param count: Number of bytes to send. If None, the file is sent until its end.
+        """
+        return self.submit(FileTransfer(path, offset, count))
+
+    def _send_messages(
+            self,
+            sock: socket.socket,
+            stop: Callable[[], bool]
+    ) -> None:
+        """ Get messages from the to_send queue and send them until the
+            connection is lost or the stop function evaluates to true.
+
+            Used by the client classes that send messages.
+        """
+        get_and_send_messages(
+            sock=sock,
+            msg_end=self.msg_end,
+            msg_queue=self._to_send,
+            stop=stop,
+            timeout=self._timeout,
+            logger=self._logger,
+            name=self.__class__.__name__,
+            encoding=self.encoding,
+            wait=self.send_wait,
+            framing=self.framing,
+            codec=self.codec,
+            compressor=self.compression,
+            coalesce=self.coalesce,
+            max_batch_count=self.max_batch_count,
+            max_batch_bytes=self.max_batch_bytes,
+            rate_limiter=self.rate_limiter
+        )
+
     @staticmethod
     def _get_stop_function(
             stop: Optional[Callable[[], bool]],
@@ -140,9 +414,18 @@ class ClientBase(abc.ABC):
         """
         self._stop_event.set()
         self._stop_reconnect_event.set()
+        self._wake()
         self.join()
 
     def close_connection(self) -> None:
+        self._close_socket()
+        with self._wake_lock:
+            if self._wake_pair is not None:
+                for sock in self._wake_pair:
+                    sock.close()
+                self._wake_pair = None
+
+    def _close_socket(self) -> None:
         if self._socket is not None:
             try:
                 self._socket.shutdown(socket.SHUT_RDWR)
@@ -163,7 +446,7 @@ class ClientReceiver(ClientBase):
 
     def __init__(
             self,
-            address: tuple[str, int],
+            address: Address,
             received: Optional[queue.Queue[bytes]] = None,
             reconnect: bool = True,
             timeout: Optional[float] = None,
@@ -174,7 +457,8 @@ class ClientReceiver(ClientBase):
         """
            Initialize the ClientReceiver class.
 
-           :param address: A tuple representing the IP address and port number to connect to.
+           :param address: A tuple representing the IP address and port number to connect to,
+                or the path of a Unix domain socket.
            :param received: Optional queue to store received messages.
            :param reconnect: If True, the client will attempt to reconnect after disconnection.
            :param timeout: Optional timeout value for send and receive operations.
@@ -219,33 +503,18 @@ class ClientReceiver(ClientBase):
     def _connect_to_server(self, timeout: Optional[float] = None) -> None:
         super()._connect_to_server(timeout)
         if not self._connection_failed:
-            self._buffer = Buffer(self._socket)
+            self._buffer = self._create_buffer(self._socket)
 
     def _recv(self):
         self._wait_for_connection.wait()
         if self._reconnect:
             while not self._stop_reconnect():
-                receive_and_enqueue(
-                    buffer=self._buffer,
-                    msg_end=self.msg_end,
-                    msg_queue=self.received,
-                    stop=self._stop,
-                    timeout=self._timeout,
-                    logger=self._logger,
-                    name=self.__class__.__name__
-                )
+                self._receive_messages(stop=self._stop)
+                self._connected = False
                 if not self._stop():
                     self._connect_to_server(self._connect_timeout)
         else:
-            receive_and_enqueue(
-                buffer=self._buffer,
-                msg_end=self.msg_end,
-                msg_queue=self.received,
-                stop=self._stop,
-                timeout=self._timeout,
-                logger=self._logger,
-                name=self.__class__.__name__
-            )
+            self._receive_messages(stop=self._stop)
 
         if self._logger:
             self._logger.debug(f"{self.__class__.__name__} exits _recv")
@@ -256,7 +525,7 @@ class ClientSender(ClientBase):
 
     def __init__(
             self,
-            address: tuple[str, int],
+            address: Address,
             to_send: Optional[queue.Queue[str | bytes]] = None,
             reconnect: bool = True,
             timeout: Optional[float] = None,
@@ -267,7 +536,8 @@ class ClientSender(ClientBase):
         """
            Initialize the ClientReceiver class.
 
-           :param address: A tuple representing the IP address and port number to connect to.
+           :param address: A tuple representing the IP address and port number to connect to,
+                or the path of a Unix domain socket.
            :param to_send: Optional queue to store messages to be sent.
            :param reconnect: If True, the client will attempt to reconnect after disconnection.
            :param timeout: Optional timeout value for send and receive operations.
@@ -309,31 +579,12 @@ class ClientSender(ClientBase):
         self._wait_for_connection.wait()
         if self._reconnect:
             while not self._stop_reconnect():
-                get_and_send_messages(
-                    sock=self._socket,
-                    msg_end=self.msg_end,
-                    msg_queue=self.to_send,
-                    stop=self._stop,
-                    timeout=self._timeout,
-                    logger=self._logger,
-                    name=self.__class__.__name__,
-                    encoding=self.encoding,
-                    wait=self.send_wait
-                )
+                self._send_messages(sock=self._socket, stop=self._stop)
+                self._connected = False
                 if not self._stop():
                     self._connect_to_server(self._connect_timeout)
         else:
-            get_and_send_messages(
-                sock=self._socket,
-                msg_end=self.msg_end,
-                msg_queue=self.to_send,
-                stop=self._stop,
-                timeout=self._timeout,
-                logger=self._logger,
-                name=self.__class__.__name__,
-                encoding=self.encoding,
-                wait=self.send_wait
-            )
+            self._send_messages(sock=self._socket, stop=self._stop)
 
         if self._logger:
             self._logger.debug(f"{self.__class__.__name__} exits _send")
@@ -349,7 +600,7 @@ class Client(ClientBase):
 
     def __init__(
             self,
-            address: tuple[str, int],
+            address: Address,
             received: Optional[queue.Queue[bytes]] = None,
             to_send: Optional[queue.Queue[str | bytes]] = None,
             reconnect: bool = True,
@@ -362,7 +613,8 @@ class Client(ClientBase):
         """
            Initialize the Client class.
 
-           :param address: A tuple representing the IP address and port number to connect to.
+           :param address: A tuple representing the IP address and port number to connect to,
+                or the path of a Unix domain socket.
            :param received: Optional queue to store received messages.
            :param to_send: Optional queue containing messages to be sent.
            :param reconnect: If True, the client will attempt to reconnect after disconnection.
@@ -413,41 +665,25 @@ class Client(ClientBase):
         return self._recv_thread
 
     def connect(self, timeout: Optional[float] = None) -> None:
+        check_framing(self.compression, self.framing)
         self._connect_timeout = timeout
         connect_thread = threading.Thread(target=self._connect_to_server, args=(timeout,), daemon=True)
         connect_thread.start()
 
     def _connect_to_server(self, timeout: Optional[float] = None) -> None:
         super()._connect_to_server(timeout)
-        self._buffer = Buffer(self._socket)
+        self._buffer = self._create_buffer(self._socket)
 
     def _send(self) -> None:
         self._wait_for_connection.wait()
         if self._reconnect:
             while not self._stop_reconnect():
-                get_and_send_messages(
-                    sock=self._socket,
-                    msg_end=self.msg_end,
-                    msg_queue=self.to_send,
-                    stop=self._stop_send,
-                    timeout=self._timeout,
-                    logger=self._logger,
-                    name=self.__class__.__name__,
-                    wait=self.send_wait
-                )
+                self._send_messages(sock=self._socket, stop=self._stop_send)
+                self._connected = False
                 self._wait_for_connection.clear()
                 self._connect_to_server(self._connect_timeout)
         else:
-            get_and_send_messages(
-                sock=self._socket,
-                msg_end=self.msg_end,
-                msg_queue=self.to_send,
-                stop=self._stop_send,
-                timeout=self._timeout,
-                logger=self._logger,
-                name=self.__class__.__name__,
-                wait=self.send_wait
-            )
+            self._send_messages(sock=self._socket, stop=self._stop_send)
 
         if self._logger:
             self._logger.debug(f"{self.__class__.__name__} exits _send")
@@ -456,26 +692,10 @@ class Client(ClientBase):
         self._wait_for_connection.wait()
         if self._reconnect:
             while not self._stop_reconnect():
-                receive_and_enqueue(
-                    buffer=self._buffer,
-                    msg_end=self.msg_end,
-                    msg_queue=self.received,
-                    stop=self._stop_receive,
-                    timeout=self._timeout,
-                    logger=self._logger,
-                    name=self.__class__.__name__
-                )
+                self._receive_messages(stop=self._stop_receive)
                 self._wait_for_connection.wait()
         else:
-            receive_and_enqueue(
-                buffer=self._buffer,
-                msg_end=self.msg_end,
-                msg_queue=self.received,
-                stop=self._stop_receive,
-                timeout=self._timeout,
-                logger=self._logger,
-                name=self.__class__.__name__
-            )
+            self._receive_messages(stop=self._stop_receive)
 
         if self._logger:
             self._logger.debug(f"{self.__class__.__name__} exits _recv")
@@ -493,32 +713,87 @@ class Client(ClientBase):
         self._stop_receive_event.set()
         self._stop_send_event.set()
         self._stop_reconnect_event.set()
+        self._wake()
         self.join()
 
 
 class ClientReportAlive(Client):
     """ Client that receives messages and sends and alive message periodically
-        to the server
+        to the server.
+
+        The alive messages are put in the highest priority lane of the to_send
+        queue, so they are sent before any other message waiting in the queue.
+        No alive message is queued while the client is disconnected, or while
+        the queue is full.
     """
 
-    def _send_alive_message(self) -> None:
+    def __init__(
+            self,
+            address: Address,
+            received: Optional[queue.Queue[bytes]] = None,
+            to_send: Optional[LaneQueue] = None,
+            reconnect: bool = True,
+            timeout: Optional[float] = None,
+            stop_receive: Callable[[], bool] = None,
+            stop_send: Callable[[], bool] = None,
+            stop_reconnect: Optional[Callable[[], bool]] = None,
+            logger: Optional[logging.Logger] = None,
+    ):
+        """
+           Initialize the ClientReportAlive class.
+
+           :param address: A tuple representing the IP address and port number to connect to,
+                or the path of a Unix domain socket.
+           :param received: Optional queue to store received messages.
+           :param to_send: Optional queue with priority lanes containing messages to be sent.
+           :param reconnect: If True, the client will attempt to reconnect after disconnection.
+           :param timeout: Optional timeout value for send and receive operations.
+           :param stop_receive: A function that returns True to signal the receiving loop to stop.
+           :param stop_send: A function that returns True to signal the sending loop to stop.
+           :param stop_reconnect: A function that returns True to signal the reconnecting loop to stop. Won't have
+                any effect if reconnect is set to False.
+           :param logger: Optional logger for logging client events.
+       """
+        super().__init__(
+            address=address,
+            received=received,
+            to_send=to_send if to_send is not None else LaneQueue(),
+            reconnect=reconnect,
+            timeout=timeout,
+            stop_receive=stop_receive,
+            stop_send=stop_send,
+            stop_reconnect=stop_reconnect,
+            logger=logger
+        )
+        self.alive_msg = "Alive"
+        self.alive_interval = 30.  # Seconds between alive messages
+        self._alive_thread = threading.Thread(target=self._report_alive, daemon=True)
+
+    @property
+    def alive_thread(self) -> threading.Thread:
+        return self._alive_thread
+
+    def _report_alive(self) -> None:
+        self._wait_for_connection.wait()
         while not self._stop_send():
-            try:
-                self._socket.sendall(b"Alive\r\n")
-                # handle_msg_sent()
-            except ConnectionError:
-                if self._logger is not None:
-                    self._logger.info(
-                        f"{self.__class__.__name__} failed to send message. Connection lost")
-                break
-            time.sleep(30)
+            if self._connected:
+                try:
+                    if isinstance(self._to_send, LaneQueue):
+                        self._to_send.put_nowait(self.alive_msg, lane=0)
+                    else:
+                        self._to_send.put_nowait(self.alive_msg)
+                except queue.Full:
+                    pass
+
+            end = time.monotonic() + self.alive_interval
+            while not self._stop_send() and time.monotonic() < end:
+                self._stop_send_event.wait(min(end - time.monotonic(), 0.5))
 
-    def _send(self) -> None:
-        if self._reconnect:
-            while not self._stop_reconnect():
-                self._send_alive_message()
-                self._wait_for_connection.clear()
-                self.connect()
-        else:
-            while not self._stop_send():
-                self._send_alive_message()
+    def start(self) -> None:
+        """ Start this client in a new thread. """
+        super().start()
+        self._alive_thread.start()
+
+    def join(self) -> None:
+        super().join()
+        self._alive_thread.join()
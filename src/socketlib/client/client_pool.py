@@ -0,0 +1,213 @@
+import bisect
+import concurrent.futures
+import hashlib
+import itertools
+import logging
+import queue
+import threading
+from typing import Any, Callable, Iterable, Optional
+
+from socketlib.basic.address import Address
+from socketlib.client.client import ClientSender
+
+
+def create_client_sender(
+        address: Address,
+        timeout: Optional[float],
+        logger: Optional[logging.Logger]
+) -> ClientSender:
+    """ The default member of a ClientPool. """
+    return ClientSender(address, reconnect=True, timeout=timeout, logger=logger)
+
+
+class ClientPool:
+    """ Keeps several connections to one or more servers and spreads the
+        messages sent among them.
+
+        Each member of the pool is a `ClientSender` that reconnects when its
+        connection is lost. Members whose connection is lost are removed from the
+        pool until they reconnect, and the messages waiting in their queues are
+        moved to the other members.
+
+        Messages are assigned to members with one of these policies:
+
+        - "round_robin": members take turns.
+        - "least_outstanding": the member with the fewest messages waiting to be sent.
+        - "consistent_hash": the member chosen by the key of the message on a hash ring,
+          so messages with the same key go through the same connection and keep their
+          order. If the member is down, the next one on the ring is used. Messages
+          waiting in a member that fails are not moved, so that they keep their order.
+    """
+    policies = ("round_robin", "least_outstanding", "consistent_hash")
+    # Number of points of each member in the hash ring
+    ring_points = 64
+
+    def __init__(
+            self,
+            addresses: Iterable[Address],
+            connections: int = 1,
+            policy: str = "round_robin",
+            timeout: Optional[float] = None,
+            client_factory: Callable[
+                [Address, Optional[float], Optional[logging.Logger]],
+                ClientSender] = create_client_sender,
+            logger: Optional[logging.Logger] = None,
+    ):
+        """
+            :param addresses: The addresses of the servers.
+            :param connections: Number of connections to each server.
+            :param policy: How messages are assigned to the members of the pool.
+            :param timeout: Optional timeout value for the send operations of the members.
+            :param client_factory: Function that creates a member from its address, the
+                timeout and the logger. Used to configure framing, codecs and other options.
+            :param logger: Optional logger for logging pool events.
+        """
+        if policy not in self.policies:
+            raise ValueError(f"Unexpected pool policy {policy}")
+        if connections < 1:
+            raise ValueError("There must be at least one connection per server")
+        self.policy = policy
+        self._logger = logger
+        self._members = [
+            client_factory(address, timeout, logger)
+            for address in addresses
+            for _ in range(connections)
+        ]
+        if not self._members:
+            raise ValueError("There must be at least one server address")
+        self._up = [False] * len(self._members)  # State of the members in the last check
+        self._turn = itertools.count()
+
+        # Hash ring with several points per member, so keys are spread evenly
+        self._ring = []  # type: list[tuple[int, int]]
+        for index in range(len(self._members)):
+            for point in range(self.ring_points):
+                self._ring.append((self._hash(f"{index}-{point}".encode()), index))
+        self._ring.sort()
+        self._ring_hashes = [point for point, _ in self._ring]
+
+        self._stop_event = threading.Event()
+        self._monitor_thread = threading.Thread(target=self._monitor, daemon=True)
+        # Seconds between checks of the connections of the members
+        self.check_interval = 0.1
+
+    @property
+    def members(self) -> list[ClientSender]:
+        return self._members
+
+    @property
+    def available(self) -> int:
+        """ Number of members that are connected. """
+        return sum(member.connected for member in self._members)
+
+    def member_stats(self) -> list[dict[str, Any]]:
+        """ Returns the address, state and messages waiting to be sent of each member. """
+        return [
+            {
+                "address": member.ip if member.port is None else (member.ip, member.port),
+                "connected": member.connected,
+                "outstanding": member.to_send.qsize(),
+            }
+            for member in self._members
+        ]
+
+    def connect(self, timeout: Optional[float] = None) -> None:
+        """ Connect all the members. Members that fail to connect keep trying
+            unless a timeout is given.
+        """
+        for member in self._members:
+            member.connect(timeout)
+
+    def start(self) -> None:
+        """ Start the members and the thread that checks their connections. """
+        for member in self._members:
+            member.start()
+        self._monitor_thread.start()
+
+    def join(self) -> None:
+        for member in self._members:
+            member.join()
+
+    def shutdown(self) -> None:
+        """ Stop all the members. """
+        self._stop_event.set()
+        for member in self._members:
+            member.shutdown()
+        if self._monitor_thread.is_alive():
+            self._monitor_thread.join()
+
+    def close_connection(self) -> None:
+        for member in self._members:
+            member.close_connection()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close_connection()
+
+    def send(self, msg: Any, key: Optional[str | bytes] = None) -> None:
+        """ Put a message in the to_send queue of a member.
+
+            :param msg: The message to send.
+            :param key: The key of the message. Required by the consistent hash policy.
+        """
+        self._choose(key).to_send.put(msg)
+
+    def submit(self, msg: Any, key: Optional[str | bytes] = None) -> concurrent.futures.Future:
+        """ Put a message in the to_send queue of a member and return a future
+            that is resolved when it has been written to the socket. See `ClientSender.submit`.
+        """
+        return self._choose(key).submit(msg)
+
+    def _choose(self, key: Optional[str | bytes] = None) -> ClientSender:
+        """ Choose the member a message is sent through. Returns members that
+            are down only if all of them are.
+        """
+        connected = [member.connected for member in self._members]
+        up = [member for member, is_up in zip(self._members, connected) if is_up]
+        if self.policy == "consistent_hash":
+            if key is None:
+                raise ValueError("The consistent hash policy requires a key")
+            if isinstance(key, str):
+                key = key.encode()
+            start = bisect.bisect(self._ring_hashes, self._hash(key))
+            for ii in range(len(self._ring)):
+                index = self._ring[(start + ii) % len(self._ring)][1]
+                if connected[index] or not up:
+                    return self._members[index]
+
+        candidates = up or self._members
+        if self.policy == "least_outstanding":
+            return min(candidates, key=lambda member: member.to_send.qsize())
+        return candidates[next(self._turn) % len(candidates)]
+
+    @staticmethod
+    def _hash(data: bytes) -> int:
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+    def _monitor(self) -> None:
+        """ Remove the members that lose their connection and add them again
+            when they reconnect.
+        """
+        while not self._stop_event.wait(self.check_interval):
+            for index, member in enumerate(self._members):
+                connected = member.connected
+                if connected != self._up[index]:
+                    self._up[index] = connected
+                    if self._logger:
+                        state = "added to" if connected else "removed from"
+                        self._logger.info(
+                            f"{self.__class__.__name__}: member {index} "
+                            f"{state} the pool")
+                if not connected and self.policy != "consistent_hash" and any(self._up):
+                    self._move_messages(member)
+
+    def _move_messages(self, member: ClientSender) -> None:
+        """ Send the messages waiting in a member through other members. """
+        while True:
+            try:
+                item = member.to_send.get_nowait()
+            except queue.Empty:
+                break
+            self._choose().to_send.put(item)
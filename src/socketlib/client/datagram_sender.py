@@ -0,0 +1,200 @@
+import logging
+import queue
+import socket
+import threading
+from typing import Any, Callable, Optional
+
+from socketlib.basic.address import Address, create_socket, is_unix_address, socket_address
+from socketlib.basic.codecs import Codec
+from socketlib.basic.compression import Compressor
+from socketlib.basic.datagram import MAX_DATAGRAM_SIZE, SEQUENCE_HEADER
+from socketlib.basic.queues import get_from_queue
+from socketlib.basic.rate_limit import RateLimiter
+from socketlib.basic.socket_options import SocketOptions
+from socketlib.exceptions.exceptions import CodecError
+
+
+class DatagramSender:
+    """ A client that sends messages as datagrams.
+
+        It is the datagram counterpart of `ClientSender`. Each message is sent
+        in its own datagram, which may be lost or arrive out of order. There is
+        no connection to establish, so messages are sent even if no receiver
+        is listening, and they are lost in that case.
+
+        Messages that do not fit in a datagram are discarded.
+    """
+
+    def __init__(
+            self,
+            address: Address,
+            to_send: Optional[queue.Queue[str | bytes]] = None,
+            timeout: Optional[float] = None,
+            stop: Optional[Callable[[], bool]] = None,
+            logger: Optional[logging.Logger] = None,
+    ):
+        """
+           Initialize the DatagramSender class.
+
+           :param address: A tuple representing the IP address and port number to send to,
+                or the path of a Unix domain socket.
+           :param to_send: Optional queue to store messages to be sent.
+           :param timeout: Optional timeout value for send operations.
+           :param stop: A function that returns True to signal the client to stop.
+           :param logger: Optional logger for logging client events.
+       """
+        self._address = address
+        self._socket = None  # type: Optional[socket.socket]
+        self._to_send = to_send if to_send is not None else queue.Queue()
+        self._timeout = timeout
+        self._logger = logger
+
+        self._stop_event = threading.Event()
+        self._stop = stop if stop is not None else self._stop_event.is_set
+        self._run_thread = threading.Thread(target=self._send, daemon=True)
+        self._sequence = 0
+
+        self.encoding = "utf-8"
+        # Converts messages to bytes. If None, messages sent must be
+        # strings or bytes
+        self.codec = None  # type: Optional[Codec]
+        # Optional compression of messages. Only the frame mode can be used
+        self.compression = None  # type: Optional[Compressor]
+        # If true, each datagram starts with a sequence number that the receiver
+        # uses to count lost datagrams. Must match the receiver
+        self.sequence_numbers = True
+        # Largest datagram that can be sent
+        self.max_datagram_size = MAX_DATAGRAM_SIZE
+        # Options such as the buffer sizes applied to the socket
+        self.socket_options = SocketOptions()
+        # Limits the rate at which messages are sent
+        self.rate_limiter = None  # type: Optional[RateLimiter]
+        # Seconds between checks of the stop function
+        self.poll_interval = 0.1
+
+        self.sent = 0  # Datagrams sent
+        self.send_errors = 0  # Datagrams that the socket failed to send
+        self.oversized = 0  # Messages discarded because they did not fit in a datagram
+
+    @property
+    def to_send(self) -> queue.Queue[str | bytes]:
+        return self._to_send
+
+    @property
+    def send_thread(self) -> threading.Thread:
+        return self._run_thread
+
+    def connect(self) -> None:
+        """ Create the socket. Datagram sockets do not need to connect to
+            the receiver, so this returns immediately.
+        """
+        self._socket = create_socket(self._address, socket.SOCK_DGRAM)
+        if is_unix_address(self._address):
+            # An unbound socket has no address, so the receiver could not tell its
+            # datagrams from those of other senders. Linux binds it to an abstract address
+            try:
+                self._socket.bind("")
+            except OSError:
+                pass
+        self.socket_options.apply(self._socket)
+        if self._timeout is not None:
+            self._socket.settimeout(self._timeout)
+        if self._logger is not None:
+            self._logger.info(
+                f"{self.__class__.__name__}: sending datagrams to {self._address}")
+
+    def start(self) -> None:
+        """ Start the client in another thread.
+        """
+        self._check_compression()
+        if self._socket is None:
+            self.connect()
+        self.send_thread.start()
+
+    def start_main_thread(self) -> None:
+        """ Start this client in the main thread"""
+        self._check_compression()
+        if self._socket is None:
+            self.connect()
+        self._send()
+
+    def join(self) -> None:
+        """ Wait for the client thread to finish.
+        """
+        self.send_thread.join()
+
+    def shutdown(self) -> None:
+        """ Stop this client. If a custom stop function is used
+            this will not have any effect.
+        """
+        self._stop_event.set()
+        self.join()
+
+    def close_connection(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close_connection()
+
+    def _check_compression(self) -> None:
+        if self.compression is not None and self.compression.mode != "frame":
+            raise ValueError("Datagrams can only be compressed in frame mode")
+
+    def _send(self) -> None:
+        name = self.__class__.__name__
+        address = socket_address(self._address)
+        while not self._stop():
+            msg = get_from_queue(self._to_send, self.poll_interval)
+            if msg is None:
+                continue
+            datagram = self._encode(msg)
+            if datagram is None:
+                continue
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait(1, len(datagram), self._stop)
+            try:
+                self._socket.sendto(datagram, address)
+                self.sent += 1
+            except OSError as err:
+                # The datagram is lost, but the following ones may be delivered
+                self.send_errors += 1
+                if self._logger:
+                    self._logger.info(f"{name} failed to send datagram. {err}")
+
+        if self._logger:
+            self._logger.debug(f"{name} exits _send")
+
+    def _encode(self, msg: Any) -> Optional[bytes]:
+        """ Convert a message into a datagram. Returns None if the message
+            cannot be sent.
+        """
+        try:
+            if self.codec is not None:
+                msg = self.codec.encode(msg)
+            elif isinstance(msg, str):
+                msg = msg.encode(self.encoding)
+        except CodecError as err:
+            if self._logger:
+                self._logger.info(
+                    f"{self.__class__.__name__} failed to encode message. {err}")
+            return None
+        if self.compression is not None:
+            msg = self.compression.compress(msg)
+
+        if self.sequence_numbers:
+            msg = SEQUENCE_HEADER.pack(self._sequence) + msg
+            # Discarded messages also use a sequence number, so that the
+            # receiver counts them as lost
+            self._sequence = (self._sequence + 1) % 2 ** 32
+        if len(msg) > self.max_datagram_size:
+            self.oversized += 1
+            if self._logger:
+                self._logger.info(
+                    f"{self.__class__.__name__} discarded a message of {len(msg)} bytes."
+                    f" It does not fit in a datagram")
+            return None
+        return msg
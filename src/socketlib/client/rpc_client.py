@@ -0,0 +1,135 @@
+import concurrent.futures
+import logging
+from typing import Any, Callable, Optional
+
+from socketlib.basic.address import Address
+from socketlib.basic.framing import LengthPrefixFraming
+from socketlib.basic.rpc import (
+    ERROR,
+    REPLY,
+    REQUEST,
+    DispatchQueue,
+    PendingCalls,
+    RpcCodec,
+    RpcMessage,
+)
+from socketlib.client.client import Client
+from socketlib.exceptions.exceptions import RpcError
+
+
+class RpcClient(Client):
+    """ A client that calls methods of an `RpcServer`.
+
+        Each call is sent with a correlation id and returns a future that is
+        resolved when the reply with the same id arrives. Any number of calls
+        can be in flight on the connection, and their replies may arrive in
+        any order.
+
+        Replies are handled in the receiving thread as soon as they arrive, so
+        the received queue is not used. Calls whose reply is lost with the
+        connection fail when their timeout expires.
+    """
+
+    def __init__(
+            self,
+            address: Address,
+            reconnect: bool = True,
+            timeout: Optional[float] = None,
+            stop_receive: Callable[[], bool] = None,
+            stop_send: Callable[[], bool] = None,
+            stop_reconnect: Optional[Callable[[], bool]] = None,
+            logger: Optional[logging.Logger] = None,
+    ):
+        """
+           Initialize the RpcClient class.
+
+           :param address: A tuple representing the IP address and port number to connect to,
+                or the path of a Unix domain socket.
+           :param reconnect: If True, the client will attempt to reconnect after disconnection.
+           :param timeout: Optional timeout value for send and receive operations.
+           :param stop_receive: A function that returns True to signal the receiving loop to stop.
+           :param stop_send: A function that returns True to signal the sending loop to stop.
+           :param stop_reconnect: A function that returns True to signal the reconnecting loop to stop. Won't have
+                any effect if reconnect is set to False.
+           :param logger: Optional logger for logging client events.
+       """
+        super().__init__(
+            address=address,
+            received=DispatchQueue(self._dispatch),
+            reconnect=reconnect,
+            timeout=timeout,
+            stop_receive=stop_receive,
+            stop_send=stop_send,
+            stop_reconnect=stop_reconnect,
+            logger=logger
+        )
+        self._calls = PendingCalls()
+
+        self.framing = LengthPrefixFraming()
+        # Converts the calls to bytes. Use RpcCodec(codec) to convert
+        # the arguments and results with another codec
+        self.codec = RpcCodec()
+        # Timeout in seconds of the calls that do not give one. If None, calls
+        # wait for their reply indefinitely, even if it is lost with the connection
+        self.call_timeout = 60.0  # type: Optional[float]
+
+    @property
+    def pending_calls(self) -> int:
+        """ Number of calls waiting for their reply. """
+        return len(self._calls)
+
+    def call(
+            self,
+            method: str,
+            body: Any = None,
+            timeout: Optional[float] = None
+    ) -> concurrent.futures.Future:
+        """ Call a method of the server. Returns a future that is resolved with
+            the result of the method.
+
+            The future fails with an RpcError if the server fails to handle the call,
+            with a TimeoutError if the reply does not arrive in time, or with the
+            error of the connection if the request cannot be sent.
+
+            :param method: Name of the method.
+            :param body: The argument of the method.
+            :param timeout: Seconds to wait for the reply. Defaults to the call_timeout attribute.
+        """
+        if timeout is None:
+            timeout = self.call_timeout
+        call_id, future = self._calls.add(timeout)
+        sent = self.submit(RpcMessage(REQUEST, call_id, method, body))
+        sent.add_done_callback(lambda done: self._check_sent(call_id, done))
+        return future
+
+    def request(self, method: str, body: Any = None, timeout: Optional[float] = None) -> Any:
+        """ Call a method of the server and wait for its result. """
+        return self.call(method, body, timeout).result()
+
+    def close_connection(self) -> None:
+        super().close_connection()
+        self._calls.close(ConnectionError("The client was closed"))
+
+    def _check_sent(self, call_id: int, sent: concurrent.futures.Future) -> None:
+        """ Fail a call if its request could not be sent. """
+        error = sent.exception()
+        if error is not None:
+            future = self._calls.pop(call_id)
+            if future is not None:
+                future.set_exception(error)
+
+    def _dispatch(self, msg: RpcMessage) -> None:
+        """ Resolve the future of the call a reply belongs to. """
+        if msg.kind not in (REPLY, ERROR):
+            if self._logger:
+                self._logger.info(f"{self.__class__.__name__} received an unexpected request")
+            return
+        future = self._calls.pop(msg.call_id)
+        if future is None:
+            if self._logger:
+                self._logger.debug(
+                    f"{self.__class__.__name__} received a reply to an unknown call {msg.call_id}")
+        elif msg.kind == REPLY:
+            future.set_result(msg.body)
+        else:
+            future.set_exception(RpcError(msg.body))
@@ -0,0 +1,95 @@
+import logging
+import queue
+import socket
+from typing import Any, Callable, Optional
+
+from socketlib.basic.address import Address
+from socketlib.basic.framing import LengthPrefixFraming
+from socketlib.basic.rpc import DispatchQueue
+from socketlib.basic.session import Session, SessionCodec, SessionQueue, peer_closed
+from socketlib.client.client import Client
+
+
+class SessionClient(Client):
+    """ A client whose messages survive reconnections.
+
+        Messages are numbered and kept until the server acknowledges them.
+        When the connection is lost, the client reconnects and resumes the
+        session: it sends again only the messages the server did not receive,
+        and discards the messages of the server it had already received. See `Session`.
+
+        Must be used with a `SessionServer`. Messages are sent through the to_send
+        queue, which is a `SessionQueue`, and received messages are put in the
+        received queue.
+    """
+
+    def __init__(
+            self,
+            address: Address,
+            received: Optional[queue.Queue[Any]] = None,
+            reconnect: bool = True,
+            timeout: Optional[float] = None,
+            stop_receive: Callable[[], bool] = None,
+            stop_send: Callable[[], bool] = None,
+            stop_reconnect: Optional[Callable[[], bool]] = None,
+            logger: Optional[logging.Logger] = None,
+    ):
+        """
+           Initialize the SessionClient class.
+
+           :param address: A tuple representing the IP address and port number to connect to,
+                or the path of a Unix domain socket.
+           :param received: Optional queue to store received messages.
+           :param reconnect: If True, the client will attempt to reconnect after disconnection.
+           :param timeout: Optional timeout value for send and receive operations.
+           :param stop_receive: A function that returns True to signal the receiving loop to stop.
+           :param stop_send: A function that returns True to signal the sending loop to stop.
+           :param stop_reconnect: A function that returns True to signal the reconnecting loop to stop. Won't have
+                any effect if reconnect is set to False.
+           :param logger: Optional logger for logging client events.
+       """
+        send_queue = SessionQueue()
+        self._messages = received if received is not None else queue.Queue()
+        self._session = Session(
+            send_queue, self._messages, logger=logger, name=self.__class__.__name__)
+        super().__init__(
+            address=address,
+            received=DispatchQueue(self._session.dispatch),
+            to_send=send_queue,
+            reconnect=reconnect,
+            timeout=timeout,
+            stop_receive=stop_receive,
+            stop_send=stop_send,
+            stop_reconnect=stop_reconnect,
+            logger=logger
+        )
+        self.framing = LengthPrefixFraming()
+        # Converts the session messages to bytes. Use SessionCodec(codec)
+        # to convert the payloads with another codec
+        self.codec = SessionCodec()
+
+    @property
+    def received(self) -> queue.Queue[Any]:
+        return self._messages
+
+    @property
+    def to_send(self) -> SessionQueue:
+        return self._to_send
+
+    @property
+    def session(self) -> Session:
+        return self._session
+
+    def _connect_to_server(self, timeout: Optional[float] = None) -> None:
+        self._session.start_connection()
+        super()._connect_to_server(timeout)
+
+    def _receive_messages(self, stop: Callable[[], bool]) -> None:
+        super()._receive_messages(stop)
+        # The sender notices a lost connection only when a write fails
+        if not stop() and self._socket is not None and peer_closed(self._socket):
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._session.connection_lost()
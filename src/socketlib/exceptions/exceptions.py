@@ -1,3 +1,37 @@
 
 class FailedToReconnect(OSError):
     pass
+
+
+class FramingError(ValueError):
+    """ Raised when data cannot be split or joined into frames. """
+    pass
+
+
+class FrameTooLargeError(FramingError):
+    """ Raised when a received frame exceeds the maximum size. """
+    pass
+
+
+class CodecError(ValueError):
+    """ Raised when a message cannot be encoded or decoded. """
+    pass
+
+
+class CompressionError(ValueError):
+    """ Raised when a payload cannot be decompressed. """
+    pass
+
+
+class SlowConsumerError(ConnectionError):
+    """ Raised when a message is dropped because the client does not read
+        its messages fast enough.
+    """
+    pass
+
+
+class RpcError(Exception):
+    """ Raised by the future of a remote procedure call when the server
+        fails to handle it.
+    """
+    pass
@@ -0,0 +1,194 @@
+import logging
+import queue
+import selectors
+import socket
+import threading
+from typing import Any, Callable, Optional
+
+from socketlib.basic.address import Address, bind_socket, create_socket, remove_socket_file
+from socketlib.basic.codecs import Codec
+from socketlib.basic.compression import Compressor
+from socketlib.basic.datagram import (
+    MAX_DATAGRAM_SIZE,
+    SEQUENCE_HEADER,
+    SequenceTracker,
+    recv_datagrams,
+)
+from socketlib.basic.queues import put_in_queue
+from socketlib.basic.receive import decode_msgs
+from socketlib.basic.socket_options import SocketOptions
+from socketlib.exceptions.exceptions import CompressionError
+
+
+class DatagramReceiver:
+    """ A server that receives messages sent as datagrams.
+
+        It is the datagram counterpart of `ServerReceiver`. Each datagram
+        carries one message, so a lost datagram loses only its message and
+        never delays the ones that follow it. There is no connection, so
+        datagrams from any number of senders are received.
+
+        The datagrams that are already waiting in the socket are read together
+        and their messages put in the received queue. If sequence numbers are
+        used, the lost and late datagrams of each sender are counted.
+    """
+
+    def __init__(
+            self,
+            address: Address,
+            received: Optional[queue.Queue[bytes]] = None,
+            timeout: Optional[float] = None,
+            stop: Optional[Callable[[], bool]] = None,
+            logger: Optional[logging.Logger] = None,
+    ):
+        """ Initialize the datagram receiver class.
+
+           :param address: A tuple representing the IP address and port number to bind the server to,
+                or the path of a Unix domain socket.
+           :param received: Optional queue to store received messages.
+           :param timeout: Optional timeout value for putting messages in the received queue.
+           :param stop: A function that returns True to signal the server to stop.
+           :param logger: Optional logger for logging server events.
+       """
+        self._address = address
+        self._socket = None  # type: Optional[socket.socket]
+        self._received = received if received is not None else queue.Queue()
+        self._timeout = timeout
+        self._logger = logger
+
+        self._stop_event = threading.Event()
+        self._stop = stop if stop is not None else self._stop_event.is_set
+        self._run_thread = threading.Thread(target=self._recv, daemon=True)
+        self._tracker = SequenceTracker()
+
+        # If true, the messages obtained from a single read are put in
+        # the received queue as one list.
+        self.batch_received = False
+        # Converts messages from bytes. If None, received messages are bytes
+        self.codec = None  # type: Optional[Codec]
+        # Optional compression of messages. Only the frame mode can be used
+        self.compression = None  # type: Optional[Compressor]
+        # If true, each datagram starts with a sequence number that is used to
+        # count lost datagrams. Must match the sender
+        self.sequence_numbers = True
+        # If true, datagrams that arrive after a later one are discarded
+        self.drop_late = False
+        # Largest datagram that can be received and maximum number of them per read
+        self.max_datagram_size = MAX_DATAGRAM_SIZE
+        self.max_batch_count = 64
+        # Options such as the buffer sizes applied to the socket
+        self.socket_options = SocketOptions()
+        # Seconds between checks of the stop function
+        self.poll_interval = 0.1
+
+    @property
+    def received(self) -> queue.Queue[bytes]:
+        return self._received
+
+    @property
+    def receive_thread(self) -> threading.Thread:
+        return self._run_thread
+
+    @property
+    def tracker(self) -> SequenceTracker:
+        """ Counts of the received, lost and late datagrams. """
+        return self._tracker
+
+    def listen(self) -> None:
+        """ Creates the socket and binds it to the address. """
+        self._socket = create_socket(self._address, socket.SOCK_DGRAM)
+        self.socket_options.apply_listener(self._socket)
+        bind_socket(self._socket, self._address)
+        self._socket.setblocking(False)
+        if self._logger is not None:
+            self._logger.info(
+                f"{self.__class__.__name__}: "
+                f"Listening for datagrams in {self._address}"
+            )
+
+    def start(self) -> None:
+        """ Start the server in a new thread. """
+        self._check_compression()
+        self.listen()
+        self.receive_thread.start()
+
+    def start_main_thread(self) -> None:
+        self._check_compression()
+        self.listen()
+        self._recv()
+
+    def join(self) -> None:
+        """ Wait for the server thread to finish."""
+        self.receive_thread.join()
+
+    def shutdown(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def close_connection(self) -> None:
+        """ Close the socket. """
+        if self._socket is not None:
+            self._socket.close()
+            remove_socket_file(self._address)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close_connection()
+
+    def _check_compression(self) -> None:
+        if self.compression is not None and self.compression.mode != "frame":
+            raise ValueError("Datagrams can only be compressed in frame mode")
+
+    def _recv(self) -> None:
+        name = self.__class__.__name__
+        buffer = bytearray(self.max_datagram_size)
+        selector = selectors.DefaultSelector()
+        selector.register(self._socket, selectors.EVENT_READ)
+        while not self._stop():
+            try:
+                datagrams = recv_datagrams(
+                    self._socket, buffer, self.max_batch_count, self.poll_interval, selector)
+            except OSError as err:
+                if self._logger:
+                    self._logger.info(f"{name} failed to receive datagram. {err}")
+                break
+
+            messages = self._unpack(datagrams)
+            if self.codec is not None:
+                messages = decode_msgs(messages, self.codec, self._logger, name)
+            if not messages:
+                continue
+            if self.batch_received:
+                messages = [messages]
+            for msg in messages:
+                if not put_in_queue(msg, self._received, self._timeout) and self._logger:
+                    self._logger.info(f"{name} failed to enqueue message")
+
+        selector.close()
+        if self._logger:
+            self._logger.debug(f"{name} exits _recv")
+
+    def _unpack(self, datagrams: list[tuple[bytes, Any]]) -> list[bytes]:
+        """ Strip the sequence numbers of the datagrams and decompress their payloads. """
+        messages = []
+        for payload, source in datagrams:
+            if self.sequence_numbers:
+                if len(payload) < SEQUENCE_HEADER.size:
+                    continue
+                sequence, = SEQUENCE_HEADER.unpack_from(payload)
+                in_order = self._tracker.update(source, sequence)
+                if not in_order and self.drop_late:
+                    continue
+                payload = payload[SEQUENCE_HEADER.size:]
+            if self.compression is not None:
+                try:
+                    payload = self.compression.decompress(payload)
+                except CompressionError as err:
+                    if self._logger:
+                        self._logger.info(
+                            f"{self.__class__.__name__} failed to decompress message. {err}")
+                    continue
+            messages.append(payload)
+        return messages
@@ -0,0 +1,652 @@
+import collections
+import concurrent.futures
+import itertools
+import logging
+import os
+import queue
+import selectors
+import socket
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from socketlib.basic.address import Address, remove_socket_file
+from socketlib.basic.buffer import Buffer
+from socketlib.basic.compression import Compressor
+from socketlib.basic.delivery import Delivery, FanoutDelivery
+from socketlib.basic.files import FileFrame, FileTransfer, open_file_frame
+from socketlib.basic.receive import decode_msgs
+from socketlib.basic.send import encode_msg
+from socketlib.exceptions.exceptions import (
+    CodecError,
+    CompressionError,
+    FramingError,
+    SlowConsumerError,
+)
+from socketlib.server.server import ServerBase
+
+
+class NotifyingQueue(queue.Queue):
+    """ A queue that calls a function every time an item is put in it. """
+
+    def __init__(self, notify: Callable[[], None], maxsize: int = 0):
+        super().__init__(maxsize)
+        self._notify = notify
+
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None) -> None:
+        super().put(item, block, timeout)
+        self._notify()
+
+
+class Connection:
+    """ The state of a client connected to a MultiServer. """
+
+    def __init__(
+            self,
+            conn_id: int,
+            sock: socket.socket,
+            address: Any,
+            buffer: Buffer,
+    ):
+        self.id = conn_id
+        self.socket = sock
+        self.address = address
+        self.buffer = buffer
+        # Frames waiting to be written, with the delivery of each of them and the
+        # time they were added. Files are FileFrame objects
+        self.pending = collections.deque()  # type: collections.deque[tuple[memoryview | FileFrame, Any, float]]
+        self.partial = False  # True if the first pending frame was partially written
+        self.writing = False
+        self.closed = False
+        self.dropped = 0  # Number of frames dropped because the client was too slow
+        # Received items waiting for room in the received queue. The connection
+        # is not read while there are any
+        self.backlog = collections.deque()  # type: collections.deque[tuple[int, Any]]
+        self.events = selectors.EVENT_READ  # Events the selector watches
+
+
+class MultiServer(ServerBase):
+    """ A server that sends and receives messages to and from many clients.
+
+        All the connections are served by a single thread with a selectors
+        event loop and non-blocking sockets.
+
+        The messages in the received queue are tuples with the id of the
+        connection and the message. The messages in the to_send queue must be
+        tuples with the id of the connection they are sent to and the message.
+        If the id is None, the message is sent to all the connections. Files are
+        sent with `send_file`, or by putting FileTransfer objects as messages.
+
+        The attributes msg_end, encoding, framing, codec, compression, batch_received,
+        the receive limits and socket_options are used as in the other servers.
+
+        If the received queue is bounded and full, the connections whose messages
+        do not fit stop being read until there is room, so the other connections
+        are still served.
+
+        The frames waiting to be written to each connection can be bounded with
+        max_pending, so a client that does not read its messages does not hold
+        an unbounded amount of memory. The slow consumer policy decides what
+        happens when a connection reaches the limit.
+    """
+    # Maximum number of frames written to a connection with a single call
+    max_write_frames = 64
+    # - "drop_oldest": the oldest frame that was not written yet is dropped.
+    # - "drop_newest": the new message is dropped.
+    # - "disconnect": the connection is closed.
+    slow_consumer_policies = ("drop_oldest", "drop_newest", "disconnect")
+
+    def __init__(
+            self,
+            address: Address,
+            received: Optional[queue.Queue[tuple[int, Any]]] = None,
+            to_send: Optional[queue.Queue[tuple[Optional[int], Any]]] = None,
+            timeout: Optional[float] = None,
+            stop: Optional[Callable[[], bool]] = None,
+            logger: Optional[logging.Logger] = None,
+    ):
+        """ Initialize the multi client server.
+
+           :param address: A tuple representing the IP address and port number to bind the server to,
+                or the path of a Unix domain socket.
+           :param received: Optional queue to store received messages.
+           :param to_send: Optional queue containing messages to be sent. If a queue is given,
+                the messages put in it are picked up every `poll_interval` seconds. Messages
+                put in the default queue are sent immediately.
+           :param timeout: Not used. Kept for compatibility with the other servers, since
+                messages are put in the received queue without waiting.
+           :param stop: A function that returns True to signal the server to stop.
+           :param logger: Optional logger for logging server events.
+        """
+        super().__init__(
+            address=address,
+            reconnect=True,
+            timeout=timeout,
+            stop=stop,
+            logger=logger
+        )
+        self._wake_recv, self._wake_send = socket.socketpair()
+        self._wake_recv.setblocking(False)
+        self._wake_send.setblocking(False)
+
+        self._received = received if received is not None else queue.Queue()
+        self._to_send = to_send if to_send is not None else NotifyingQueue(self._wake)
+
+        self._selector = None  # type: Optional[selectors.BaseSelector]
+        self._connections = {}  # type: dict[int, Connection]
+        self._paused = set()  # type: set[Connection]  # Connections waiting for room in the received queue
+        self._ids = itertools.count(1)
+        self._run_thread = threading.Thread(target=self._serve, daemon=True)
+
+        # Maximum time in seconds the stop function and the to_send queue go unchecked
+        self.poll_interval = 0.1
+        # Maximum number of frames waiting to be written to a connection. If None,
+        # there is no limit
+        self.max_pending = None  # type: Optional[int]
+        # What to do with a message for a connection that has max_pending frames
+        # waiting. See slow_consumer_policies
+        self.slow_consumer_policy = "drop_oldest"
+        self.accepted = 0  # Number of connections accepted
+        self.dropped_messages = 0  # Frames dropped due to slow connections
+        self.slow_disconnects = 0  # Connections closed for being too slow
+
+    @property
+    def received(self) -> queue.Queue[tuple[int, Any]]:
+        return self._received
+
+    @property
+    def to_send(self) -> queue.Queue[tuple[Optional[int], Any]]:
+        return self._to_send
+
+    @property
+    def run_thread(self) -> threading.Thread:
+        return self._run_thread
+
+    @property
+    def connections(self) -> dict[int, Any]:
+        """ The ids of the open connections and the addresses of their clients. """
+        return {conn.id: conn.address for conn in list(self._connections.values())}
+
+    @property
+    def oversized_frames(self) -> int:
+        return self._oversized_frames + sum(
+            conn.buffer.oversized_frames for conn in list(self._connections.values())
+        )
+
+    def listen(self) -> None:
+        super().listen()
+        self._socket.setblocking(False)
+
+    def accept_connection(self) -> bool:
+        """ Accept a pending connection. Returns false if there is none. """
+        try:
+            sock, address = self._socket.accept()
+        except (BlockingIOError, InterruptedError):
+            return False
+        sock.setblocking(False)
+        self.socket_options.apply(sock)
+
+        compressor = self.compression
+        if compressor is not None:
+            # Each connection needs its own compression streams
+            compressor = compressor.copy()
+        buffer = Buffer(
+            sock,
+            framing=self.framing,
+            max_frame_size=self.max_frame_size,
+            max_buffered=self.max_buffered,
+            oversize_policy=self.oversize_policy,
+            compressor=compressor
+        )
+        conn = Connection(next(self._ids), sock, address, buffer)
+        self._connections[conn.id] = conn
+        self.accepted += 1
+        self._selector.register(sock, selectors.EVENT_READ, conn)
+        if self._logger is not None:
+            self._logger.info(
+                f"{self.__class__.__name__}: "
+                f"connection {conn.id} accepted from {address}"
+            )
+        return True
+
+    def submit(self, conn_id: Optional[int], msg: Any) -> concurrent.futures.Future:
+        """ Put a message for a connection in the to_send queue and return a
+            future that is resolved when the message has been fully written
+            to the socket.
+
+            The result of the future is a DeliveryReport. The future fails if the
+            message cannot be encoded or the connection is closed before the
+            message is written.
+
+            :param conn_id: The id of the connection. If None, the message is sent to
+                all the connections, and the future is resolved once it has been
+                written to all of them.
+            :param msg: The message to send.
+        """
+        delivery = Delivery((conn_id, msg))
+        self._to_send.put(delivery)
+        return delivery.future
+
+    def send_file(
+            self,
+            conn_id: Optional[int],
+            path: str | os.PathLike,
+            offset: int = 0,
+            count: Optional[int] = None
+    ) -> concurrent.futures.Future:
+        """ Send a file, or a range of bytes of it, to a connection as a single
+            message. Returns a future like `submit`.
+
+            The file is written with `os.sendfile` by the event loop as the
+            socket accepts it, so a large file does not delay the other connections.
+            Files cannot be compressed.
+
+            :param conn_id: The id of the connection. If None, the file is sent to all the connections.
+            :param path: Path to the file.
+            :param offset: Position of the file where the message starts.
+            :param count: Number of bytes to send. If None, the file is sent until its end.
+        """
+        return self.submit(conn_id, FileTransfer(path, offset, count))
+
+    def start(self) -> None:
+        """ Start the server in a new thread. """
+        self._check_policy()
+        self.listen()
+        self._run_thread.start()
+
+    def join(self) -> None:
+        """ Wait for the server thread to finish."""
+        self._run_thread.join()
+
+    def start_main_thread(self) -> None:
+        self._check_policy()
+        self.listen()
+        self._serve()
+
+    def shutdown(self) -> None:
+        self._stop_event.set()
+        self._wake()
+        self.join()
+
+    def close_connection(self) -> None:
+        for conn in list(self._connections.values()):
+            self._close(conn)
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+        if self._socket is not None:
+            self._socket.close()
+            remove_socket_file(self._address)
+        self._wake_recv.close()
+        self._wake_send.close()
+
+    def _check_policy(self) -> None:
+        if self.slow_consumer_policy not in self.slow_consumer_policies:
+            raise ValueError(
+                f"Unexpected slow consumer policy {self.slow_consumer_policy}")
+
+    def _wake(self) -> None:
+        """ Wake the event loop up. """
+        try:
+            self._wake_send.send(b"\x00")
+        except OSError:
+            pass  # The loop will be woken up by the bytes already sent
+
+    def _serve(self) -> None:
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._socket, selectors.EVENT_READ)
+        self._selector.register(self._wake_recv, selectors.EVENT_READ)
+        try:
+            while not self._stop():
+                for key, events in self._selector.select(self.poll_interval):
+                    if key.fileobj is self._socket:
+                        self.accept_connection()
+                    elif key.fileobj is self._wake_recv:
+                        self._clear_wake()
+                    else:
+                        conn = key.data
+                        if events & selectors.EVENT_READ:
+                            self._read(conn)
+                        if events & selectors.EVENT_WRITE and not conn.closed:
+                            self._write(conn)
+                for conn in list(self._paused):
+                    self._flush_backlog(conn)
+                self._dispatch()
+        finally:
+            self.close_connection()
+
+    def _clear_wake(self) -> None:
+        try:
+            while self._wake_recv.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _read(self, conn: Connection) -> None:
+        """ Read the messages available in a connection and put them in
+            the received queue.
+        """
+        name = self.__class__.__name__
+        try:
+            messages = conn.buffer.recv_msgs(self.msg_end)
+        except (BlockingIOError, InterruptedError):
+            return
+        except ConnectionError:
+            messages = None
+        except CompressionError as err:
+            messages = None
+            if self._logger is not None:
+                self._logger.info(f"{name} failed to decompress message. {err}")
+        except FramingError as err:
+            messages = None
+            if self._logger is not None:
+                self._logger.info(f"{name} failed to split message of connection {conn.id}. {err}")
+        except OSError as err:
+            messages = None
+            if self._logger is not None:
+                self._logger.info(f"{name} failed to read connection {conn.id}. {err}")
+
+        if messages is None:
+            if conn.buffer.dropped and self._logger is not None:
+                self._logger.info(f"{name} dropped connection {conn.id}. Frame too large")
+            self._close(conn)
+            return
+
+        if self.codec is not None:
+            messages = decode_msgs(messages, self.codec, self._logger, name)
+        if not messages:
+            return
+        if self.batch_received:
+            conn.backlog.append((conn.id, messages))
+        else:
+            conn.backlog.extend((conn.id, msg) for msg in messages)
+        self._flush_backlog(conn)
+
+    def _flush_backlog(self, conn: Connection) -> None:
+        """ Put the received items of a connection in the received queue without
+            waiting. The connection is not read while some of them do not fit.
+        """
+        while conn.backlog:
+            try:
+                self._received.put_nowait(conn.backlog[0])
+            except queue.Full:
+                break
+            conn.backlog.popleft()
+
+        paused = bool(conn.backlog) and not conn.closed
+        if paused != (conn in self._paused):
+            if paused:
+                self._paused.add(conn)
+                if self._logger is not None:
+                    self._logger.debug(
+                        f"{self.__class__.__name__} paused reading connection {conn.id}. "
+                        f"Received queue full")
+            else:
+                self._paused.discard(conn)
+            self._update_events(conn)
+
+    def _dispatch(self) -> None:
+        """ Take the messages in the to_send queue and write them to
+            their connections.
+        """
+        written = set()
+        while True:
+            try:
+                item = self._to_send.get_nowait()
+            except queue.Empty:
+                break
+
+            delivery = None
+            if isinstance(item, Delivery):
+                delivery = item
+                if not delivery.start():
+                    continue
+                item = delivery.msg
+            route = self._route(item, delivery)
+            if route is None:
+                continue
+            msg, targets = route
+            tracker = delivery
+            if delivery is not None and len(targets) != 1:
+                tracker = FanoutDelivery(delivery, len(targets))
+
+            if isinstance(msg, FileTransfer):
+                for conn in targets:
+                    frame = self._open_file(msg, tracker)
+                    if frame is None:
+                        break
+                    if self._enqueue(conn, frame, tracker):
+                        written.add(conn)
+                continue
+
+            # Unless each connection has its own compression stream, the frame
+            # is encoded once and shared by all the connections
+            shared = self.compression is None or self.compression.mode == "frame"
+            frame = None
+            for conn in targets:
+                if frame is None or not shared:
+                    compressor = self.compression if shared else conn.buffer.compressor
+                    frame = self._encode(msg, compressor, tracker)
+                    if frame is None:
+                        break
+                if self._enqueue(conn, memoryview(frame), tracker):
+                    written.add(conn)
+
+        for conn in written:
+            if not conn.closed and not conn.writing:
+                self._write(conn)
+
+    def _route(
+            self,
+            item: tuple[Optional[int], Any],
+            delivery: Optional[Delivery]
+    ) -> Optional[tuple[Any, list[Connection]]]:
+        """ Returns the message of an item of the to_send queue and the
+            connections it is sent to, or None if it cannot be sent.
+        """
+        conn_id, msg = item
+        if conn_id is None:
+            return msg, list(self._connections.values())
+        elif conn_id in self._connections:
+            return msg, [self._connections[conn_id]]
+
+        if self._logger is not None:
+            self._logger.info(
+                f"{self.__class__.__name__} failed to send message. "
+                f"Unknown connection {conn_id}")
+        if delivery is not None:
+            delivery.fail(KeyError(conn_id))
+
+    def _enqueue(
+            self,
+            conn: Connection,
+            frame: memoryview | FileFrame,
+            delivery: Optional[Delivery | FanoutDelivery]
+    ) -> bool:
+        """ Add a frame to the frames waiting to be written to a connection,
+            applying the slow consumer policy if the connection has too many.
+            Returns false if the frame was not added.
+        """
+        if self.max_pending is not None and len(conn.pending) >= self.max_pending:
+            error = SlowConsumerError(f"Connection {conn.id} is too slow")
+            if self.slow_consumer_policy == "disconnect":
+                if self._logger is not None:
+                    self._logger.info(
+                        f"{self.__class__.__name__} dropped connection {conn.id}. Too slow")
+                self.slow_disconnects += 1
+                _discard(frame, delivery, error)
+                self._close(conn)
+                return False
+
+            conn.dropped += 1
+            self.dropped_messages += 1
+            # A frame that was partially written must be completed
+            oldest = 1 if conn.partial else 0
+            if (self.slow_consumer_policy == "drop_newest"
+                    or oldest >= len(conn.pending)):
+                _discard(frame, delivery, error)
+                return False
+            dropped_frame, dropped, _ = conn.pending[oldest]
+            del conn.pending[oldest]
+            _discard(dropped_frame, dropped, error)
+
+        conn.pending.append((frame, delivery, time.perf_counter()))
+        return True
+
+    def _open_file(
+            self,
+            transfer: FileTransfer,
+            delivery: Optional[Delivery | FanoutDelivery]
+    ) -> Optional[FileFrame]:
+        """ Open the file of a transfer. Returns None if it cannot be sent. """
+        try:
+            if self.compression is not None:
+                raise ValueError("Files cannot be compressed")
+            return open_file_frame(transfer, self.msg_end, self.framing)
+        except (OSError, ValueError) as err:  # ValueError includes FramingError
+            if self._logger is not None:
+                self._logger.info(f"{self.__class__.__name__} failed to send file. {err}")
+            if delivery is not None:
+                delivery.fail(err)
+
+    def _encode(
+            self,
+            msg: Any,
+            compressor: Optional[Compressor],
+            delivery: Optional[Delivery | FanoutDelivery]
+    ) -> Optional[bytes]:
+        try:
+            return encode_msg(
+                msg,
+                self.msg_end,
+                self.encoding,
+                self.framing,
+                self.codec,
+                compressor
+            )
+        except (CodecError, FramingError) as err:
+            if self._logger is not None:
+                self._logger.info(
+                    f"{self.__class__.__name__} failed to encode message. {err}")
+            if delivery is not None:
+                delivery.fail(err)
+
+    def _write(self, conn: Connection) -> None:
+        """ Write as many pending frames as the socket accepts. If some are
+            left, the connection is watched until it can be written again.
+        """
+        while conn.pending:
+            frames = []
+            for frame, _, _ in itertools.islice(conn.pending, self.max_write_frames):
+                if isinstance(frame, FileFrame):
+                    break
+                frames.append(frame)
+            try:
+                if not frames:
+                    self._write_file(conn)
+                    continue
+                sent = conn.socket.sendmsg(frames)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as err:
+                if self._logger is not None:
+                    self._logger.info(
+                        f"{self.__class__.__name__} failed to send message. "
+                        f"Connection {conn.id} lost. {err}")
+                self._close(conn)
+                return
+
+            now = time.perf_counter()
+            full = sent < sum(len(frame) for frame in frames)
+            while sent > 0:
+                frame, delivery, start = conn.pending[0]
+                if sent < len(frame):
+                    conn.pending[0] = (frame[sent:], delivery, start)
+                    conn.partial = True
+                    break
+                sent -= len(frame)
+                conn.pending.popleft()
+                conn.partial = False
+                if delivery is not None:
+                    delivery.done(start, now)
+            if full:
+                break  # The socket buffer is full
+
+        writing = bool(conn.pending)
+        if writing != conn.writing:
+            conn.writing = writing
+            self._update_events(conn)
+
+    @staticmethod
+    def _write_file(conn: Connection) -> None:
+        """ Write the file that is the first pending frame of a connection. """
+        frame, delivery, start = conn.pending[0]
+        size = len(frame)
+        try:
+            frame.send(conn.socket)
+        except (BlockingIOError, InterruptedError):
+            conn.partial = conn.partial or len(frame) < size
+            raise
+        conn.pending.popleft()
+        conn.partial = False
+        if delivery is not None:
+            delivery.done(start, time.perf_counter())
+
+    def _update_events(self, conn: Connection) -> None:
+        """ Watch a connection for reads unless it is paused, and for writes
+            while it has pending frames.
+        """
+        events = 0 if conn in self._paused else selectors.EVENT_READ
+        if conn.writing:
+            events |= selectors.EVENT_WRITE
+        if events == conn.events:
+            return
+        if conn.events == 0:
+            self._selector.register(conn.socket, events, conn)
+        elif events == 0:
+            self._selector.unregister(conn.socket)
+        else:
+            self._selector.modify(conn.socket, events, conn)
+        conn.events = events
+
+    def _close(self, conn: Connection) -> None:
+        if conn.closed:
+            return
+        conn.closed = True
+        self._connections.pop(conn.id, None)
+        self._paused.discard(conn)
+        if conn.backlog and self._logger is not None:
+            self._logger.info(
+                f"{self.__class__.__name__} discarded {len(conn.backlog)} messages "
+                f"of connection {conn.id}. Received queue full")
+        self._oversized_frames += conn.buffer.oversized_frames
+        if self._selector is not None:
+            try:
+                self._selector.unregister(conn.socket)
+            except (KeyError, ValueError):
+                pass
+        try:
+            conn.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        conn.socket.close()
+
+        error = ConnectionError(f"Connection {conn.id} closed")
+        for frame, delivery, _ in conn.pending:
+            _discard(frame, delivery, error)
+        conn.pending.clear()
+        if self._logger is not None:
+            self._logger.info(
+                f"{self.__class__.__name__}: connection {conn.id} closed")
+
+
+def _discard(
+        frame: memoryview | FileFrame,
+        delivery: Optional[Delivery | FanoutDelivery],
+        error: BaseException
+) -> None:
+    """ Fail the delivery of a frame that will not be written. """
+    if isinstance(frame, FileFrame):
+        frame.close()
+    if delivery is not None:
+        delivery.fail(error)
@@ -0,0 +1,78 @@
+import logging
+import queue
+from typing import Any, Callable, Optional
+
+from socketlib.basic.address import Address
+from socketlib.basic.delivery import Delivery
+from socketlib.server.multi_server import Connection, MultiServer
+
+
+class PublishServer(MultiServer):
+    """ A server that sends every message to all the connected clients.
+
+        Each message put in the to_send queue is encoded once and the same
+        frame is written to every subscriber. Each subscriber has a bounded
+        queue of frames waiting to be written, and a subscriber that does not
+        read fast enough is handled with the slow consumer policy without
+        delaying the others.
+
+        Messages sent by the subscribers are put in the received queue
+        tagged with the id of their connection.
+
+        `submit` and `send_file` take a connection id as in `MultiServer`. If it
+        is None, the message is published to all the subscribers, and its future
+        is resolved once it has been written to every one of them.
+    """
+
+    def __init__(
+            self,
+            address: Address,
+            to_send: Optional[queue.Queue[Any]] = None,
+            received: Optional[queue.Queue[tuple[int, Any]]] = None,
+            max_pending: int = 1024,
+            slow_consumer_policy: str = "drop_oldest",
+            timeout: Optional[float] = None,
+            stop: Optional[Callable[[], bool]] = None,
+            logger: Optional[logging.Logger] = None,
+    ):
+        """ Initialize the publish server.
+
+           :param address: A tuple representing the IP address and port number to bind the server to,
+                or the path of a Unix domain socket.
+           :param to_send: Optional queue containing messages to be published.
+           :param received: Optional queue to store the messages sent by the subscribers.
+           :param max_pending: Maximum number of messages waiting to be written to each subscriber.
+           :param slow_consumer_policy: What to do with a message for a subscriber that has max_pending
+                messages waiting. Can be "drop_oldest", "drop_newest" or "disconnect".
+           :param timeout: Optional timeout value for putting messages in the received queue.
+           :param stop: A function that returns True to signal the server to stop.
+           :param logger: Optional logger for logging server events.
+        """
+        super().__init__(
+            address=address,
+            received=received,
+            to_send=to_send,
+            timeout=timeout,
+            stop=stop,
+            logger=logger
+        )
+        if max_pending < 1:
+            raise ValueError("max_pending must be positive")
+        self.max_pending = max_pending
+        self.slow_consumer_policy = slow_consumer_policy
+        self._check_policy()
+
+    @property
+    def subscribers(self) -> dict[int, Any]:
+        """ The ids of the connected subscribers and their addresses. """
+        return self.connections
+
+    def _route(
+            self,
+            item: Any,
+            delivery: Optional[Delivery]
+    ) -> Optional[tuple[Any, list[Connection]]]:
+        if delivery is not None:
+            # Submitted messages carry the id of their connection
+            return super()._route(item, delivery)
+        return item, list(self._connections.values())
@@ -0,0 +1,123 @@
+import concurrent.futures
+import logging
+from typing import Any, Callable, Optional
+
+from socketlib.basic.address import Address
+from socketlib.basic.framing import LengthPrefixFraming
+from socketlib.basic.rpc import ERROR, REPLY, REQUEST, DispatchQueue, RpcCodec, RpcMessage
+from socketlib.exceptions.exceptions import CodecError
+from socketlib.server.server import Server
+
+
+class RpcServer(Server):
+    """ A server that handles the calls of an `RpcClient`.
+
+        Methods are registered with a handler that receives the argument of
+        the call and returns its result. The result is sent back with the
+        correlation id of the call. If the handler raises an exception, the
+        method is unknown or the result cannot be encoded, an error reply is
+        sent instead.
+
+        By default, handlers run in the receiving thread one at a time, in the
+        order of the calls. If an executor is set, they run in it concurrently
+        and the replies are sent as they finish.
+    """
+
+    def __init__(
+            self,
+            address: Address,
+            reconnect: bool = True,
+            timeout: Optional[float] = None,
+            stop_receive: Optional[Callable[[], bool]] = None,
+            stop_send: Optional[Callable[[], bool]] = None,
+            stop_reconnect: Optional[Callable[[], bool]] = None,
+            logger: Optional[logging.Logger] = None,
+    ):
+        """ Initialize the RpcServer class.
+
+           :param address: A tuple representing the IP address and port number to bind the server to,
+                or the path of a Unix domain socket.
+           :param reconnect: If True, the server will attempt to reconnect after disconnection.
+           :param timeout: Optional timeout value for send and receive operations.
+           :param stop_receive: A function that returns True to signal the receiving loop to stop.
+           :param stop_send: A function that returns True to signal the sending loop to stop.
+           :param stop_reconnect: A function that returns True to signal the reconnecting loop to stop. Won't have
+                any effect if reconnect is set to False.
+           :param logger: Optional logger for logging server events.
+       """
+        super().__init__(
+            address=address,
+            received=DispatchQueue(self._dispatch),
+            reconnect=reconnect,
+            timeout=timeout,
+            stop_receive=stop_receive,
+            stop_send=stop_send,
+            stop_reconnect=stop_reconnect,
+            logger=logger
+        )
+        self._handlers = {}  # type: dict[str, Callable[[Any], Any]]
+
+        self.framing = LengthPrefixFraming()
+        # Converts the calls to bytes. Use RpcCodec(codec) to convert
+        # the arguments and results with another codec
+        self.codec = RpcCodec()
+        # Runs the handlers. If None, they run in the receiving thread
+        self.executor = None  # type: Optional[concurrent.futures.Executor]
+
+    @property
+    def handlers(self) -> dict[str, Callable[[Any], Any]]:
+        return self._handlers
+
+    def register(
+            self,
+            method: str,
+            handler: Optional[Callable[[Any], Any]] = None
+    ) -> Callable:
+        """ Register the handler of a method. Can be used as a decorator
+            if no handler is given.
+        """
+        if handler is None:
+            return lambda func: self.register(method, func)
+        self._handlers[method] = handler
+        return handler
+
+    def _dispatch(self, msg: RpcMessage) -> None:
+        """ Run the handler of a call. """
+        if msg.kind != REQUEST:
+            if self._logger:
+                self._logger.info(f"{self.__class__.__name__} received an unexpected reply")
+            return
+        handler = self._handlers.get(msg.method)
+        if handler is None:
+            self._reply(RpcMessage(ERROR, msg.call_id, "", f"Unknown method {msg.method}"))
+        elif self.executor is not None:
+            self.executor.submit(self._handle, msg, handler)
+        else:
+            self._handle(msg, handler)
+
+    def _handle(self, msg: RpcMessage, handler: Callable[[Any], Any]) -> None:
+        try:
+            result = handler(msg.body)
+        except Exception as err:
+            reply = RpcMessage(ERROR, msg.call_id, "", f"{type(err).__name__}: {err}")
+        else:
+            reply = RpcMessage(REPLY, msg.call_id, "", result)
+        self._reply(reply)
+
+    def _reply(self, reply: RpcMessage) -> None:
+        """ Encode a reply and put it in the to_send queue. If the result cannot be
+            encoded, an error reply is sent instead, so the call does not wait for a
+            reply that is never sent.
+        """
+        if self.codec is None:
+            self._to_send.put(reply)
+            return
+        try:
+            data = self.codec.encode(reply)
+        except CodecError as err:
+            if self._logger:
+                self._logger.info(
+                    f"{self.__class__.__name__} failed to encode the reply of call {reply.call_id}. {err}")
+            data = self.codec.encode(
+                RpcMessage(ERROR, reply.call_id, "", f"{type(err).__name__}: {err}"))
+        self._to_send.put(data)
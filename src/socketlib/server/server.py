@@ -1,12 +1,28 @@
 import abc
+import concurrent.futures
 import queue
 import logging
+import os
 import socket
 import threading
-from typing import Callable, Optional, Type
-
+from typing import Any, Callable, Optional, Type
+
+from socketlib.basic.address import (
+    Address,
+    bind_socket,
+    create_socket,
+    is_unix_address,
+    remove_socket_file,
+)
 from socketlib.basic.buffer import Buffer
+from socketlib.basic.codecs import Codec
+from socketlib.basic.compression import Compressor, check_framing
+from socketlib.basic.delivery import Delivery
+from socketlib.basic.files import FileTransfer
+from socketlib.basic.framing import Framing
 from socketlib.basic.receive import receive_and_enqueue
+from socketlib.basic.rate_limit import RateLimiter
+from socketlib.basic.socket_options import SocketOptions
 from socketlib.basic.send import get_and_send_messages
 
 
@@ -16,7 +32,7 @@ class ServerBase(abc.ABC):
 
     def __init__(
             self,
-            address: tuple[str, int],
+            address: Address,
             reconnect: bool = True,
             timeout: Optional[float] = None,
             stop: Optional[Callable[[], bool]] = None,
@@ -25,7 +41,8 @@ class ServerBase(abc.ABC):
     ):
         """ Initialize the base server class.
 
-           :param address: A tuple representing the IP address and port number to bind the server to.
+           :param address: A tuple representing the IP address and port number to bind the server to,
+                or the path of a Unix domain socket.
            :param reconnect: If True, the server will attempt to reconnect after disconnection.
            :param timeout: Optional timeout value for send and receive operations.
            :param stop: A function that returns True to signal the server to stop.
@@ -52,39 +69,92 @@ class ServerBase(abc.ABC):
 
         self.msg_end = b"\r\n"
         self.encoding = "utf-8"
+        # If true, the messages obtained from a single read are put in
+        # the received queue as one list.
+        self.batch_received = False
+        # Strategy used to delimit messages. If None, messages end with msg_end
+        self.framing = None  # type: Optional[Framing]
+        # Converts messages to and from bytes. If None, messages sent must be
+        # strings or bytes and received messages are bytes
+        self.codec = None  # type: Optional[Codec]
+        # Optional compression of messages. Requires a length prefixed framing
+        self.compression = None  # type: Optional[Compressor]
+        # Limits of the memory used to receive messages. See Buffer
+        self.max_frame_size = None  # type: Optional[int]
+        self.max_buffered = None  # type: Optional[int]
+        self.oversize_policy = "drop"
+        self._oversized_frames = 0
+        # If true, the messages already in the to_send queue are sent with
+        # a single write, up to max_batch_count messages or max_batch_bytes bytes
+        self.coalesce = False
+        self.max_batch_count = 1024
+        self.max_batch_bytes = 65536
+        # Options such as TCP_NODELAY or the buffer sizes applied to the sockets
+        self.socket_options = SocketOptions()
+        # Limits the rate at which messages are sent
+        self.rate_limiter = None  # type: Optional[RateLimiter]
+        # Seconds between checks of the stop functions while waiting for a connection
+        self.accept_interval = 0.1
 
     @property
     def ip(self) -> str:
+        """ The IP address, or the path of a Unix domain socket. """
+        if is_unix_address(self._address):
+            return os.fspath(self._address)
         return self._address[0]
 
     @property
-    def port(self) -> int:
+    def port(self) -> Optional[int]:
+        """ The port, or None for a Unix domain socket. """
+        if is_unix_address(self._address):
+            return None
         return self._address[1]
 
     def listen(self) -> None:
         """ Creates the socket and puts it in listen mode.
         """
-        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self._socket.bind(self._address)
-        self._socket.listen()
+        check_framing(self.compression, self.framing)
+        self._socket = create_socket(self._address)
+        self.socket_options.apply_listener(self._socket)
+        bind_socket(self._socket, self._address)
+        self.socket_options.listen(self._socket)
         if self._logger is not None:
             self._logger.info(
                 f"{self.__class__.__name__}: "
                 f"Listening for connections in {self._address}"
             )
 
-    def accept_connection(self) -> None:
-        """ Accept a new connection.
+    def accept_connection(self) -> bool:
+        """ Accept a new connection. Returns false if the server was stopped
+            before a client connected.
+
+            The listening socket is kept open, so clients can connect again
+            as soon as a connection is closed.
         """
-        self._connection, self._conn_details = self._socket.accept()
+        self._socket.settimeout(self.accept_interval)
+        while True:
+            try:
+                self._connection, self._conn_details = self._socket.accept()
+                break
+            except socket.timeout:
+                if self._accept_stopped():
+                    return False
+        self.socket_options.apply(self._connection)
         if self._timeout is not None:
             self._connection.settimeout(self._timeout)
+        if self.compression is not None:
+            self.compression.reset()
         if self._logger is not None:
             self._logger.info(
                 f"{self.__class__.__name__}: "
                 f"connection accepted from {self._conn_details}"
             )
+        return True
+
+    def _accept_stopped(self) -> bool:
+        """ True if the server must stop waiting for a connection. """
+        return (self._stop_event.is_set() or self._stop_reconnect_event.is_set()
+                or (self._reconnect and self._stop_reconnect()))
 
     @abc.abstractmethod
     def start(self) -> None:
@@ -108,17 +178,131 @@ class ServerBase(abc.ABC):
         return self
 
     def close_connection(self) -> None:
+        """ Close the connection with the client and the listening socket. """
+        self._close_client()
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                self._socket.close()
+            remove_socket_file(self._address)
+
+    def _close_client(self) -> None:
+        """ Close the connection with the client, keeping the listening socket open. """
         if self._connection is not None:
             try:
                 self._connection.shutdown(socket.SHUT_RDWR)
             except OSError:
                 pass
             self._connection.close()
-        if self._socket is not None:
-            try:
-                self._socket.shutdown(socket.SHUT_RDWR)
-            except OSError:
-                self._socket.close()
+
+    @property
+    def oversized_frames(self) -> int:
+        """ Number of received frames that exceeded the size limits. """
+        buffer = getattr(self, "_buffer", None)
+        if buffer is None:
+            return self._oversized_frames
+        return self._oversized_frames + buffer.oversized_frames
+
+    def _create_buffer(self, sock: socket.socket) -> Buffer:
+        """ Create the buffer used to receive messages from a new connection. """
+        self._oversized_frames = self.oversized_frames
+        return Buffer(
+            sock,
+            framing=self.framing,
+            max_frame_size=self.max_frame_size,
+            max_buffered=self.max_buffered,
+            oversize_policy=self.oversize_policy,
+            compressor=self.compression
+        )
+
+    def _receive_messages(self, stop: Callable[[], bool]) -> None:
+        """ Receive messages and put them in the received queue until the
+            connection is lost or the stop function evaluates to true.
+
+            Used by the server classes that receive messages.
+        """
+        receive_and_enqueue(
+            buffer=self._buffer,
+            msg_end=self.msg_end,
+            msg_queue=self._received,
+            stop=stop,
+            timeout=self._timeout,
+            logger=self._logger,
+            name=self.__class__.__name__,
+            batch=self.batch_received,
+            codec=self.codec
+        )
+
+    def submit(
+            self,
+            msg: Any,
+            lane: Optional[int] = None
+    ) -> concurrent.futures.Future:
+        """ Put a message in the to_send queue and return a future that is
+            resolved when the message has been fully written to the socket.
+
+            The result of the future is a DeliveryReport with the time the message
+            waited in the queue and the time it took to write it. The future fails
+            if the message cannot be encoded or the connection fails while it is
+            being written. Used by the server classes that send messages.
+
+            :param msg: The message to send.
+            :param lane: The lane of the message if the to_send queue is a LaneQueue.
+        """
+        delivery = Delivery(msg)
+        if lane is None:
+            self._to_send.put(delivery)
+        else:
+            self._to_send.put(delivery, lane=lane)
+        return delivery.future
+
+    def send_file(
+            self,
+            path: str | os.PathLike,
+            offset: int = 0,
+            count: Optional[int] = None
+    ) -> concurrent.futures.Future:
+        """ Send a file, or a range of bytes of it, as a single message without
+            copying its contents through Python.
+
+            The file is put in the to_send queue, so it is sent after the messages
+            that are already in the queue. Returns a future like `submit`.
+
+            :param path: Path to the file.
+            :param offset: Position of the file where the message starts.
+            :param count: Number of bytes to send. If None, the file is sent until its end.
+        """
+        return self.submit(FileTransfer(path, offset, count))
+
+    def _send_messages(
+            self,
+            sock: socket.socket,
+            stop: Callable[[], bool]
+    ) -> None:
+        """ Get messages from the to_send queue and send them until the
+            connection is lost or the stop function evaluates to true.
+
+            Used by the server classes that send messages.
+        """
+        get_and_send_messages(
+            sock=sock,
+            msg_end=self.msg_end,
+            msg_queue=self._to_send,
+            stop=stop,
+            timeout=self._timeout,
+            logger=self._logger,
+            name=self.__class__.__name__,
+            encoding=self.encoding,
+            wait=self.send_wait,
+            framing=self.framing,
+            codec=self.codec,
+            compressor=self.compression,
+            coalesce=self.coalesce,
+            max_batch_count=self.max_batch_count,
+            max_batch_bytes=self.max_batch_bytes,
+            rate_limiter=self.rate_limiter
+        )
 
     @staticmethod
     def _get_stop_function(
@@ -138,7 +322,7 @@ class ServerReceiver(ServerBase):
     """
     def __init__(
             self,
-            address: tuple[str, int],
+            address: Address,
             received: Optional[queue.Queue[bytes]] = None,
             reconnect: bool = True,
             timeout: Optional[float] = None,
@@ -148,7 +332,8 @@ class ServerReceiver(ServerBase):
     ):
         """ Initialize the server receiver class.
 
-               :param address: A tuple representing the IP address and port number to bind the server to.
+               :param address: A tuple representing the IP address and port number to bind the server to,
+                or the path of a Unix domain socket.
                :param reconnect: If True, the server will attempt to reconnect after disconnection.
                :param timeout: Optional timeout value for send and receive operations.
                :param stop: A function that returns True to signal the server to stop.
@@ -177,9 +362,11 @@ class ServerReceiver(ServerBase):
     def receive_thread(self) -> threading.Thread:
         return self._run_thread
 
-    def accept_connection(self) -> None:
-        super().accept_connection()
-        self._buffer = Buffer(self._connection)
+    def accept_connection(self) -> bool:
+        if not super().accept_connection():
+            return False
+        self._buffer = self._create_buffer(self._connection)
+        return True
 
     def start(self) -> None:
         """ Start the server in a new thread. """
@@ -193,29 +380,12 @@ class ServerReceiver(ServerBase):
     def _recv(self):
         if self._reconnect:
             while not self._stop_reconnect():
-                self.accept_connection()
-                receive_and_enqueue(
-                    buffer=self._buffer,
-                    msg_end=self.msg_end,
-                    msg_queue=self.received,
-                    stop=self._stop,
-                    timeout=self._timeout,
-                    logger=self._logger,
-                    name=self.__class__.__name__
-                )
-                self.close_connection()
-                self.listen()
-        else:
-            self.accept_connection()
-            receive_and_enqueue(
-                buffer=self._buffer,
-                msg_end=self.msg_end,
-                msg_queue=self.received,
-                stop=self._stop,
-                timeout=self._timeout,
-                logger=self._logger,
-                name=self.__class__.__name__
-            )
+                if not self.accept_connection():
+                    break
+                self._receive_messages(stop=self._stop)
+                self._close_client()
+        elif self.accept_connection():
+            self._receive_messages(stop=self._stop)
 
     def start_main_thread(self) -> None:
         self.listen()
@@ -228,7 +398,7 @@ class ServerSender(ServerBase):
 
     def __init__(
             self,
-            address: tuple[str, int],
+            address: Address,
             to_send: Optional[queue.Queue[str | bytes]] = None,
             reconnect: bool = True,
             timeout: Optional[float] = None,
@@ -238,7 +408,8 @@ class ServerSender(ServerBase):
     ):
         """ Initialize the server receiver class.
 
-           :param address: A tuple representing the IP address and port number to bind the server to.
+           :param address: A tuple representing the IP address and port number to bind the server to,
+                or the path of a Unix domain socket.
            :param reconnect: If True, the server will attempt to reconnect after disconnection.
            :param timeout: Optional timeout value for send and receive operations.
            :param stop: A function that returns True to signal the server to stop.
@@ -284,33 +455,12 @@ class ServerSender(ServerBase):
     def _send(self):
         if self._reconnect:
             while not self._stop_reconnect():
-                self.accept_connection()
-                get_and_send_messages(
-                    sock=self._connection,
-                    msg_end=self.msg_end,
-                    msg_queue=self.to_send,
-                    stop=self._stop,
-                    timeout=self._timeout,
-                    logger=self._logger,
-                    name=self.__class__.__name__,
-                    encoding=self.encoding,
-                    wait=self.send_wait
-                )
-                self.close_connection()
-                self.listen()
-        else:
-            self.accept_connection()
-            get_and_send_messages(
-                sock=self._connection,
-                msg_end=self.msg_end,
-                msg_queue=self.to_send,
-                stop=self._stop,
-                timeout=self._timeout,
-                logger=self._logger,
-                name=self.__class__.__name__,
-                encoding=self.encoding,
-                wait=self.send_wait
-            )
+                if not self.accept_connection():
+                    break
+                self._send_messages(sock=self._connection, stop=self._stop)
+                self._close_client()
+        elif self.accept_connection():
+            self._send_messages(sock=self._connection, stop=self._stop)
 
 
 class Server(ServerBase):
@@ -321,7 +471,7 @@ class Server(ServerBase):
 
     def __init__(
             self,
-            address: tuple[str, int],
+            address: Address,
             received: Optional[queue.Queue[bytes]] = None,
             to_send: Optional[queue.Queue[str | bytes]] = None,
             reconnect: bool = True,
@@ -333,7 +483,8 @@ class Server(ServerBase):
     ):
         """ Initialize the Server class.
 
-           :param address: A tuple representing the IP address and port number to bind the server to.
+           :param address: A tuple representing the IP address and port number to bind the server to,
+                or the path of a Unix domain socket.
            :param received: Optional queue to store received messages.
            :param to_send: Optional queue containing messages to be sent.
            :param reconnect: If True, the server will attempt to reconnect after disconnection.
@@ -364,6 +515,7 @@ class Server(ServerBase):
         self._send_thread = threading.Thread(target=self._send, daemon=True)
         self._recv_thread = threading.Thread(target=self._recv, daemon=True)
         self._connected = threading.Event()
+        self._accept_failed = False  # True if the server stopped waiting for a client
 
         self.send_wait = 0
 
@@ -385,65 +537,35 @@ class Server(ServerBase):
 
     def _send(self) -> None:
         self._connected.wait()
+        if self._accept_failed:
+            return
         if self._reconnect:
             while not self._stop_reconnect():
-                get_and_send_messages(
-                    sock=self._connection,
-                    msg_end=self.msg_end,
-                    msg_queue=self.to_send,
-                    stop=self._stop_send,
-                    timeout=self._timeout,
-                    logger=self._logger,
-                    name=self.__class__.__name__,
-                    encoding=self.encoding,
-                    wait=self.send_wait
-                )
+                self._send_messages(sock=self._connection, stop=self._stop_send)
                 self._connected.clear()
-                self.close_connection()
-                self.listen()
-                self.accept_connection()
+                self._close_client()
+                if not self.accept_connection():
+                    break
         else:
-            get_and_send_messages(
-                sock=self._connection,
-                msg_end=self.msg_end,
-                msg_queue=self.to_send,
-                stop=self._stop_send,
-                timeout=self._timeout,
-                logger=self._logger,
-                name=self.__class__.__name__,
-                encoding=self.encoding,
-                wait=self.send_wait
-            )
+            self._send_messages(sock=self._connection, stop=self._stop_send)
 
     def _recv(self):
         self._connected.wait()
         if self._reconnect:
-            while not self._stop_reconnect():
-                receive_and_enqueue(
-                    buffer=self._buffer,
-                    msg_end=self.msg_end,
-                    msg_queue=self.received,
-                    stop=self._stop_receive,
-                    timeout=self._timeout,
-                    logger=self._logger,
-                    name=self.__class__.__name__
-                )
+            while not self._stop_reconnect() and not self._accept_failed:
+                self._receive_messages(stop=self._stop_receive)
                 self._connected.wait()
-        else:
-            receive_and_enqueue(
-                buffer=self._buffer,
-                msg_end=self.msg_end,
-                msg_queue=self.received,
-                stop=self._stop_receive,
-                timeout=self._timeout,
-                logger=self._logger,
-                name=self.__class__.__name__
-            )
+        elif not self._accept_failed:
+            self._receive_messages(stop=self._stop_receive)
 
-    def accept_connection(self) -> None:
-        super().accept_connection()
-        self._buffer = Buffer(self._connection)
+    def accept_connection(self) -> bool:
+        accepted = super().accept_connection()
+        if accepted:
+            self._buffer = self._create_buffer(self._connection)
+        else:
+            self._accept_failed = True
         self._connected.set()
+        return accepted
 
     def start(self) -> None:
         """ Start this server in a new thread. """
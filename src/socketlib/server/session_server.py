@@ -0,0 +1,89 @@
+import logging
+import queue
+import socket
+from typing import Any, Callable, Optional
+
+from socketlib.basic.address import Address
+from socketlib.basic.framing import LengthPrefixFraming
+from socketlib.basic.rpc import DispatchQueue
+from socketlib.basic.session import Session, SessionCodec, SessionQueue, peer_closed
+from socketlib.server.server import Server
+
+
+class SessionServer(Server):
+    """ A server whose messages survive reconnections.
+
+        It is the server counterpart of `SessionClient`. When the client
+        reconnects, the session resumes from the last message each side
+        acknowledged. See `Session`.
+    """
+
+    def __init__(
+            self,
+            address: Address,
+            received: Optional[queue.Queue[Any]] = None,
+            reconnect: bool = True,
+            timeout: Optional[float] = None,
+            stop_receive: Optional[Callable[[], bool]] = None,
+            stop_send: Optional[Callable[[], bool]] = None,
+            stop_reconnect: Optional[Callable[[], bool]] = None,
+            logger: Optional[logging.Logger] = None,
+    ):
+        """ Initialize the SessionServer class.
+
+           :param address: A tuple representing the IP address and port number to bind the server to,
+                or the path of a Unix domain socket.
+           :param received: Optional queue to store received messages.
+           :param reconnect: If True, the server will attempt to reconnect after disconnection.
+           :param timeout: Optional timeout value for send and receive operations.
+           :param stop_receive: A function that returns True to signal the receiving loop to stop.
+           :param stop_send: A function that returns True to signal the sending loop to stop.
+           :param stop_reconnect: A function that returns True to signal the reconnecting loop to stop. Won't have
+                any effect if reconnect is set to False.
+           :param logger: Optional logger for logging server events.
+       """
+        send_queue = SessionQueue()
+        self._messages = received if received is not None else queue.Queue()
+        self._session = Session(
+            send_queue, self._messages, logger=logger, name=self.__class__.__name__)
+        super().__init__(
+            address=address,
+            received=DispatchQueue(self._session.dispatch),
+            to_send=send_queue,
+            reconnect=reconnect,
+            timeout=timeout,
+            stop_receive=stop_receive,
+            stop_send=stop_send,
+            stop_reconnect=stop_reconnect,
+            logger=logger
+        )
+        self.framing = LengthPrefixFraming()
+        # Converts the session messages to bytes. Use SessionCodec(codec)
+        # to convert the payloads with another codec
+        self.codec = SessionCodec()
+
+    @property
+    def received(self) -> queue.Queue[Any]:
+        return self._messages
+
+    @property
+    def to_send(self) -> SessionQueue:
+        return self._to_send
+
+    @property
+    def session(self) -> Session:
+        return self._session
+
+    def accept_connection(self) -> bool:
+        self._session.start_connection()
+        return super().accept_connection()
+
+    def _receive_messages(self, stop: Callable[[], bool]) -> None:
+        super()._receive_messages(stop)
+        # The sender notices a lost connection only when a write fails
+        if not stop() and self._connection is not None and peer_closed(self._connection):
+            try:
+                self._connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._session.connection_lost()
@@ -0,0 +1,164 @@
+import logging
+import multiprocessing
+import queue
+import socket
+from typing import Any, Callable, Optional
+
+from socketlib.basic.address import is_unix_address
+from socketlib.server.multi_server import MultiServer
+
+
+def create_multi_server(
+        address: tuple[str, int],
+        stop: Callable[[], bool]
+) -> MultiServer:
+    """ The default server of the workers of a ShardedServer. """
+    return MultiServer(address, stop=stop)
+
+
+class ShardedServer:
+    """ Runs a server in several worker processes that listen on the same port.
+
+        Every worker binds its own listening socket with SO_REUSEPORT, so
+        the kernel balances the incoming connections between the workers and
+        each one runs on its own core.
+
+        Received messages are handled in the workers by the handler function.
+        If no handler is given, they are put in the received queue of the
+        launcher, tagged with the index of the worker and the id of the connection.
+
+        Workers are started with the fork method where it is available. The
+        server factory and the handler must be picklable with other methods.
+    """
+    stats_fields = ("messages", "connections", "accepted", "oversized_frames")
+
+    def __init__(
+            self,
+            address: tuple[str, int],
+            workers: Optional[int] = None,
+            server_factory: Callable[
+                [tuple[str, int], Callable[[], bool]], MultiServer] = create_multi_server,
+            handler: Optional[Callable[[tuple[int, Any]], None]] = None,
+            logger: Optional[logging.Logger] = None,
+    ):
+        """
+            :param address: A tuple representing the IP address and port number to bind the workers to.
+            :param workers: Number of worker processes. Defaults to the number of cores.
+            :param server_factory: Function that creates the server of a worker from the address
+                and a stop function. Used to configure framing, codecs and other options.
+            :param handler: Optional function called in the workers with each received message.
+            :param logger: Optional logger for logging server events.
+        """
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        if workers < 1:
+            raise ValueError("There must be at least one worker")
+        self._address = address
+        self._n_workers = workers
+        self._server_factory = server_factory
+        self._handler = handler
+        self._logger = logger
+
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context(
+            "fork" if "fork" in methods else None)
+        self._stop_event = self._context.Event()
+        self._received = self._context.Queue() if handler is None else None
+        # Statistics of each worker, written only by the worker
+        self._stats = self._context.Array(
+            "q", workers * len(self.stats_fields), lock=False)
+        self._workers = []  # type: list[multiprocessing.Process]
+
+    @property
+    def ip(self) -> str:
+        return self._address[0]
+
+    @property
+    def port(self) -> int:
+        return self._address[1]
+
+    @property
+    def received(self) -> Optional[multiprocessing.Queue]:
+        return self._received
+
+    @property
+    def workers(self) -> list[multiprocessing.Process]:
+        return self._workers
+
+    def start(self) -> None:
+        """ Start the worker processes. """
+        if is_unix_address(self._address):
+            raise ValueError("Unix domain sockets cannot be shared by several workers")
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise OSError("SO_REUSEPORT is not supported by this platform")
+        for index in range(self._n_workers):
+            worker = self._context.Process(
+                target=self._run_worker, args=(index,), daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        if self._logger is not None:
+            self._logger.info(
+                f"{self.__class__.__name__}: started {self._n_workers} "
+                f"workers listening in {self._address}"
+            )
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """ Wait for the worker processes to finish. """
+        for worker in self._workers:
+            worker.join(timeout)
+
+    def shutdown(self, timeout: float = 5.) -> None:
+        """ Stop all the workers. Workers that do not stop before the
+            timeout are terminated.
+        """
+        self._stop_event.set()
+        self.join(timeout)
+        for worker in self._workers:
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+
+    def worker_stats(self) -> list[dict[str, int]]:
+        """ Returns the statistics of each worker. """
+        n_fields = len(self.stats_fields)
+        return [
+            dict(zip(self.stats_fields, self._stats[ii * n_fields:(ii + 1) * n_fields]))
+            for ii in range(self._n_workers)
+        ]
+
+    def stats(self) -> dict[str, int]:
+        """ Returns the statistics of all the workers added together. """
+        merged = dict.fromkeys(self.stats_fields, 0)
+        for worker in self.worker_stats():
+            for field, value in worker.items():
+                merged[field] += value
+        return merged
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    def _run_worker(self, index: int) -> None:
+        stop = self._stop_event.is_set
+        server = self._server_factory(self._address, stop)
+        server.socket_options.reuse_port = True
+        server.start()
+
+        offset = index * len(self.stats_fields)
+        while not stop():
+            try:
+                conn_id, msg = server.received.get(timeout=0.1)
+            except queue.Empty:
+                pass
+            else:
+                self._stats[offset] += 1
+                if self._handler is not None:
+                    self._handler((conn_id, msg))
+                else:
+                    self._received.put(((index, conn_id), msg))
+            self._stats[offset + 1] = len(server.connections)
+            self._stats[offset + 2] = server.accepted
+            self._stats[offset + 3] = server.oversized_frames
+        server.join()
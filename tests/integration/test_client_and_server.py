@@ -1,12 +1,36 @@
+import asyncio
+import errno
 import queue
+import socket
+import time
+
 import pytest
 from socketlib import (
+    AsyncClient,
+    AsyncServer,
+    Backoff,
+    ChannelClient,
+    ChannelServer,
     Client,
+    ClientPool,
     ClientReceiver,
+    ClientReportAlive,
     ClientSender,
+    DatagramReceiver,
+    DatagramSender,
+    JsonCodec,
+    RpcCodec,
     Server,
     ServerReceiver,
     ServerSender,
+    LengthPrefixFraming,
+    MultiServer,
+    PublishServer,
+    RpcClient,
+    RpcError,
+    RpcServer,
+    ShardedServer,
+    VarintFraming,
 )
 
 
@@ -134,3 +158,687 @@ class TestClientAndServer:
         assert not client.received.empty()
         assert client.received.get() == b"Hello from server"
         assert client.received.get() == b"World from server"
+
+
+class TestSubmit:
+
+    @pytest.mark.timeout(3)
+    def test_futures_are_resolved_when_messages_are_sent(self):
+        address = ("localhost", 12345)
+        received = queue.Queue()
+        server = ServerReceiver(
+            address,
+            received,
+            reconnect=False,
+            stop=lambda: received.qsize() >= 2
+        )
+
+        client = ClientSender(address, reconnect=False, timeout=0.2)
+        futures = [client.submit("Hello"), client.submit("World")]
+
+        with server:
+            server.start()
+            with client:
+                client.connect(timeout=2)
+                client.start()
+                for future in futures:
+                    future.result(timeout=2)
+                server.join()
+                client.shutdown()
+
+        assert server.received.get() == b"Hello"
+        assert server.received.get() == b"World"
+
+
+class TestLengthPrefixFraming:
+
+    @pytest.mark.timeout(3)
+    def test_client_and_server_exchange_binary_messages(self):
+        address = ("localhost", 12345)
+        binary = bytes(range(256))
+
+        client_received = queue.Queue()
+        client_to_send = queue.Queue()
+        client = Client(
+            address,
+            client_received,
+            client_to_send,
+            reconnect=False,
+            stop_receive=lambda: client_received.qsize() >= 1,
+            stop_send=lambda: client_to_send.empty()
+        )
+        client.framing = LengthPrefixFraming()
+        client.to_send.put(binary)
+
+        server_received = queue.Queue()
+        server_to_send = queue.Queue()
+        server = Server(
+            address,
+            server_received,
+            server_to_send,
+            reconnect=False,
+            stop_receive=lambda: server_received.qsize() >= 1,
+            stop_send=lambda: server_to_send.empty()
+        )
+        server.framing = LengthPrefixFraming()
+        server.to_send.put("Hello\r\nWorld")
+
+        with server:
+            server.start()
+            with client:
+                client.connect(timeout=2)
+                client.start()
+                client.join()
+            server.join()
+
+        assert server.received.get() == binary
+        assert client.received.get() == b"Hello\r\nWorld"
+
+
+class TestClientReportAlive:
+
+    @pytest.mark.timeout(3)
+    def test_sends_alive_and_queued_messages(self):
+        address = ("localhost", 12345)
+
+        server_received = queue.Queue()
+        server = ServerReceiver(
+            address,
+            server_received,
+            reconnect=False,
+            stop=lambda: server_received.qsize() >= 3
+        )
+
+        client = ClientReportAlive(address, reconnect=False, timeout=0.2)
+        client.to_send.put("Hello")
+        client.to_send.put("World")
+
+        with server:
+            server.start()
+            with client:
+                client.start()
+                client.connect(timeout=2)
+                server.join()
+                client.shutdown()
+
+        received = [server.received.get() for _ in range(3)]
+        assert sorted(received) == [b"Alive", b"Hello", b"World"]
+
+
+class TestMultiServer:
+
+    @staticmethod
+    def wait_for_connections(server, count):
+        while len(server.connections) < count:
+            time.sleep(0.01)
+
+    @pytest.mark.timeout(3)
+    def test_serves_many_clients(self):
+        address = ("localhost", 12345)
+        server = MultiServer(address)
+        clients = [Client(address, reconnect=False, timeout=0.2) for _ in range(3)]
+
+        with server:
+            server.start()
+            for ii, client in enumerate(clients):
+                client.connect(timeout=1)
+                client.start()
+                client.to_send.put(f"Hello {ii}")
+
+            received = sorted(server.received.get(timeout=1) for _ in clients)
+            conn_ids = [conn_id for conn_id, _ in received]
+            assert [msg for _, msg in received] == [b"Hello 0", b"Hello 1", b"Hello 2"]
+            assert len(set(conn_ids)) == 3
+
+            server.to_send.put((conn_ids[1], "Reply"))
+            assert clients[1].received.get(timeout=1) == b"Reply"
+
+            server.to_send.put((None, "Everyone"))
+            for client in clients:
+                assert client.received.get(timeout=1) == b"Everyone"
+
+            for client in clients:
+                client.shutdown()
+            server.shutdown()
+
+    @pytest.mark.timeout(3)
+    def test_resolves_submitted_messages(self):
+        address = ("localhost", 12345)
+        server = MultiServer(address)
+        server.framing = LengthPrefixFraming()
+        client = ClientReceiver(address, reconnect=False, timeout=0.2)
+        client.framing = LengthPrefixFraming()
+
+        with server:
+            server.start()
+            with client:
+                client.connect(timeout=1)
+                client.start()
+                self.wait_for_connections(server, 1)
+                conn_id = list(server.connections)[0]
+
+                future = server.submit(conn_id, "Hello")
+                assert future.result(timeout=1).write_time >= 0
+                assert client.received.get(timeout=1) == b"Hello"
+
+                with pytest.raises(KeyError):
+                    server.submit(conn_id + 1, "Hello").result(timeout=1)
+
+                client.shutdown()
+            server.shutdown()
+
+    @pytest.mark.timeout(5)
+    def test_sends_files(self, tmp_path):
+        address = ("localhost", 12345)
+        path = tmp_path / "data.bin"
+        path.write_bytes(bytes(range(256)) * 16384)  # Larger than the socket buffers
+        server = MultiServer(address)
+        server.framing = LengthPrefixFraming()
+        clients = [ClientReceiver(address, reconnect=False, timeout=1) for _ in range(2)]
+
+        with server:
+            server.start()
+            for ii, client in enumerate(clients):
+                client.framing = LengthPrefixFraming()
+                client.connect(timeout=1)
+                client.start()
+                self.wait_for_connections(server, ii + 1)
+            conn_id = list(server.connections)[0]
+
+            sent = server.send_file(conn_id, path, offset=10, count=100)
+            server.submit(conn_id, "After")
+            everyone = server.send_file(None, path)
+            assert sent.result(timeout=2).write_time >= 0
+            assert everyone.result(timeout=2).write_time >= 0
+            with pytest.raises(FileNotFoundError):
+                server.send_file(conn_id, tmp_path / "missing.bin").result(timeout=1)
+
+            data = path.read_bytes()
+            assert clients[0].received.get(timeout=2) == data[10:110]
+            assert clients[0].received.get(timeout=2) == b"After"
+            assert clients[0].received.get(timeout=2) == data
+            assert clients[1].received.get(timeout=2) == data
+
+            for client in clients:
+                client.shutdown()
+            server.shutdown()
+
+    @pytest.mark.timeout(3)
+    def test_invalid_frames_close_only_their_connection(self):
+        address = ("localhost", 12345)
+        server = MultiServer(address)
+        server.framing = VarintFraming()
+        client = Client(address, reconnect=False, timeout=0.2)
+        client.framing = VarintFraming()
+
+        with server:
+            server.start()
+            with client:
+                client.connect(timeout=1)
+                client.start()
+                with socket.create_connection(address) as bad_client:
+                    self.wait_for_connections(server, 2)
+                    bad_client.sendall(b"\xff" * 16)
+                    while len(server.connections) > 1:
+                        time.sleep(0.01)
+
+                client.to_send.put("Hello")
+                conn_id, msg = server.received.get(timeout=1)
+                assert msg == b"Hello"
+                assert list(server.connections) == [conn_id]
+
+                client.shutdown()
+            server.shutdown()
+
+    @pytest.mark.timeout(3)
+    def test_stops_reading_while_the_received_queue_is_full(self):
+        address = ("localhost", 12345)
+        server = MultiServer(address, received=queue.Queue(maxsize=2))
+        server.framing = LengthPrefixFraming()
+        client = Client(address, reconnect=False, timeout=0.2)
+        client.framing = LengthPrefixFraming()
+
+        with server:
+            server.start()
+            with client:
+                client.connect(timeout=1)
+                client.start()
+                for ii in range(5):
+                    client.to_send.put(f"Hello {ii}")
+                while not server.received.full():
+                    time.sleep(0.01)
+
+                # The event loop still serves the connection
+                conn_id = list(server.connections)[0]
+                server.to_send.put((conn_id, "Reply"))
+                assert client.received.get(timeout=1) == b"Reply"
+
+                received = [server.received.get(timeout=1)[1] for _ in range(5)]
+                assert received == [f"Hello {ii}".encode() for ii in range(5)]
+
+                client.shutdown()
+            server.shutdown()
+
+
+class TestAsyncClientAndServer:
+
+    @pytest.mark.timeout(3)
+    def test_client_and_server_send_and_receive(self):
+        async def run():
+            address = ("localhost", 12345)
+            server = AsyncServer(address, reconnect=False)
+            client = AsyncClient(address, reconnect=False)
+            client.framing = server.framing = LengthPrefixFraming()
+
+            async with server:
+                server.start()
+                async with client:
+                    assert await client.connect(timeout=1)
+                    client.start()
+
+                    await client.to_send.put("Hello")
+                    await server.to_send.put("World")
+                    server_msg = await asyncio.wait_for(server.received.get(), 1)
+                    client_msg = await asyncio.wait_for(client.received.get(), 1)
+
+                    await client.shutdown()
+                await server.shutdown()
+            return server_msg, client_msg
+
+        assert asyncio.run(run()) == (b"Hello", b"World")
+
+    @pytest.mark.timeout(3)
+    def test_server_accepts_new_connection(self):
+        async def run():
+            address = ("localhost", 12345)
+            server = AsyncServer(address, stop_reconnect=lambda: server.received.qsize() >= 2)
+            async with server:
+                server.start()
+                for msg in ("Hello", "World"):
+                    client = AsyncClient(
+                        address,
+                        reconnect=False,
+                        stop_receive=lambda: True,
+                        stop_send=lambda: client.to_send.empty()
+                    )
+                    async with client:
+                        assert await client.connect(timeout=1)
+                        await client.to_send.put(msg)
+                        await client.run()
+                await asyncio.wait_for(server.join(), 1)
+            return [server.received.get_nowait() for _ in range(2)]
+
+        assert asyncio.run(run()) == [b"Hello", b"World"]
+
+    @pytest.mark.timeout(3)
+    def test_client_retries_any_connection_error_until_the_timeout(self, monkeypatch):
+        async def unreachable(loop, sock, address):
+            raise OSError(errno.EHOSTUNREACH, "No route to host")
+
+        monkeypatch.setattr(asyncio.BaseEventLoop, "sock_connect", unreachable)
+
+        async def run():
+            client = AsyncClient(("localhost", 12345), reconnect=False)
+            client.backoff = Backoff(base=10., cap=10., jitter=False)
+            start = time.monotonic()
+            connected = await client.connect(timeout=0.2)
+            return connected, time.monotonic() - start
+
+        connected, elapsed = asyncio.run(run())
+        assert not connected
+        assert elapsed < 1
+
+    @pytest.mark.timeout(3)
+    @pytest.mark.parametrize("framing,max_frame_size,data", [
+        (VarintFraming(), None, b"\xff" * 16),
+        (LengthPrefixFraming(), 16, b"\x00\x00\x00\x20" + bytes(32)),
+    ])
+    def test_server_reconnects_after_invalid_frames(self, framing, max_frame_size, data):
+        async def run():
+            address = ("localhost", 12345)
+            server = AsyncServer(address, stop_reconnect=lambda: server.received.qsize() >= 1)
+            server.framing = framing
+            server.max_frame_size = max_frame_size
+            server.oversize_policy = "raise"
+            async with server:
+                server.start()
+                _, writer = await asyncio.open_connection(*address)
+                writer.write(data)
+                await writer.drain()
+
+                client = AsyncClient(
+                    address,
+                    reconnect=False,
+                    stop_receive=lambda: True,
+                    stop_send=lambda: client.to_send.empty()
+                )
+                client.framing = framing
+                async with client:
+                    assert await client.connect(timeout=1)
+                    await client.to_send.put("Hello")
+                    await client.run()
+                await asyncio.wait_for(server.join(), 1)
+                writer.close()
+            return server.received.get_nowait()
+
+        assert asyncio.run(run()) == b"Hello"
+
+
+class TestPublishServer:
+
+    @pytest.mark.timeout(3)
+    def test_publishes_to_all_subscribers(self):
+        address = ("localhost", 12345)
+        server = PublishServer(address)
+        subscribers = [ClientReceiver(address, reconnect=False, timeout=0.2) for _ in range(2)]
+
+        with server:
+            server.start()
+            for subscriber in subscribers:
+                subscriber.connect(timeout=1)
+                subscriber.start()
+            while len(server.subscribers) < len(subscribers):
+                time.sleep(0.01)
+
+            server.to_send.put("Hello")
+            server.to_send.put("World")
+            for subscriber in subscribers:
+                assert subscriber.received.get(timeout=1) == b"Hello"
+                assert subscriber.received.get(timeout=1) == b"World"
+
+            for subscriber in subscribers:
+                subscriber.shutdown()
+            server.shutdown()
+
+
+class TestShardedServer:
+
+    @pytest.mark.timeout(10)
+    def test_workers_receive_messages(self):
+        address = ("localhost", 12345)
+        server = ShardedServer(address, workers=2)
+
+        with server:
+            server.start()
+            clients = [ClientSender(address, reconnect=False, timeout=0.2) for _ in range(4)]
+            for ii, client in enumerate(clients):
+                client.connect(timeout=2)
+                client.start()
+                client.to_send.put(f"Hello {ii}")
+
+            received = [server.received.get(timeout=2) for _ in clients]
+            while server.stats()["messages"] < len(clients):
+                time.sleep(0.01)
+
+            stats = server.stats()
+            workers = server.workers
+        for client in clients:
+            client.shutdown()
+
+        assert sorted(msg for _, msg in received) == [
+            b"Hello 0", b"Hello 1", b"Hello 2", b"Hello 3"]
+        assert stats["messages"] == 4
+        assert stats["accepted"] == 4
+        assert len(server.worker_stats()) == 2
+        assert not any(worker.is_alive() for worker in workers)
+
+
+class TestUnixDomainSockets:
+
+    @pytest.mark.timeout(3)
+    def test_client_and_server_communicate_with_unix_socket(self, tmp_path):
+        address = str(tmp_path / "socketlib.sock")
+        client = Client(address, reconnect=False, timeout=0.2)
+        server = Server(address, reconnect=False, timeout=0.2)
+
+        with server:
+            server.start()
+            with client:
+                client.connect(timeout=1)
+                client.start()
+
+                client.to_send.put("Hello")
+                server.to_send.put("World")
+                assert server.received.get(timeout=1) == b"Hello"
+                assert client.received.get(timeout=1) == b"World"
+
+                client.shutdown()
+            server.shutdown()
+
+        assert server.port is None
+        assert server.ip == address
+
+    @pytest.mark.timeout(3)
+    def test_async_client_and_server_communicate_with_unix_socket(self, tmp_path):
+        async def run():
+            address = tmp_path / "socketlib.sock"
+            server = AsyncServer(address, reconnect=False)
+            client = AsyncClient(address, reconnect=False)
+
+            async with server:
+                server.start()
+                async with client:
+                    assert await client.connect(timeout=1)
+                    client.start()
+                    await client.to_send.put("Hello")
+                    msg = await asyncio.wait_for(server.received.get(), 1)
+                    await client.shutdown()
+                await server.shutdown()
+            return msg, address.exists()
+
+        assert asyncio.run(run()) == (b"Hello", False)
+
+
+class TestDatagrams:
+
+    @pytest.mark.timeout(3)
+    def test_sender_and_receiver_exchange_datagrams(self):
+        address = ("localhost", 12345)
+        receiver = DatagramReceiver(address)
+        sender = DatagramSender(address)
+        receiver.codec = JsonCodec()
+        sender.codec = JsonCodec()
+
+        with receiver:
+            receiver.start()
+            with sender:
+                sender.start()
+                for ii in range(5):
+                    sender.to_send.put({"reading": ii})
+                messages = [receiver.received.get(timeout=1) for _ in range(5)]
+                sender.shutdown()
+            receiver.shutdown()
+
+        assert messages == [{"reading": ii} for ii in range(5)]
+        assert sender.sent == 5
+        assert receiver.tracker.received == 5
+        assert receiver.tracker.lost == 0
+
+    @pytest.mark.timeout(3)
+    def test_counts_discarded_datagrams_as_lost(self, tmp_path):
+        address = str(tmp_path / "socketlib.sock")
+        receiver = DatagramReceiver(address)
+        sender = DatagramSender(address)
+        sender.max_datagram_size = 32
+
+        with receiver:
+            receiver.start()
+            with sender:
+                sender.start()
+                sender.to_send.put("first")
+                sender.to_send.put("x" * 100)
+                sender.to_send.put("last")
+                assert receiver.received.get(timeout=1) == b"first"
+                assert receiver.received.get(timeout=1) == b"last"
+                sender.shutdown()
+            receiver.shutdown()
+
+        assert sender.oversized == 1
+        assert receiver.tracker.lost == 1
+
+    @pytest.mark.timeout(3)
+    def test_tracks_each_unix_sender(self, tmp_path):
+        address = str(tmp_path / "socketlib.sock")
+        receiver = DatagramReceiver(address)
+        senders = [DatagramSender(address) for _ in range(2)]
+
+        with receiver:
+            receiver.start()
+            for sender in senders:
+                sender.connect()
+            for ii in range(3):
+                for sender in senders:
+                    sender.to_send.put(f"reading {ii}")
+            for sender in senders:
+                sender.start()
+            messages = [receiver.received.get(timeout=1) for _ in range(6)]
+            for sender in senders:
+                sender.shutdown()
+                sender.close_connection()
+            receiver.shutdown()
+
+        assert len(messages) == 6
+        assert receiver.tracker.lost == 0
+        assert receiver.tracker.late == 0
+        assert receiver.tracker.untracked == 0
+
+
+class TestRpc:
+
+    @pytest.mark.timeout(3)
+    def test_pipelined_calls(self):
+        address = ("localhost", 12345)
+        server = RpcServer(address, reconnect=False, timeout=0.2)
+        client = RpcClient(address, reconnect=False, timeout=0.2)
+        server.codec = RpcCodec(JsonCodec())
+        client.codec = RpcCodec(JsonCodec())
+        server.register("square", lambda x: x * x)
+
+        @server.register("fail")
+        def fail(body):
+            raise ValueError("bad argument")
+
+        with server:
+            server.start()
+            with client:
+                client.connect(timeout=1)
+                client.start()
+
+                futures = [client.call("square", ii, timeout=1) for ii in range(100)]
+                assert [future.result() for future in futures] == [
+                    ii * ii for ii in range(100)]
+                with pytest.raises(RpcError, match="ValueError: bad argument"):
+                    client.request("fail", None, timeout=1)
+                with pytest.raises(RpcError, match="Unknown method"):
+                    client.request("missing", timeout=1)
+                assert client.pending_calls == 0
+
+                client.shutdown()
+            server.shutdown()
+
+    @pytest.mark.timeout(3)
+    def test_batched_received_messages(self):
+        address = ("localhost", 12345)
+        server = RpcServer(address, reconnect=False, timeout=0.2)
+        client = RpcClient(address, reconnect=False, timeout=0.2)
+        server.codec = RpcCodec(JsonCodec())
+        client.codec = RpcCodec(JsonCodec())
+        server.batch_received = client.batch_received = True
+        server.register("square", lambda x: x * x)
+
+        with server:
+            server.start()
+            with client:
+                client.connect(timeout=1)
+                client.start()
+
+                futures = [client.call("square", ii, timeout=1) for ii in range(100)]
+                assert [future.result() for future in futures] == [
+                    ii * ii for ii in range(100)]
+
+                client.shutdown()
+            server.shutdown()
+
+    @pytest.mark.timeout(3)
+    def test_calls_time_out(self):
+        address = ("localhost", 12345)
+        server = RpcServer(address, reconnect=False, timeout=0.2)
+        client = RpcClient(address, reconnect=False, timeout=0.2)
+        server.register("slow", lambda body: time.sleep(0.3) or body)
+        server.register("count", lambda body: len(body))
+        client.call_timeout = 0.1
+
+        with server:
+            server.start()
+            with client:
+                client.connect(timeout=1)
+                client.start()
+                # Without an inner codec an int result cannot be encoded
+                with pytest.raises(RpcError, match="CodecError"):
+                    client.request("count", b"abc", timeout=1)
+                with pytest.raises(TimeoutError):
+                    client.request("slow", b"late")
+                assert client.pending_calls == 0
+                client.shutdown()
+            server.shutdown()
+
+
+class TestChannels:
+
+    @pytest.mark.timeout(3)
+    def test_channels_share_a_connection(self):
+        address = ("localhost", 12345)
+        server = ChannelServer(address, reconnect=False, timeout=0.2)
+        client = ChannelClient(address, reconnect=False, timeout=0.2)
+
+        with server:
+            server.start()
+            with client:
+                client.connect(timeout=1)
+                client.start()
+
+                for ii in range(3):
+                    client.channel(1).to_send.put(f"one {ii}")
+                    client.channel(2).to_send.put(f"two {ii}")
+                assert [server.channel(1).received.get(timeout=1) for _ in range(3)] == [
+                    b"one 0", b"one 1", b"one 2"]
+                assert [server.channel(2).received.get(timeout=1) for _ in range(3)] == [
+                    b"two 0", b"two 1", b"two 2"]
+
+                server.channel(2).to_send.put("reply")
+                assert client.channel(2).received.get(timeout=1) == b"reply"
+                assert client.channel(1).received.empty()
+                assert client.channel(1).submit("done").result(timeout=1)
+                assert server.channel(1).received.get(timeout=1) == b"done"
+
+                client.shutdown()
+            server.shutdown()
+
+
+class TestClientPool:
+
+    @pytest.mark.timeout(5)
+    def test_spreads_messages_between_servers(self):
+        servers = [MultiServer(("localhost", port)) for port in (12345, 12346)]
+        pool = ClientPool(
+            [("localhost", 12345), ("localhost", 12346)], connections=2, timeout=0.2)
+
+        for server in servers:
+            server.start()
+        with pool:
+            pool.connect(timeout=1)
+            pool.start()
+            while pool.available < 4:
+                time.sleep(0.01)
+            for ii in range(8):
+                pool.send(f"msg {ii}")
+            received = [[server.received.get(timeout=1) for _ in range(4)]
+                        for server in servers]
+            pool.shutdown()
+        for server in servers:
+            server.shutdown()
+
+        # Each connection sent two messages
+        for messages in received:
+            assert len({conn_id for conn_id, _ in messages}) == 2
+        assert sorted(msg for messages in received for _, msg in messages) == [f"msg {ii}".encode() for ii in range(8)]
@@ -1,13 +1,19 @@
+import os
 import queue
 import pytest
 import random
+import socket
 import threading
 import time
 from socketlib import (
+    Backoff,
     ClientSender,
     ClientReceiver,
+    Outbox,
     ServerReceiver,
     ServerSender,
+    SessionClient,
+    SessionServer,
     get_module_logger
 )
 
@@ -83,6 +89,41 @@ class TestServerReconnects:
         assert server.received.get() == b"msg 1"
         assert server.received.get() == b"msg 2"
 
+    @pytest.mark.timeout(3)
+    def test_server_keeps_listening_socket_open(self, client_senders):
+        client1, client2 = client_senders
+
+        received = queue.Queue()
+        server = ServerReceiver(
+            address=self.address1,
+            received=received,
+            reconnect=True,
+            timeout=0.2,
+            stop=lambda: received.qsize() == 2,
+            stop_reconnect=lambda: received.qsize() == 2,
+            logger=self.logger
+        )
+        server.start()
+        listener = server._socket
+
+        self.wait_for_client(client1)
+        self.wait_for_client(client2)
+
+        server.join()
+        assert server._socket is listener
+        assert server.received.get() == b"msg 1"
+        assert server.received.get() == b"msg 2"
+
+    @pytest.mark.timeout(3)
+    def test_shutdown_interrupts_accept(self):
+        server = ServerReceiver(address=self.address1, reconnect=True)
+        server.start()
+
+        server.shutdown()
+
+        assert not server.receive_thread.is_alive()
+        server.close_connection()
+
     def get_client_receiver(self) -> ClientReceiver:
         received = queue.Queue()
         return ClientReceiver(
@@ -276,3 +317,153 @@ class TestClientReconnects:
         assert "msg" in msg
         msg = server2.received.get().decode()
         assert "msg" in msg
+
+    @pytest.mark.timeout(3)
+    def test_failed_attempts_back_off_and_close_their_sockets(self):
+        client = ClientSender(address=self.address1, reconnect=True, timeout=0.2)
+        client.backoff = Backoff(base=0.01, cap=0.05)
+        fds_dir = "/proc/self/fd"
+        has_fds = os.path.isdir(fds_dir)
+        open_fds = len(os.listdir(fds_dir)) if has_fds else 0
+
+        client.connect(timeout=0.5)
+        client.connect_thread.join()
+
+        assert client.connect_attempts > 3
+        assert client.failed_attempts == client.connect_attempts
+        assert client.time_to_connect is None
+        client.close_connection()
+        if has_fds:
+            assert len(os.listdir(fds_dir)) <= open_fds
+
+    @pytest.mark.timeout(3)
+    def test_shutdown_interrupts_connect(self):
+        client = ClientSender(address=self.address1, reconnect=True, timeout=0.2)
+        client.backoff = Backoff(base=60)
+        client.connect()
+        client.start()
+        time.sleep(0.1)
+
+        start = time.monotonic()
+        client.shutdown()
+        assert time.monotonic() - start < 0.5
+        assert not client.send_thread.is_alive()
+        client.close_connection()
+
+    @pytest.mark.timeout(3)
+    def test_stale_wakeup_does_not_interrupt_connect(self):
+        client = ClientSender(address=self.address1, reconnect=False, timeout=0.2)
+        with socket.create_server(self.address1):
+            with client:
+                # Left by a shutdown while no attempt was in progress
+                client._wakeup_sockets()[1].send(b"\x00")
+                client.connect(timeout=1)
+                client.connect_thread.join()
+                assert client.connected
+                assert client.connect_attempts == 1
+
+    @pytest.mark.timeout(3)
+    def test_shutdown_after_closing_does_not_leak_sockets(self):
+        client = ClientSender(address=self.address1, reconnect=False, timeout=0.2)
+        fds_dir = "/proc/self/fd"
+        if not os.path.isdir(fds_dir):
+            pytest.skip("Cannot count open file descriptors")
+        with socket.create_server(self.address1):
+            client.connect(timeout=1)
+            client.connect_thread.join()
+            client.start()
+            client.close_connection()
+            open_fds = len(os.listdir(fds_dir))
+            client.shutdown()
+
+        assert len(os.listdir(fds_dir)) <= open_fds
+
+    @pytest.mark.timeout(3)
+    def test_connect_metrics(self):
+        server = ServerReceiver(address=self.address1, reconnect=False, timeout=0.2)
+        client = ClientSender(address=self.address1, reconnect=False, timeout=0.2)
+        with server:
+            server.start()
+            with client:
+                client.connect(timeout=1)
+                client.connect_thread.join()
+                stats = client.connect_stats()
+            server.shutdown()
+
+        assert client.connected
+        assert stats["attempts"] >= 1
+        assert stats["attempts"] == stats["failed_attempts"] + 1
+        assert 0 < stats["time_to_connect"] < 1
+
+    @pytest.mark.timeout(3)
+    def test_connects_again_after_closing(self):
+        client = ClientSender(address=self.address1, reconnect=False, timeout=0.2)
+        with socket.create_server(self.address1):
+            for _ in range(2):
+                with client:
+                    client.connect(timeout=1)
+                    client.connect_thread.join()
+                    assert client.connected
+
+    @pytest.mark.timeout(3)
+    def test_outbox_replays_messages_after_restart(self, tmp_path):
+        outbox = Outbox(tmp_path, memory_limit=64, segment_size=256)
+        for ii in range(100):
+            outbox.put(f"msg {ii}")
+        # No server is listening. The messages are kept on disk
+        outbox.close()
+
+        received = queue.Queue()
+        server = ServerReceiver(
+            address=self.address1,
+            received=received,
+            reconnect=False,
+            timeout=0.2,
+            stop=lambda: received.qsize() >= 100,
+        )
+        outbox = Outbox(tmp_path, memory_limit=64, segment_size=256)
+        client = ClientSender(
+            address=self.address1, to_send=outbox, reconnect=False, timeout=0.2)
+        with server:
+            server.start()
+            with client:
+                client.connect(timeout=1)
+                client.start()
+                server.join()
+                client.shutdown()
+        outbox.close()
+
+        messages = [received.get_nowait().decode() for _ in range(received.qsize())]
+        assert messages == [f"msg {ii}" for ii in range(100)]
+        assert not any(name.endswith(Outbox.suffix) for name in os.listdir(tmp_path))
+
+    @pytest.mark.timeout(5)
+    def test_session_resumes_after_the_connection_is_lost(self):
+        server = SessionServer(address=self.address2, timeout=0.2)
+        client = SessionClient(address=self.address2, timeout=0.2)
+        client.backoff = Backoff(base=0.01, cap=0.05)
+
+        with server:
+            server.start()
+            with client:
+                client.connect(timeout=1)
+                client.start()
+                while not client.connected:
+                    time.sleep(0.01)
+                for ii in range(2000):
+                    client.to_send.put(f"c{ii}")
+                    server.to_send.put(f"s{ii}")
+                    if ii == 1000:
+                        client._socket.shutdown(socket.SHUT_RDWR)
+
+                from_client = [server.received.get(timeout=2) for _ in range(2000)]
+                from_server = [client.received.get(timeout=2) for _ in range(2000)]
+                client.shutdown()
+            server.shutdown()
+
+        # Every message arrives once and in order
+        assert from_client == [f"c{ii}".encode() for ii in range(2000)]
+        assert from_server == [f"s{ii}".encode() for ii in range(2000)]
+        assert client.session.resumes >= 2
+        assert client.session.lost == 0
+        assert server.session.lost == 0
@@ -11,14 +11,29 @@ class FakeSocket:
         self._bytes_start = 0
 
         self.sent: list[bytes] = []
+        self.max_send = None  # Maximum number of bytes sent by a sendmsg call
 
     def recv(self, bufsize: int) -> bytes:
         fragment = self.recv_data[self._bytes_start:self._bytes_start + bufsize]
         self._bytes_start += bufsize
         return fragment
 
+    def recv_into(self, buffer, nbytes: int = 0) -> int:
+        if not nbytes:
+            nbytes = len(buffer)
+        fragment = self.recv(nbytes)
+        buffer[:len(fragment)] = fragment
+        return len(fragment)
+
     def connect(self, address: tuple[str, int]):
         self._connected = True
 
     def sendall(self, msg: bytes):
         self.sent.append(msg)
+
+    def sendmsg(self, buffers) -> int:
+        data = b"".join(buffers)
+        if self.max_send is not None:
+            data = data[:self.max_send]
+        self.sent.append(data)
+        return len(data)
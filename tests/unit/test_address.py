@@ -0,0 +1,44 @@
+import socket
+
+from socketlib.basic.address import (
+    bind_socket,
+    create_socket,
+    is_unix_address,
+    remove_socket_file,
+    socket_address,
+)
+
+
+def test_tuples_are_tcp_addresses_and_paths_are_unix_addresses(tmp_path):
+    assert not is_unix_address(("localhost", 12345))
+    assert is_unix_address("/tmp/socketlib.sock")
+    assert is_unix_address(tmp_path / "socketlib.sock")
+    assert socket_address(tmp_path / "socketlib.sock") == str(tmp_path / "socketlib.sock")
+
+
+def test_creates_socket_of_address_family(tmp_path):
+    with create_socket(("localhost", 12345)) as sock:
+        assert sock.family == socket.AF_INET
+    with create_socket(tmp_path / "socketlib.sock") as sock:
+        assert sock.family == socket.AF_UNIX
+
+
+def test_bind_replaces_stale_socket_file(tmp_path):
+    path = tmp_path / "socketlib.sock"
+    with create_socket(path) as sock:
+        bind_socket(sock, path)
+    assert path.exists()
+
+    with create_socket(path) as sock:
+        bind_socket(sock, path)
+    remove_socket_file(path)
+    assert not path.exists()
+
+
+def test_does_not_remove_regular_files(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("data")
+
+    remove_socket_file(path)
+
+    assert path.exists()
@@ -0,0 +1,21 @@
+import pytest
+from socketlib.basic.backoff import Backoff
+
+
+def test_delays_grow_exponentially_up_to_the_cap():
+    backoff = Backoff(base=0.5, cap=3, jitter=False)
+    assert [backoff.delay(ii) for ii in range(5)] == [0.5, 1, 2, 3, 3]
+    assert backoff.delay(10000) == 3
+
+
+def test_full_jitter():
+    backoff = Backoff(base=1, cap=4, seed=1)
+    delays = [backoff.delay(3) for _ in range(200)]
+    assert all(0 <= delay <= 4 for delay in delays)
+    assert len(set(delays)) == 200
+    assert min(delays) < 1 and max(delays) > 3
+
+
+def test_negative_delays_are_invalid():
+    with pytest.raises(ValueError):
+        Backoff(base=-1)
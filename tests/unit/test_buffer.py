@@ -1,4 +1,6 @@
-from socketlib import Buffer
+import pytest
+from socketlib import Buffer, LengthPrefixFraming, VarintFraming
+from socketlib.exceptions.exceptions import FrameTooLargeError
 from .fake_socket import FakeSocket
 
 
@@ -22,3 +24,114 @@ class TestBuffer:
         received = buffer.get_msg(b"\r\n")
 
         assert received == msg.encode()
+
+    def test_gets_multiple_messages(self):
+        sock = FakeSocket()
+        sock.recv_data = b"Hello\r\nWorld\r\n"
+
+        buffer = Buffer(sock)
+
+        assert buffer.get_msg(b"\r\n") == b"Hello"
+        assert buffer.get_msg(b"\r\n") == b"World"
+        assert buffer.get_msg(b"\r\n") is None
+
+    def test_message_end_split_across_reads(self):
+        sock = FakeSocket()
+        sock.recv_data = b"abc\r\ndefg\r\n"
+
+        buffer = Buffer(sock, recv_size=4)
+
+        assert buffer.get_msg(b"\r\n") == b"abc"
+        assert buffer.get_msg(b"\r\n") == b"defg"
+
+    def test_uses_given_message_end(self):
+        sock = FakeSocket()
+        sock.recv_data = b"Hello\r\nWorld|"
+
+        buffer = Buffer(sock, recv_size=3)
+        received = buffer.get_msg(b"|")
+
+        assert received == b"Hello\r\nWorld"
+        assert buffer.buffer == b""
+
+    def test_gets_all_available_messages(self):
+        sock = FakeSocket()
+        sock.recv_data = b"Hello\r\nWorld\r\nFoo"
+
+        buffer = Buffer(sock)
+
+        assert buffer.get_msgs(b"\r\n") == [b"Hello", b"World"]
+        assert buffer.get_msgs(b"\r\n") is None
+        assert buffer.buffer == b"Foo"
+
+    def test_receives_messages_with_a_single_read(self):
+        sock = FakeSocket()
+        sock.recv_data = b"Hello\r\nWorld\r\nFoo"
+
+        buffer = Buffer(sock, recv_size=12)
+
+        assert buffer.recv_msgs(b"\r\n") == [b"Hello"]
+        assert buffer.recv_msgs(b"\r\n") == [b"World"]
+        assert buffer.recv_msgs(b"\r\n") is None
+        assert buffer.buffer == b"Foo"
+
+    def test_feeds_data_received_by_other_means(self):
+        buffer = Buffer(None, framing=LengthPrefixFraming())
+        data = LengthPrefixFraming().frame(b"Hello") + LengthPrefixFraming().frame(b"World")
+
+        assert buffer.feed(data[:7]) == []
+        assert buffer.feed(data[7:]) == [b"Hello", b"World"]
+        assert len(buffer) == 0
+
+
+class TestBufferLimits:
+
+    def test_drops_connection_when_frame_is_too_large(self):
+        sock = FakeSocket()
+        sock.recv_data = b"x" * 100 + b"\r\nHello\r\n"
+
+        buffer = Buffer(sock, recv_size=16, max_frame_size=20)
+
+        assert buffer.get_msg(b"\r\n") is None
+        assert buffer.dropped
+        assert buffer.oversized_frames == 1
+        assert len(buffer) == 0
+
+    def test_discards_frames_without_delimiter(self):
+        sock = FakeSocket()
+        sock.recv_data = b"x" * 100 + b"\r\nHello\r\n"
+
+        buffer = Buffer(
+            sock, recv_size=16, max_buffered=32, oversize_policy="discard")
+
+        assert buffer.get_msg(b"\r\n") == b"Hello"
+        assert buffer.oversized_frames == 1
+        assert len(buffer._data) <= 32
+
+    def test_discards_length_prefixed_frames(self):
+        framing = LengthPrefixFraming()
+        sock = FakeSocket()
+        sock.recv_data = framing.frame(b"x" * 1000) + framing.frame(b"Hello")
+
+        buffer = Buffer(
+            sock,
+            recv_size=64,
+            framing=framing,
+            max_frame_size=100,
+            oversize_policy="discard"
+        )
+
+        assert buffer.get_msgs() == [b"Hello"]
+        assert buffer.oversized_frames == 1
+        assert len(buffer._data) <= 100
+
+    def test_raises_when_frame_is_too_large(self):
+        framing = VarintFraming()
+        sock = FakeSocket()
+        sock.recv_data = framing.frame(b"x" * 1000)
+
+        buffer = Buffer(
+            sock, framing=framing, max_frame_size=100, oversize_policy="raise")
+
+        with pytest.raises(FrameTooLargeError):
+            buffer.get_msg()
@@ -0,0 +1,99 @@
+import queue
+
+import pytest
+from socketlib.basic.channels import ChannelCodec, ChannelQueue, Channels
+from socketlib.basic.codecs import JsonCodec
+from socketlib.exceptions.exceptions import CodecError
+
+
+class TestChannelCodec:
+
+    def test_encodes_and_decodes_messages(self):
+        codec = ChannelCodec()
+        assert codec.decode(codec.encode((3, b"data"))) == (3, b"data")
+        assert codec.decode(codec.encode((0, "text"))) == (0, b"text")
+
+    def test_each_channel_can_have_a_codec(self):
+        codec = ChannelCodec(codecs={1: JsonCodec()})
+        assert codec.decode(codec.encode((1, {"a": 1}))) == (1, {"a": 1})
+        assert codec.decode(codec.encode((2, b"raw"))) == (2, b"raw")
+
+    def test_invalid_messages(self):
+        codec = ChannelCodec()
+        with pytest.raises(CodecError):
+            codec.encode((70000, b"data"))
+        with pytest.raises(CodecError):
+            codec.encode((1, 5))
+        with pytest.raises(CodecError):
+            codec.decode(b"\x00")
+
+
+class TestChannelQueue:
+
+    def test_channels_take_turns(self):
+        send_queue = ChannelQueue()
+        for ii in range(3):
+            send_queue.put(f"a{ii}", channel=1)
+        send_queue.put("b0", channel=2)
+        send_queue.put("b1", channel=2)
+        send_queue.put("c0", channel=3)
+        items = [send_queue.get_nowait() for _ in range(send_queue.qsize())]
+        assert items == ["a0", "b0", "c0", "a1", "b1", "a2"]
+        with pytest.raises(queue.Empty):
+            send_queue.get(timeout=0.01)
+
+    def test_channels_are_bounded(self):
+        send_queue = ChannelQueue(maxsize=1)
+        send_queue.put("a", channel=1)
+        send_queue.put("b", channel=2)
+        with pytest.raises(queue.Full):
+            send_queue.put("c", channel=1, timeout=0.01)
+        assert send_queue.qsize(1) == 1
+        assert send_queue.qsize() == 2
+
+
+class TestChannels:
+
+    def test_channel_queues(self):
+        channels = Channels(ChannelQueue())
+        channel = channels.get(5)
+        assert channels.get(5) is channel
+        channel.to_send.put("msg")
+        assert channel.to_send.qsize() == 1
+
+        channels.dispatch((5, b"reply"))
+        channels.dispatch((6, b"new channel"))
+        assert channel.received.get_nowait() == b"reply"
+        assert channels.get(6).received.get_nowait() == b"new channel"
+        assert sorted(channels.ids()) == [5, 6]
+        with pytest.raises(ValueError):
+            channels.get(-1)
+
+    def test_full_channels_drop_messages(self):
+        channels = Channels(ChannelQueue(), maxsize=1)
+        channels.dispatch((1, b"first"))
+        channels.dispatch((1, b"second"))
+        channels.dispatch((2, b"other"))
+        assert channels.get(1).dropped == 1
+        assert channels.get(1).received.get_nowait() == b"first"
+        assert channels.get(2).received.get_nowait() == b"other"
+
+    def test_number_of_channels_is_bounded(self):
+        channels = Channels(ChannelQueue(), max_channels=2)
+        channels.get(1)
+        channels.dispatch((2, b"new channel"))
+        channels.dispatch((3, b"too many"))
+        assert channels.ids() == [1, 2]
+        assert channels.rejected == 1
+        with pytest.raises(ValueError):
+            channels.get(3)
+
+    def test_only_open_channels_receive_messages(self):
+        channels = Channels(ChannelQueue())
+        channels.open_on_receive = False
+        channel = channels.get(1)
+        channels.dispatch((1, b"open"))
+        channels.dispatch((2, b"not open"))
+        assert channel.received.get_nowait() == b"open"
+        assert channels.ids() == [1]
+        assert channels.rejected == 1
@@ -0,0 +1,76 @@
+import pytest
+from socketlib.client.client_pool import ClientPool
+
+
+def get_pool(policy: str, servers: int = 3) -> ClientPool:
+    addresses = [("localhost", 12345 + ii) for ii in range(servers)]
+    pool = ClientPool(addresses, policy=policy)
+    for member in pool.members:
+        member._connected = True
+    return pool
+
+
+def test_round_robin():
+    pool = get_pool("round_robin")
+    for ii in range(6):
+        pool.send(f"msg {ii}")
+    assert [member.to_send.qsize() for member in pool.members] == [2, 2, 2]
+
+
+def test_least_outstanding():
+    pool = get_pool("least_outstanding")
+    pool.members[0].to_send.put("queued")
+    pool.members[1].to_send.put("queued")
+    pool.send("msg")
+    assert pool.members[2].to_send.qsize() == 1
+
+
+def test_consistent_hash_keeps_keys_in_a_member():
+    pool = get_pool("consistent_hash")
+    for key in ("a", "b", "c"):
+        for _ in range(3):
+            pool.send(key, key=key)
+    for member in pool.members:
+        messages = [member.to_send.get_nowait() for _ in range(member.to_send.qsize())]
+        assert len(set(messages)) <= 1 or len(messages) % 3 == 0
+        for msg in set(messages):
+            assert messages.count(msg) == 3
+
+    with pytest.raises(ValueError):
+        pool.send("no key")
+
+
+def test_consistent_hash_skips_members_that_are_down():
+    pool = get_pool("consistent_hash")
+    member = pool._choose("key")
+    member._connected = False
+    other = pool._choose("key")
+    assert other is not member
+    member._connected = True
+    assert pool._choose("key") is member
+
+
+def test_members_that_are_down_are_skipped():
+    pool = get_pool("round_robin")
+    pool.members[1]._connected = False
+    for ii in range(4):
+        pool.send(f"msg {ii}")
+    assert [member.to_send.qsize() for member in pool.members] == [2, 0, 2]
+    assert pool.available == 2
+
+
+def test_messages_are_moved_from_failed_members():
+    pool = get_pool("round_robin", servers=2)
+    pool.members[0].to_send.put("one")
+    pool.members[0].to_send.put("two")
+    pool.members[0]._connected = False
+    pool._move_messages(pool.members[0])
+    assert pool.members[0].to_send.empty()
+    assert pool.members[1].to_send.qsize() == 2
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        ClientPool([("localhost", 12345)], policy="random")
+    with pytest.raises(ValueError):
+        ClientPool([])
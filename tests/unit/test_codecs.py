@@ -0,0 +1,78 @@
+import queue
+import pytest
+from socketlib import Buffer, JsonCodec, LengthPrefixFraming, StructCodec, TextCodec
+from socketlib.basic.receive import receive_and_enqueue
+from socketlib.basic.send import get_and_send_messages
+from socketlib.exceptions.exceptions import CodecError
+from .fake_socket import FakeSocket
+
+
+def test_text_codec():
+    codec = TextCodec()
+    assert codec.encode("Hola Mundo ñ") == "Hola Mundo ñ".encode()
+    assert codec.decode(b"Hello") == "Hello"
+
+
+def test_json_codec():
+    codec = JsonCodec()
+    msg = {"id": 1, "values": [1.5, 2.5]}
+    assert codec.encode(msg) == b'{"id":1,"values":[1.5,2.5]}'
+    assert codec.decode(codec.encode(msg)) == msg
+
+
+def test_struct_codec_with_names():
+    codec = StructCodec("!Idd", names=["sensor", "lat", "lon"])
+    encoded = codec.encode((7, 19.5, -99.25))
+
+    assert len(encoded) == codec.size
+    record = codec.decode(encoded)
+    assert record.sensor == 7
+    assert record == (7, 19.5, -99.25)
+
+
+def test_struct_codec_decodes_consecutive_records():
+    codec = StructCodec("!Hh")
+    data = codec.encode((1, -1)) + codec.encode((2, -2))
+    assert codec.decode_records(data) == [(1, -1), (2, -2)]
+
+
+def test_struct_codec_errors():
+    codec = StructCodec("!I")
+    with pytest.raises(CodecError):
+        codec.decode(b"abc")
+    with pytest.raises(CodecError):
+        codec.encode(("a",))
+
+
+def test_sends_and_receives_with_codec():
+    codec = StructCodec("!Id")
+    framing = LengthPrefixFraming()
+    sender = FakeSocket()
+    to_send = queue.Queue()
+    to_send.put((1, 0.5))
+    to_send.put((2, 1.5))
+    get_and_send_messages(
+        sender, b"", to_send, lambda: to_send.empty(), 5.,
+        framing=framing, codec=codec)
+
+    receiver = FakeSocket()
+    receiver.recv_data = b"".join(sender.sent)
+    received = queue.Queue()
+    receive_and_enqueue(
+        Buffer(receiver, framing=framing), b"", received,
+        lambda: received.qsize() >= 2, 5., codec=codec)
+
+    assert received.get() == (1, 0.5)
+    assert received.get() == (2, 1.5)
+
+
+def test_receive_skips_messages_that_cannot_be_decoded():
+    receiver = FakeSocket()
+    receiver.recv_data = b'{"a": 1}\r\nnot json\r\n[2]\r\n'
+    received = queue.Queue()
+    receive_and_enqueue(
+        Buffer(receiver), b"\r\n", received,
+        lambda: received.qsize() >= 2, 5., codec=JsonCodec())
+
+    assert received.get() == {"a": 1}
+    assert received.get() == [2]
@@ -0,0 +1,83 @@
+import pytest
+from socketlib import Buffer, Compressor, LengthPrefixFraming, Server
+from socketlib.basic.send import encode_msg
+from socketlib.exceptions.exceptions import CompressionError, FramingError
+from .fake_socket import FakeSocket
+
+
+MESSAGE = b"temperature=21.5;humidity=40;pressure=1013;" * 20
+
+
+@pytest.mark.parametrize("mode", ["frame", "stream"])
+@pytest.mark.parametrize("zdict", [None, b"temperature=;humidity=;pressure="])
+def test_compress_and_decompress(mode, zdict):
+    sender = Compressor(mode=mode, zdict=zdict)
+    receiver = Compressor(mode=mode, zdict=zdict)
+
+    for _ in range(3):
+        compressed = sender.compress(MESSAGE)
+        assert len(compressed) < len(MESSAGE)
+        assert receiver.decompress(compressed) == MESSAGE
+
+    assert sender.ratio > 1
+
+
+def test_small_payloads_are_not_compressed():
+    compressor = Compressor(threshold=10)
+    assert compressor.compress(b"Alive") == b"\x00Alive"
+    assert compressor.decompress(b"\x00Alive") == b"Alive"
+
+
+def test_invalid_payload():
+    compressor = Compressor()
+    with pytest.raises(CompressionError):
+        compressor.decompress(b"\x01not compressed")
+
+
+@pytest.mark.parametrize("mode", ["frame", "stream"])
+@pytest.mark.parametrize("zdict", [None, b"temperature=;humidity=;pressure="])
+def test_decompressed_payloads_are_limited(mode, zdict):
+    sender = Compressor(mode=mode, zdict=zdict)
+    receiver = Compressor(mode=mode, zdict=zdict, max_length=len(MESSAGE) - 1)
+    with pytest.raises(CompressionError):
+        receiver.decompress(sender.compress(MESSAGE))
+
+    bomb = Compressor().compress(bytes(1 << 20))
+    assert Compressor().decompress(bomb, max_length=1 << 20) == bytes(1 << 20)
+    with pytest.raises(CompressionError):
+        Compressor().decompress(bomb, max_length=1024)
+
+
+def test_compression_requires_length_prefix():
+    with pytest.raises(FramingError):
+        encode_msg(MESSAGE, compressor=Compressor())
+
+    server = Server(("localhost", 12345))
+    server.compression = Compressor()
+    with pytest.raises(FramingError):
+        server.listen()
+
+
+def test_buffer_decompresses_frames():
+    framing = LengthPrefixFraming()
+    compressor = Compressor(mode="stream")
+    sock = FakeSocket()
+    sock.recv_data = b"".join(
+        encode_msg(msg, framing=framing, compressor=compressor)
+        for msg in [MESSAGE, b"Alive", MESSAGE]
+    )
+
+    buffer = Buffer(sock, framing=framing, compressor=Compressor(mode="stream"))
+
+    assert buffer.get_msgs() == [MESSAGE, b"Alive", MESSAGE]
+
+
+def test_buffer_limits_decompressed_frames():
+    framing = LengthPrefixFraming()
+    sock = FakeSocket()
+    sock.recv_data = encode_msg(bytes(1 << 16), framing=framing, compressor=Compressor())
+
+    buffer = Buffer(sock, framing=framing, max_frame_size=1024, compressor=Compressor())
+
+    with pytest.raises(CompressionError):
+        buffer.get_msgs()
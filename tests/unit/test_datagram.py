@@ -0,0 +1,97 @@
+import os
+import selectors
+import socket
+
+from socketlib.basic.datagram import SequenceTracker, recv_datagrams
+
+
+class TestSequenceTracker:
+
+    def test_counts_gaps_as_lost(self):
+        tracker = SequenceTracker()
+        for sequence in (0, 1, 4, 5, 9):
+            assert tracker.update("sender", sequence)
+        assert tracker.received == 5
+        assert tracker.lost == 5
+        assert tracker.loss_ratio() == 0.5
+
+    def test_late_datagrams_are_not_lost(self):
+        tracker = SequenceTracker()
+        assert tracker.update("sender", 0)
+        assert tracker.update("sender", 2)
+        assert not tracker.update("sender", 1)
+        assert tracker.lost == 0
+        assert tracker.late == 1
+
+    def test_tracks_each_source(self):
+        tracker = SequenceTracker()
+        tracker.update("a", 0)
+        tracker.update("b", 0)
+        tracker.update("a", 1)
+        tracker.update("b", 1)
+        assert tracker.lost == 0
+
+    def test_late_datagrams_only_cancel_losses_of_their_source(self):
+        tracker = SequenceTracker()
+        for sequence in (0, 2):
+            tracker.update("a", sequence)
+        for sequence in (0, 2, 1):
+            tracker.update("b", sequence)
+        assert not tracker.update("b", 1)
+        assert tracker.lost == 1
+        assert tracker.lost_from("a") == 1
+        assert tracker.lost_from("b") == 0
+        assert tracker.late == 2
+
+    def test_datagrams_without_source_are_not_tracked(self):
+        tracker = SequenceTracker()
+        for source in (None, None, ""):
+            assert tracker.update(source, 0)
+        assert tracker.received == 3
+        assert tracker.untracked == 3
+        assert tracker.lost == 0
+        assert tracker.late == 0
+
+    def test_sequence_wraps_around(self):
+        tracker = SequenceTracker()
+        tracker.update("sender", 2 ** 32 - 1)
+        assert tracker.update("sender", 1)
+        assert tracker.lost == 1
+
+    def test_restarted_source(self):
+        tracker = SequenceTracker(reorder_window=10)
+        tracker.update("sender", 5000)
+        assert tracker.update("sender", 0)
+        assert tracker.update("sender", 1)
+        assert tracker.restarts == 1
+        assert tracker.lost == 0
+        assert tracker.late == 0
+
+
+def test_recv_datagrams_reads_waiting_datagrams():
+    receiver, sender = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    with receiver, sender:
+        receiver.setblocking(False)
+        buffer = bytearray(1024)
+        assert recv_datagrams(receiver, buffer, 10, timeout=0.01) == []
+
+        for msg in (b"one", b"two", b"three"):
+            sender.send(msg)
+        datagrams = recv_datagrams(receiver, buffer, 2, timeout=0.01)
+        assert [payload for payload, _ in datagrams] == [b"one", b"two"]
+        datagrams = recv_datagrams(receiver, buffer, 2, timeout=0.01)
+        assert [payload for payload, _ in datagrams] == [b"three"]
+
+
+def test_recv_datagrams_with_large_descriptors():
+    receiver, sender = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    with receiver, sender:
+        # select.select cannot watch descriptors of 1024 or more
+        large = socket.socket(fileno=os.dup2(receiver.fileno(), 1500))
+        with large, selectors.DefaultSelector() as selector:
+            large.setblocking(False)
+            selector.register(large, selectors.EVENT_READ)
+            sender.send(b"one")
+            datagrams = recv_datagrams(large, bytearray(16), 10, 0.01, selector)
+            assert [payload for payload, _ in datagrams] == [b"one"]
+            assert recv_datagrams(large, bytearray(16), 10, timeout=0.01) == []
@@ -0,0 +1,96 @@
+import queue
+import pytest
+from socketlib import DeliveryReport, JsonCodec
+from socketlib.basic.delivery import Delivery, FanoutDelivery
+from socketlib.basic.send import get_and_send_messages
+from socketlib.exceptions.exceptions import CodecError
+from .fake_socket import FakeSocket
+
+
+class BrokenSocket(FakeSocket):
+
+    def sendall(self, msg: bytes):
+        raise ConnectionResetError("Connection reset by peer")
+
+
+def send_all(socket: FakeSocket, messages: queue.Queue, **kwargs) -> None:
+    get_and_send_messages(
+        socket, b"\r\n", messages, lambda: messages.empty(), 5., **kwargs)
+
+
+@pytest.mark.parametrize("coalesce", [False, True])
+def test_future_is_resolved_when_message_is_written(coalesce):
+    socket = FakeSocket()
+    messages = queue.Queue()
+    deliveries = [Delivery("Hello"), Delivery("World")]
+    for delivery in deliveries:
+        messages.put(delivery)
+
+    send_all(socket, messages, coalesce=coalesce)
+
+    assert b"".join(socket.sent) == b"Hello\r\nWorld\r\n"
+    for delivery in deliveries:
+        report = delivery.future.result(timeout=1)
+        assert isinstance(report, DeliveryReport)
+        assert report.queue_wait >= 0
+        assert report.write_time >= 0
+
+
+def test_cancelled_message_is_not_sent():
+    socket = FakeSocket()
+    messages = queue.Queue()
+    cancelled = Delivery("Hello")
+    messages.put(cancelled)
+    messages.put("World")
+    cancelled.future.cancel()
+
+    send_all(socket, messages)
+
+    assert socket.sent == [b"World\r\n"]
+
+
+def test_future_fails_if_message_cannot_be_encoded():
+    socket = FakeSocket()
+    messages = queue.Queue()
+    delivery = Delivery({1, 2})
+    messages.put(delivery)
+
+    send_all(socket, messages, codec=JsonCodec())
+
+    with pytest.raises(CodecError):
+        delivery.future.result(timeout=1)
+
+
+def test_future_fails_if_connection_is_lost():
+    messages = queue.Queue()
+    delivery = Delivery("Hello")
+    messages.put(delivery)
+
+    send_all(BrokenSocket(), messages)
+
+    with pytest.raises(ConnectionResetError):
+        delivery.future.result(timeout=1)
+
+
+def test_fanout_is_resolved_when_written_to_every_socket():
+    delivery = Delivery("Hello")
+    delivery.start()
+    fanout = FanoutDelivery(delivery, 2)
+    fanout.done(1., 2.)
+    assert not delivery.future.done()
+    fanout.done(1.5, 3.)
+    assert delivery.future.result(timeout=0).write_time == 2.
+
+    assert FanoutDelivery(Delivery("Nobody"), 0)._delivery.future.done()
+
+
+def test_fanout_fails_with_the_first_error():
+    delivery = Delivery("Hello")
+    delivery.start()
+    fanout = FanoutDelivery(delivery, 3)
+    fanout.done(1., 2.)
+    fanout.fail(ConnectionError("lost"))
+    fanout.fail(KeyError(1))
+    fanout.done(1., 2.)
+    with pytest.raises(ConnectionError):
+        delivery.future.result(timeout=0)
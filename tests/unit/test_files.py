@@ -0,0 +1,90 @@
+import queue
+import socket
+import pytest
+from socketlib import Buffer, FileTransfer, LengthPrefixFraming
+from socketlib.basic.delivery import Delivery
+from socketlib.basic.files import send_file
+from socketlib.basic.send import get_and_send_messages
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(bytes(range(256)) * 100)
+    return path
+
+
+@pytest.fixture
+def sockets():
+    sender, receiver = socket.socketpair()
+    receiver.settimeout(2)
+    yield sender, receiver
+    sender.close()
+    receiver.close()
+
+
+def test_sends_file_range(data_file, sockets):
+    sender, receiver = sockets
+    framing = LengthPrefixFraming()
+
+    assert not send_file(
+        sender, FileTransfer(data_file, offset=10, count=100), framing=framing)
+
+    buffer = Buffer(receiver, framing=framing)
+    assert buffer.get_msg() == data_file.read_bytes()[10:110]
+
+
+def test_missing_file_is_skipped(tmp_path, sockets):
+    sender, _ = sockets
+    assert not send_file(sender, FileTransfer(tmp_path / "missing.bin"))
+
+
+def test_files_are_sent_in_order_with_messages(data_file, sockets):
+    sender, receiver = sockets
+    framing = LengthPrefixFraming()
+    messages = queue.Queue()
+    messages.put("Hello")
+    messages.put(FileTransfer(data_file))
+    messages.put("World")
+
+    get_and_send_messages(
+        sender, b"", messages, lambda: messages.empty(), 1.,
+        framing=framing, coalesce=True)
+
+    buffer = Buffer(receiver, framing=framing)
+    received = [buffer.get_msg() for _ in range(3)]
+    assert received == [b"Hello", data_file.read_bytes(), b"World"]
+
+
+def test_file_taken_while_coalescing_is_sent_after_stop(data_file, sockets):
+    sender, receiver = sockets
+    framing = LengthPrefixFraming()
+    messages = queue.Queue()
+    messages.put("Hello")
+    transfer = Delivery(FileTransfer(data_file))
+    messages.put(transfer)
+
+    # The queue is empty once the file is taken, so the stop function is true
+    get_and_send_messages(
+        sender, b"", messages, lambda: messages.empty(), 1.,
+        framing=framing, coalesce=True)
+
+    assert transfer.future.result(timeout=1).write_time >= 0
+    buffer = Buffer(receiver, framing=framing)
+    assert [buffer.get_msg() for _ in range(2)] == [b"Hello", data_file.read_bytes()]
+
+
+def test_file_taken_while_coalescing_fails_with_the_write(data_file, sockets):
+    sender, receiver = sockets
+    receiver.close()
+    messages = queue.Queue()
+    messages.put("Hello")
+    transfer = Delivery(FileTransfer(data_file))
+    messages.put(transfer)
+
+    get_and_send_messages(
+        sender, b"", messages, lambda: messages.empty(), 1.,
+        framing=LengthPrefixFraming(), coalesce=True)
+
+    with pytest.raises(ConnectionError):
+        transfer.future.result(timeout=1)
@@ -0,0 +1,65 @@
+import pytest
+from socketlib import Buffer, DelimiterFraming, LengthPrefixFraming, VarintFraming
+from socketlib.basic.framing import decode_varint, encode_varint
+from socketlib.basic.send import encode_msg
+from socketlib.exceptions.exceptions import FramingError
+from .fake_socket import FakeSocket
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 2 ** 32, 2 ** 63])
+def test_varint_round_trip(value):
+    encoded = encode_varint(value)
+    assert decode_varint(encoded, 0, len(encoded)) == (value, len(encoded))
+
+
+def test_decode_incomplete_varint():
+    encoded = encode_varint(300)
+    assert decode_varint(encoded, 0, 1) is None
+
+
+def test_decode_invalid_varint():
+    with pytest.raises(FramingError):
+        decode_varint(b"\xff" * 11, 0, 11)
+
+
+def test_length_prefix_frame():
+    framing = LengthPrefixFraming(width=2)
+    assert framing.frame(b"Hello") == b"\x00\x05Hello"
+
+
+def test_length_prefix_message_too_large():
+    framing = LengthPrefixFraming(width=1)
+    with pytest.raises(FramingError):
+        framing.frame(b"a" * 256)
+
+
+def test_encode_msg_with_framing():
+    assert encode_msg("Hello", framing=VarintFraming()) == b"\x05Hello"
+    assert encode_msg(b"Hello", framing=DelimiterFraming(b"|")) == b"Hello|"
+
+
+@pytest.mark.parametrize("framing", [
+    DelimiterFraming(b"\n"),
+    LengthPrefixFraming(width=4),
+    VarintFraming(),
+])
+def test_buffer_splits_frames(framing):
+    messages = [b"Hello", b"World", b"x" * 1000]
+    sock = FakeSocket()
+    sock.recv_data = b"".join(framing.frame(msg) for msg in messages)
+
+    buffer = Buffer(sock, recv_size=7, framing=framing)
+
+    assert [buffer.get_msg() for _ in range(3)] == messages
+    assert buffer.get_msg() is None
+
+
+def test_buffer_reads_binary_payloads():
+    payload = bytes(range(256)) + b"\r\n"
+    framing = LengthPrefixFraming()
+    sock = FakeSocket()
+    sock.recv_data = framing.frame(payload) * 2
+
+    buffer = Buffer(sock, framing=framing)
+
+    assert buffer.get_msgs() == [payload, payload]
@@ -0,0 +1,130 @@
+import os
+import queue
+
+import pytest
+from socketlib.basic.outbox import Outbox
+from socketlib.exceptions.exceptions import CodecError
+
+
+def take(outbox, count):
+    deliveries = [outbox.get_nowait() for _ in range(count)]
+    for delivery in deliveries:
+        delivery.start()
+    return deliveries
+
+
+def ack(deliveries):
+    for delivery in deliveries:
+        delivery.done(0, 0)
+
+
+def segment_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(Outbox.suffix))
+
+
+class TestOutbox:
+
+    def test_messages_stay_in_memory_under_the_limit(self, tmp_path):
+        outbox = Outbox(tmp_path, memory_limit=100)
+        outbox.put("text")
+        outbox.put(b"bytes")
+        assert outbox.qsize() == 2
+        assert outbox.memory_bytes == 9
+        assert segment_files(tmp_path) == []
+
+        deliveries = take(outbox, 2)
+        assert [d.msg for d in deliveries] == ["text", b"bytes"]
+        ack(deliveries)
+        with pytest.raises(queue.Empty):
+            outbox.get(timeout=0.01)
+        outbox.close()
+
+    def test_spills_to_disk_in_order(self, tmp_path):
+        outbox = Outbox(tmp_path, memory_limit=10, segment_size=64)
+        messages = [f"message {ii}".encode() for ii in range(10)]
+        for msg in messages:
+            outbox.put(msg)
+        # Once a message is on disk, the following ones also go to disk
+        assert outbox.memory_bytes == 9
+        assert outbox.disk_messages == 9
+        assert len(segment_files(tmp_path)) > 1
+
+        deliveries = take(outbox, 10)
+        assert [d.msg for d in deliveries] == messages
+        ack(deliveries)
+        assert outbox.disk_messages == 0
+        assert segment_files(tmp_path) == []
+
+        # The outbox goes back to memory once the disk is empty
+        outbox.put(b"new")
+        assert outbox.memory_bytes == 3
+        outbox.close()
+
+    def test_large_messages_get_their_own_segment(self, tmp_path):
+        outbox = Outbox(tmp_path, memory_limit=0, segment_size=16)
+        outbox.put(b"x" * 100)
+        assert take(outbox, 1)[0].msg == b"x" * 100
+        outbox.close()
+
+    def test_connection_errors_rewind_the_messages_in_flight(self, tmp_path):
+        outbox = Outbox(tmp_path, memory_limit=8, segment_size=64)
+        for ii in range(6):
+            outbox.put(f"msg{ii}")
+
+        deliveries = take(outbox, 4)
+        ack(deliveries[:1])
+        for delivery in deliveries[1:]:
+            delivery.fail(ConnectionResetError())
+        assert outbox.qsize() == 5
+
+        deliveries = take(outbox, 5)
+        assert [d.msg for d in deliveries] == [f"msg{ii}" for ii in range(1, 6)]
+        outbox.close()
+
+    def test_messages_that_cannot_be_encoded_are_discarded(self, tmp_path):
+        outbox = Outbox(tmp_path, memory_limit=0)
+        outbox.put(b"bad")
+        outbox.put(b"good")
+        bad, good = take(outbox, 2)
+        bad.fail(CodecError("invalid"))
+        good.fail(ConnectionResetError())
+        assert [d.msg for d in take(outbox, 1)] == [b"good"]
+        assert outbox.qsize() == 0
+        outbox.close()
+
+    def test_messages_survive_restarts(self, tmp_path):
+        outbox = Outbox(tmp_path, memory_limit=10, segment_size=64)
+        for ii in range(8):
+            outbox.put(f"msg{ii}")
+        deliveries = take(outbox, 4)
+        ack(deliveries[:3])
+        # msg3 was taken but not written
+        outbox.close()
+
+        outbox = Outbox(tmp_path, memory_limit=10, segment_size=64)
+        assert outbox.qsize() == 5
+        outbox.put("msg8")
+        deliveries = take(outbox, 6)
+        assert [d.msg for d in deliveries] == [f"msg{ii}" for ii in range(3, 9)]
+        ack(deliveries)
+        outbox.close()
+        assert segment_files(tmp_path) == []
+
+    def test_close_moves_memory_to_disk(self, tmp_path):
+        outbox = Outbox(tmp_path, memory_limit=12, segment_size=64)
+        for ii in range(5):
+            outbox.put(f"msg{ii}")
+        assert outbox.memory_bytes == 12
+        outbox.close()
+        with pytest.raises(ValueError):
+            outbox.put("closed")
+
+        outbox = Outbox(tmp_path)
+        deliveries = take(outbox, 5)
+        assert [d.msg for d in deliveries] == [f"msg{ii}" for ii in range(5)]
+        outbox.close()
+
+    def test_only_accepts_bytes_and_strings(self, tmp_path):
+        with Outbox(tmp_path) as outbox:
+            with pytest.raises(TypeError):
+                outbox.put({"a": 1})
@@ -0,0 +1,104 @@
+import collections
+import selectors
+import socket
+
+import pytest
+from socketlib import Buffer, PublishServer
+from socketlib.basic.delivery import Delivery
+from socketlib.exceptions.exceptions import SlowConsumerError
+from socketlib.server.multi_server import Connection
+
+
+@pytest.fixture
+def connection():
+    sock, peer = socket.socketpair()
+    yield Connection(1, sock, "peer", Buffer(sock))
+    sock.close()
+    peer.close()
+
+
+def pending_frames(conn):
+    return [bytes(frame) for frame, _, _ in conn.pending]
+
+
+class TestSlowConsumerPolicy:
+
+    def enqueue(self, server, conn, frames):
+        return [server._enqueue(conn, memoryview(f), None) for f in frames]
+
+    def test_drops_oldest_frames(self, connection):
+        server = PublishServer(("localhost", 12345), max_pending=2)
+
+        added = self.enqueue(server, connection, [b"a", b"b", b"c"])
+
+        assert added == [True, True, True]
+        assert pending_frames(connection) == [b"b", b"c"]
+        assert connection.dropped == 1
+        assert server.dropped_messages == 1
+
+    def test_keeps_partially_written_frame(self, connection):
+        server = PublishServer(("localhost", 12345), max_pending=2)
+        self.enqueue(server, connection, [b"a", b"b"])
+        connection.partial = True
+
+        self.enqueue(server, connection, [b"c"])
+
+        assert pending_frames(connection) == [b"a", b"c"]
+
+    def test_drops_newest_frames(self, connection):
+        server = PublishServer(
+            ("localhost", 12345), max_pending=2, slow_consumer_policy="drop_newest")
+
+        added = self.enqueue(server, connection, [b"a", b"b", b"c"])
+
+        assert added == [True, True, False]
+        assert pending_frames(connection) == [b"a", b"b"]
+
+    def test_disconnects_slow_consumer(self, connection):
+        server = PublishServer(
+            ("localhost", 12345), max_pending=1, slow_consumer_policy="disconnect")
+        server._connections[connection.id] = connection
+
+        self.enqueue(server, connection, [b"a", b"b"])
+
+        assert connection.closed
+        assert server.slow_disconnects == 1
+        assert server.connections == {}
+
+    def test_fails_futures_of_dropped_messages(self, connection):
+        server = PublishServer(("localhost", 12345), max_pending=1)
+        delivery = Delivery(b"a")
+        server._enqueue(connection, memoryview(b"a"), delivery)
+        server._enqueue(connection, memoryview(b"b"), None)
+
+        with pytest.raises(SlowConsumerError):
+            delivery.future.result(timeout=0)
+
+    def test_invalid_policy(self):
+        with pytest.raises(ValueError):
+            PublishServer(("localhost", 12345), slow_consumer_policy="block")
+
+
+class TestSubmit:
+
+    def test_resolves_when_written_to_every_subscriber(self, connection):
+        server = PublishServer(("localhost", 12345))
+        server._connections[connection.id] = connection
+        server._selector = selectors.DefaultSelector()
+        server._selector.register(connection.socket, selectors.EVENT_READ, connection)
+
+        future = server.submit(None, b"Hello")
+        unknown = server.submit(connection.id + 1, b"Hello")
+        server._dispatch()
+
+        assert future.result(timeout=0).write_time >= 0
+        with pytest.raises(KeyError):
+            unknown.result(timeout=0)
+        assert connection.pending == collections.deque()
+        server._selector.close()
+
+    def test_resolves_without_subscribers(self):
+        server = PublishServer(("localhost", 12345))
+        future = server.submit(None, b"Hello")
+        server._dispatch()
+        assert future.result(timeout=0).write_time == 0
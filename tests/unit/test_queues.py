@@ -0,0 +1,82 @@
+import queue
+import threading
+import time
+import pytest
+from socketlib import ClientReportAlive, LaneQueue
+from socketlib.basic.send import get_and_send_messages
+from .fake_socket import FakeSocket
+
+
+def test_strict_lanes():
+    lanes = LaneQueue(lanes=3)
+    lanes.put("low")
+    lanes.put("medium", lane=1)
+    lanes.put("high", lane=0)
+
+    assert lanes.qsize() == 3
+    assert [lanes.get() for _ in range(3)] == ["high", "medium", "low"]
+    assert lanes.empty()
+
+
+def test_weighted_lanes():
+    lanes = LaneQueue(lanes=2, weights=[2, 1])
+    for ii in range(4):
+        lanes.put(f"high {ii}", lane=0)
+        lanes.put(f"low {ii}", lane=1)
+
+    received = [lanes.get() for _ in range(6)]
+
+    assert received == [
+        "high 0", "high 1", "low 0", "high 2", "high 3", "low 1"
+    ]
+
+
+def test_get_times_out():
+    with pytest.raises(queue.Empty):
+        LaneQueue().get(timeout=0.01)
+
+
+def test_bounded_lanes():
+    lanes = LaneQueue(maxsize=1)
+    lanes.put("low")
+    lanes.put("high", lane=0)
+    with pytest.raises(queue.Full):
+        lanes.put("low", timeout=0.01)
+
+
+def test_full_checks_the_given_lane():
+    lanes = LaneQueue(maxsize=1)
+    lanes.put("high", lane=0)
+
+    assert lanes.full(lane=0)
+    assert not lanes.full()
+    lanes.put("low")
+    assert lanes.full()
+
+
+def test_control_messages_are_sent_first():
+    socket = FakeSocket()
+    messages = LaneQueue()
+    for ii in range(3):
+        messages.put(f"msg {ii}")
+    messages.put("Alive", lane=0)
+
+    get_and_send_messages(
+        socket, b"\r\n", messages, lambda: messages.empty(), 5.,
+        coalesce=True)
+
+    assert socket.sent == [b"Alive\r\nmsg 0\r\nmsg 1\r\nmsg 2\r\n"]
+
+
+def test_no_alive_messages_while_disconnected():
+    client = ClientReportAlive(("localhost", 12345), reconnect=False)
+    client.alive_interval = 0.01
+    # As after a lost connection
+    client._wait_for_connection.set()
+    thread = threading.Thread(target=client._report_alive)
+    thread.start()
+    time.sleep(0.1)
+    client._stop_send_event.set()
+    thread.join()
+
+    assert client.to_send.empty()
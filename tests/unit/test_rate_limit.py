@@ -0,0 +1,51 @@
+import queue
+import time
+from socketlib import RateLimiter
+from socketlib.basic.send import get_and_send_messages
+from .fake_socket import FakeSocket
+
+
+def test_burst_is_not_delayed():
+    limiter = RateLimiter(messages_per_second=10, burst_messages=5)
+    delays = [limiter.reserve() for _ in range(5)]
+    assert delays == [0.] * 5
+    assert limiter.throttled == 0
+
+
+def test_delays_messages_above_the_rate():
+    limiter = RateLimiter(messages_per_second=10, burst_messages=1)
+    assert limiter.reserve() == 0
+    assert 0.09 < limiter.reserve() <= 0.1
+    assert 0.19 < limiter.reserve() <= 0.2
+    assert limiter.throttled == 2
+
+
+def test_limits_bytes():
+    limiter = RateLimiter(bytes_per_second=1000, burst_bytes=100)
+    assert limiter.reserve(n_bytes=100) == 0
+    assert 0.49 < limiter.reserve(n_bytes=500) <= 0.5
+
+
+def test_wait_is_interrupted_by_stop():
+    limiter = RateLimiter(messages_per_second=1, burst_messages=1)
+    limiter.reserve()
+    start = time.monotonic()
+    limiter.wait(stop=lambda: True)
+    assert time.monotonic() - start < 0.1
+
+
+def test_sender_is_rate_limited():
+    socket = FakeSocket()
+    messages = queue.Queue()
+    for ii in range(3):
+        messages.put(f"msg {ii}")
+
+    limiter = RateLimiter(messages_per_second=20, burst_messages=1)
+    start = time.monotonic()
+    get_and_send_messages(
+        socket, b"\r\n", messages, lambda: len(socket.sent) == 3, 5.,
+        rate_limiter=limiter)
+
+    assert time.monotonic() - start >= 0.09
+    assert len(socket.sent) == 3
+    assert limiter.stats()["messages"] == 3
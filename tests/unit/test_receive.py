@@ -1,6 +1,6 @@
 import queue
 from socketlib.basic.receive import receive_and_enqueue
-from socketlib import Buffer
+from socketlib import Buffer, LengthPrefixFraming, VarintFraming, get_msg
 from .fake_socket import FakeSocket
 
 
@@ -14,3 +14,51 @@ def test_receive_and_enqueue():
 
     assert not messages.empty()
     assert messages.get() == b"Hello World"
+
+
+def test_receive_and_enqueue_batches():
+    socket = FakeSocket()
+    socket.recv_data = b"Hello\r\nWorld\r\n"
+    buffer = Buffer(socket)
+    messages = queue.Queue()
+    receive_and_enqueue(
+        buffer, b"\r\n", messages, lambda: messages.qsize() > 0, 5., batch=True)
+
+    assert messages.qsize() == 1
+    assert messages.get() == [b"Hello", b"World"]
+
+
+def test_receive_and_enqueue_stops_on_invalid_frames():
+    socket = FakeSocket()
+    socket.recv_data = b"\xff" * 16
+    buffer = Buffer(socket, framing=VarintFraming())
+    messages = queue.Queue()
+    receive_and_enqueue(buffer, b"", messages, lambda: False, 5.)
+    assert messages.empty()
+
+    socket = FakeSocket()
+    socket.recv_data = b"\x00\x00\x00\x10" + bytes(16)
+    buffer = Buffer(
+        socket, framing=LengthPrefixFraming(), max_frame_size=8, oversize_policy="raise")
+    receive_and_enqueue(buffer, b"", messages, lambda: False, 5.)
+    assert messages.empty()
+
+
+def test_get_msg_returns_none_on_invalid_frames():
+    socket = FakeSocket()
+    socket.recv_data = b"\xff" * 16
+    assert get_msg(Buffer(socket, framing=VarintFraming()), b"") is None
+
+    socket = FakeSocket()
+    socket.recv_data = b"\x00\x00\x00\x10" + bytes(16)
+    buffer = Buffer(
+        socket, framing=LengthPrefixFraming(), max_frame_size=8, oversize_policy="raise")
+    assert get_msg(buffer, b"") is None
+
+
+def test_get_msg_returns_none_when_the_socket_is_closed():
+    class ClosedSocket(FakeSocket):
+        def recv_into(self, buffer, nbytes=0):
+            raise OSError("Bad file descriptor")
+
+    assert get_msg(Buffer(ClosedSocket()), b"\r\n") is None
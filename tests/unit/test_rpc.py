@@ -0,0 +1,84 @@
+import time
+
+import pytest
+from socketlib.basic.codecs import JsonCodec
+from socketlib.basic.rpc import (
+    ERROR, REPLY, REQUEST, DispatchQueue, PendingCalls, RpcCodec, RpcMessage
+)
+from socketlib.exceptions.exceptions import CodecError
+
+
+class TestRpcCodec:
+
+    def test_encodes_and_decodes_messages(self):
+        codec = RpcCodec()
+        msg = RpcMessage(REQUEST, 7, "echo", b"\r\nbinary")
+        assert codec.decode(codec.encode(msg)) == msg
+        assert codec.decode(codec.encode(RpcMessage(REPLY, 7, "", "text"))) == (
+            REPLY, 7, "", b"text")
+
+    def test_bodies_use_inner_codec(self):
+        codec = RpcCodec(JsonCodec())
+        msg = RpcMessage(REPLY, 2 ** 40, "", {"value": [1, 2]})
+        assert codec.decode(codec.encode(msg)) == msg
+
+    def test_errors_are_strings(self):
+        codec = RpcCodec(JsonCodec())
+        msg = RpcMessage(ERROR, 1, "", "ValueError: bad")
+        assert codec.decode(codec.encode(msg)) == msg
+
+    def test_invalid_messages(self):
+        codec = RpcCodec()
+        with pytest.raises(CodecError):
+            codec.encode(RpcMessage(REQUEST, 1, "sum", 3))
+        with pytest.raises(CodecError):
+            codec.decode(b"\x00\x01")
+        with pytest.raises(CodecError):
+            codec.decode(b"\x09" + bytes(10))
+
+    def test_encoded_messages_are_not_encoded_again(self):
+        codec = RpcCodec()
+        data = codec.encode(RpcMessage(REPLY, 3, "", b"done"))
+        assert codec.encode(data) is data
+
+
+class TestPendingCalls:
+
+    def test_calls_get_unique_ids(self):
+        calls = PendingCalls()
+        first, future = calls.add()
+        second, _ = calls.add()
+        assert first != second
+        assert len(calls) == 2
+        assert calls.pop(first) is future
+        assert calls.pop(first) is None
+
+    def test_calls_expire(self):
+        calls = PendingCalls()
+        call_id, future = calls.add(timeout=0.05)
+        _, other = calls.add(timeout=5)
+        with pytest.raises(TimeoutError):
+            future.result(timeout=1)
+        assert calls.pop(call_id) is None
+        assert not other.done()
+        calls.close(ConnectionError())
+
+    def test_close_fails_pending_and_new_calls(self):
+        calls = PendingCalls()
+        _, future = calls.add(timeout=5)
+        calls.close(ConnectionError("closed"))
+        with pytest.raises(ConnectionError):
+            future.result(timeout=1)
+        _, new = calls.add()
+        assert isinstance(new.exception(timeout=0), ConnectionError)
+        time.sleep(0.01)
+        assert not calls._thread.is_alive()
+
+
+
+def test_dispatch_queue_dispatches_each_message_of_a_batch():
+    dispatched = []
+    received = DispatchQueue(dispatched.append)
+    received.put(RpcMessage(REQUEST, 1, "square", 2))
+    received.put([RpcMessage(REQUEST, 2, "square", 3), RpcMessage(REQUEST, 3, "square", 4)])
+    assert [msg.call_id for msg in dispatched] == [1, 2, 3]
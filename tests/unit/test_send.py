@@ -1,5 +1,5 @@
 import queue
-from socketlib.basic.send import get_and_send_messages
+from socketlib.basic.send import get_and_send_messages, sendmsg_all
 from .fake_socket import FakeSocket
 
 
@@ -19,3 +19,38 @@ def test_get_and_sends_bytes_message():
     assert not get_and_send_messages(
         socket, b"\r\n", messages, lambda: messages.empty(), 5.)
     assert socket.sent == [b"Hello World\r\n"]
+
+
+def test_coalesces_queued_messages():
+    socket = FakeSocket()
+    messages = queue.Queue()
+    for ii in range(5):
+        messages.put(f"msg {ii}")
+    get_and_send_messages(
+        socket, b"\r\n", messages, lambda: messages.empty(), 5.,
+        coalesce=True, max_batch_count=3)
+
+    assert socket.sent == [
+        b"msg 0\r\nmsg 1\r\nmsg 2\r\n",
+        b"msg 3\r\nmsg 4\r\n",
+    ]
+
+
+def test_coalescing_respects_byte_cap():
+    socket = FakeSocket()
+    messages = queue.Queue()
+    for ii in range(3):
+        messages.put(b"x" * 10)
+    get_and_send_messages(
+        socket, b"\r\n", messages, lambda: messages.empty(), 5.,
+        coalesce=True, max_batch_bytes=20)
+
+    assert [len(data) for data in socket.sent] == [24, 12]
+
+
+def test_sendmsg_all_handles_partial_writes():
+    socket = FakeSocket()
+    socket.max_send = 3
+    sendmsg_all(socket, [b"Hello", b"World", b"!"])
+
+    assert b"".join(socket.sent) == b"HelloWorld!"
@@ -0,0 +1,234 @@
+import os
+import queue
+import socket
+
+import pytest
+from socketlib.basic.codecs import JsonCodec
+from socketlib.basic.delivery import Delivery
+from socketlib.basic.files import FileTransfer
+from socketlib.basic.session import (
+    ACK,
+    DATA,
+    HELLO,
+    Session,
+    SessionCodec,
+    SessionMessage,
+    SessionQueue,
+    peer_closed,
+)
+from socketlib.exceptions.exceptions import CodecError
+
+
+def drain(send_queue):
+    items = []
+    while True:
+        try:
+            items.append(send_queue.get_nowait())
+        except queue.Empty:
+            return items
+
+
+def resumed_queue(**kwargs):
+    send_queue = SessionQueue(**kwargs)
+    reconnect(send_queue)
+    send_queue.resume(0)
+    return send_queue
+
+
+def reconnect(send_queue):
+    send_queue.restart(lambda: SessionMessage(HELLO, 0, (1, 0)))
+    assert send_queue.get_nowait().kind == HELLO
+
+
+def connect(session, peer, peer_acked=0, knows_session=True):
+    """ Start a new connection and deliver the hello of the peer. """
+    session.start_connection()
+    hello = drain(session._send_queue)
+    assert hello[0].kind == HELLO
+    known = session.id if knows_session else 0
+    session.dispatch(SessionMessage(HELLO, peer_acked, (peer, known)))
+
+
+class TestSessionCodec:
+
+    def test_encodes_and_decodes_messages(self):
+        codec = SessionCodec()
+        for msg in [
+            SessionMessage(DATA, 7, b"data"),
+            SessionMessage(ACK, 5, None),
+            SessionMessage(HELLO, 3, (11, 12)),
+        ]:
+            assert codec.decode(codec.encode(msg)) == msg
+        assert codec.decode(codec.encode(SessionMessage(DATA, 1, "text"))).body == b"text"
+
+    def test_payloads_can_use_a_codec(self):
+        codec = SessionCodec(JsonCodec())
+        msg = SessionMessage(DATA, 1, {"a": 1})
+        assert codec.decode(codec.encode(msg)) == msg
+
+    def test_invalid_messages(self):
+        codec = SessionCodec()
+        with pytest.raises(CodecError):
+            codec.encode(SessionMessage(DATA, 1, 5))
+        with pytest.raises(CodecError):
+            codec.encode(SessionMessage(HELLO, 1, None))
+        with pytest.raises(CodecError):
+            codec.decode(b"\x00")
+        with pytest.raises(CodecError):
+            codec.decode(bytes([9]) + bytes(8))
+
+
+class TestSessionQueue:
+
+    def test_only_the_hello_is_sent_until_the_peer_resumes(self):
+        send_queue = SessionQueue()
+        send_queue.put("a")
+        hello = SessionMessage(HELLO, 0, (1, 0))
+        send_queue.restart(lambda: hello)
+        assert drain(send_queue) == [hello]
+
+        assert send_queue.resume(0) == 0
+        assert drain(send_queue) == [SessionMessage(DATA, 1, "a")]
+
+    def test_resends_the_messages_not_acknowledged(self):
+        send_queue = resumed_queue()
+        for msg in "abcd":
+            send_queue.put(msg)
+        assert [msg.number for msg in drain(send_queue)] == [1, 2, 3, 4]
+        send_queue.ack(1)
+        assert send_queue.window == 3
+
+        send_queue.put("e")
+        reconnect(send_queue)
+        send_queue.resume(2)
+        assert [msg.body for msg in drain(send_queue)] == ["c", "d", "e"]
+        assert send_queue.retransmitted == 2
+
+    def test_full_window_blocks_new_messages(self):
+        send_queue = resumed_queue(maxsize=2, window_size=2)
+        for msg in "ab":
+            send_queue.put(msg)
+        assert [msg.body for msg in drain(send_queue)] == ["a", "b"]
+        # The window is full, so the new messages wait in the queue
+        for msg in "cd":
+            send_queue.put(msg)
+        assert drain(send_queue) == []
+        with pytest.raises(queue.Full):
+            send_queue.put("e", timeout=0.01)
+
+        send_queue.ack(1)
+        assert [msg.body for msg in drain(send_queue)] == ["c"]
+        assert send_queue.window == 2
+        assert send_queue.evicted == 0
+
+    def test_full_window_evicts_with_the_evict_policy(self):
+        send_queue = resumed_queue(window_size=2, window_policy="evict")
+        for msg in "abcd":
+            send_queue.put(msg)
+        drain(send_queue)
+        assert send_queue.window == 2
+        assert send_queue.evicted == 2
+
+        reconnect(send_queue)
+        # Messages 1 and 2 were dropped from the window, but only 2 was not received
+        assert send_queue.resume(1) == 1
+        assert [msg.body for msg in drain(send_queue)] == ["c", "d"]
+
+    def test_acks_are_sent_when_due(self):
+        send_queue = resumed_queue()
+        send_queue.schedule_ack(3, 60)
+        send_queue.schedule_ack(5, 0)
+        send_queue.put("a")
+        assert send_queue.get(timeout=0.1) == SessionMessage(ACK, 5, None)
+        assert send_queue.get(timeout=0.1).kind == DATA
+        with pytest.raises(queue.Empty):
+            send_queue.get(timeout=0.01)
+
+    def test_deliveries_are_numbered(self):
+        send_queue = resumed_queue()
+        delivery = Delivery("a")
+        send_queue.put(delivery)
+        assert send_queue.get_nowait() is delivery
+        assert delivery.msg == SessionMessage(DATA, 1, "a")
+        with pytest.raises(TypeError):
+            send_queue.put(FileTransfer("file.txt"))
+        with pytest.raises(ValueError):
+            SessionQueue(window_policy="drop")
+
+
+class TestSession:
+
+    def test_discards_duplicates_and_counts_gaps(self):
+        received = queue.Queue()
+        session = Session(SessionQueue(), received)
+        connect(session, peer=5)
+        for number in [1, 2, 2, 1, 5]:
+            session.dispatch(SessionMessage(DATA, number, number))
+        assert [received.get_nowait() for _ in range(received.qsize())] == [1, 2, 5]
+        assert session.duplicates == 2
+        assert session.lost == 2
+        assert session.received_number == 5
+
+    def test_acknowledges_received_messages(self):
+        send_queue = SessionQueue()
+        session = Session(send_queue, queue.Queue())
+        session.ack_every = 2
+        connect(session, peer=5)
+        session.dispatch(SessionMessage(DATA, 1, b""))
+        assert drain(send_queue) == []
+        session.dispatch(SessionMessage(DATA, 2, b""))
+        assert drain(send_queue) == [SessionMessage(ACK, 2, None)]
+
+    def test_hello_resumes_from_the_last_message_received(self):
+        send_queue = SessionQueue()
+        session = Session(send_queue, queue.Queue())
+        connect(session, peer=5)
+        for msg in "abc":
+            send_queue.put(msg)
+        drain(send_queue)
+        session.dispatch(SessionMessage(DATA, 1, b"x"))
+
+        session.start_connection()
+        hello = drain(send_queue)[0]
+        assert hello == SessionMessage(HELLO, 1, (session.id, 5))
+        session.dispatch(SessionMessage(HELLO, 1, (5, session.id)))
+        assert [msg.body for msg in drain(send_queue)] == ["b", "c"]
+        assert session.resumes == 2
+
+    def test_restarted_peers_start_a_new_session(self):
+        send_queue = SessionQueue()
+        received = queue.Queue()
+        session = Session(send_queue, received)
+        connect(session, peer=5)
+        send_queue.put("a")
+        drain(send_queue)
+        session.dispatch(SessionMessage(DATA, 1, b"x"))
+
+        # The new peer does not know this session and numbers its messages again
+        connect(session, peer=6, knows_session=False)
+        assert [msg.body for msg in drain(send_queue)] == ["a"]
+        session.dispatch(SessionMessage(DATA, 1, b"y"))
+        assert session.duplicates == 0
+        assert received.qsize() == 2
+
+
+def test_peer_closed():
+    sock1, sock2 = socket.socketpair()
+    assert not peer_closed(sock1)
+    sock2.send(b"data")
+    assert not peer_closed(sock1)
+    sock2.close()
+    sock1.recv(4)
+    assert peer_closed(sock1)
+    sock1.close()
+
+
+def test_peer_closed_with_large_descriptors():
+    sock1, sock2 = socket.socketpair()
+    with sock1, sock2:
+        # select.select cannot watch descriptors of 1024 or more
+        large = socket.socket(fileno=os.dup2(sock1.fileno(), 1500))
+        with large:
+            assert not peer_closed(large)
+            sock2.close()
+            assert peer_closed(large)
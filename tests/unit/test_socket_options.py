@@ -0,0 +1,36 @@
+import socket
+import pytest
+from socketlib import SocketOptions
+
+
+def test_low_latency_preset_disables_nagle():
+    options = SocketOptions.preset("low-latency")
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        options.apply(sock)
+        assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+        assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+
+
+def test_low_latency_preset_does_not_set_quick_ack():
+    # TCP_QUICKACK is cleared by the kernel, so it is only a one-time hint
+    assert SocketOptions.preset("low-latency").quick_ack is None
+
+
+def test_bulk_throughput_preset_sets_buffer_sizes():
+    options = SocketOptions.preset("bulk-throughput")
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        default = sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+        options.apply_listener(sock)
+        assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF) > default
+        assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR)
+
+
+def test_default_preset_does_not_change_options():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        SocketOptions.preset("default").apply(sock)
+        assert not sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+
+
+def test_unknown_preset():
+    with pytest.raises(ValueError):
+        SocketOptions.preset("fast")
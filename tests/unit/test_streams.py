@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from socketlib import Buffer, LengthPrefixFraming, VarintFraming
+from socketlib.basic.streams import receive_from_stream, until_lost, wait_or_stop
+
+
+async def returns(value, delay=0.):
+    await asyncio.sleep(delay)
+    return value
+
+
+class TestWaitOrStop:
+
+    def test_returns_result(self):
+        stopped, result = asyncio.run(
+            wait_or_stop(returns(3), stop=lambda: False, poll=0.01))
+        assert not stopped
+        assert result == 3
+
+    def test_stops_while_waiting(self):
+        checks = []
+
+        def stop():
+            checks.append(True)
+            return len(checks) > 2
+
+        stopped, result = asyncio.run(
+            wait_or_stop(returns(3, delay=10), stop=stop, poll=0.01))
+        assert stopped
+        assert result is None
+
+    def test_raises_timeout(self):
+        with pytest.raises(TimeoutError):
+            asyncio.run(wait_or_stop(
+                returns(3, delay=10), stop=lambda: False, poll=0.01, timeout=0.05))
+
+
+class TestUntilLost:
+
+    def test_returns_false_when_all_finish(self):
+        assert not asyncio.run(until_lost(returns(False), returns(False, 0.01)))
+
+    def test_cancels_the_rest_when_connection_is_lost(self):
+        async def run():
+            slow = asyncio.ensure_future(returns(False, delay=10))
+            lost = await until_lost(returns(True), slow)
+            return lost, slow.cancelled()
+
+        assert asyncio.run(run()) == (True, True)
+
+
+
+class TestReceiveFromStream:
+
+    @staticmethod
+    def receive(data, buffer):
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            messages = asyncio.Queue()
+            lost = await receive_from_stream(
+                reader, buffer, b"", messages, stop=lambda: False, timeout=1.)
+            return lost, messages.qsize()
+
+        return asyncio.run(run())
+
+    def test_invalid_frames_lose_the_connection(self):
+        buffer = Buffer(None, framing=VarintFraming())
+        assert self.receive(b"\xff" * 16, buffer) == (True, 0)
+
+    def test_frames_too_large_lose_the_connection(self):
+        buffer = Buffer(
+            None, framing=LengthPrefixFraming(), max_frame_size=8, oversize_policy="raise")
+        assert self.receive(b"\x00\x00\x00\x10" + bytes(16), buffer) == (True, 0)